@@ -0,0 +1,3 @@
+# flake8: noqa: F401
+
+from .task_cache import TaskCache as TaskCache
@@ -0,0 +1,201 @@
+from logging import getLogger
+from pathlib import Path
+from aksdp.dataset import DataSet
+from typing import Optional
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+logger = getLogger(__name__)
+
+
+class TaskCache:
+    """タスク実行結果のキャッシュ
+
+    タスクのクラス・params・入力データの中身から求めたハッシュ値をキーとして、
+    出力DataSetと実行後のタスクの状態をローカルディスクに保存する。
+    入力データは Task.input_datakeys() で宣言されたものだけを使うため、宣言の無いタスクはキャッシュしない。
+    保存サイズが max_bytes を超えた場合は、最後に使われてから最も時間が経ったものから削除する。
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 1024 ** 3):
+        """.ctor
+
+        Args:
+            cache_dir (Path): キャッシュの保存先ディレクトリ
+            max_bytes (int, optional): キャッシュの最大サイズ. Defaults to 1GB.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def fingerprint(self, task, ds: DataSet) -> Optional[str]:
+        """キャッシュキーの計算
+
+        Args:
+            task (Task): 実行するタスク
+            ds (DataSet): 入力DataSet
+
+        Returns:
+            Optional[str]: キャッシュキー。入力が宣言されていない・ハッシュ化できない場合 None
+        """
+        cls = task.__class__
+
+        # 宣言が無いとカタログを含む全入力のハッシュ化(遅延読み込みのデータの読み込み)が必要になるため、キャッシュしない
+        keys = task.input_datakeys()
+        if not keys:
+            logger.info(f"task({cls.__name__}) does not declare input_datakeys(), cache disabled.")
+            return None
+
+        h = hashlib.sha256()
+        h.update(f"{cls.__module__}.{cls.__qualname__}".encode("utf-8"))
+
+        try:
+            h.update(json.dumps(task.params, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        except (TypeError, ValueError):
+            logger.debug(f"task({cls.__name__}) params is not serializable, cache disabled.")
+            return None
+
+        for k in sorted(set(keys)):
+            h.update(k.encode("utf-8"))
+            if ds is None or k not in ds.keys():
+                h.update(b"\0")
+                continue
+
+            d = ds.get(k)
+            digest = d.content_hash()
+            if digest is None:
+                logger.debug(f"task({cls.__name__}) input({k}) is not hashable, cache disabled.")
+                return None
+            h.update(d.data_type.name.encode("utf-8"))
+            h.update(digest)
+
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def load(self, key: str, task) -> Optional[DataSet]:
+        """キャッシュの読み込み。ヒットした場合はタスクの状態も実行後の状態に戻す
+
+        Args:
+            key (str): キャッシュキー
+            task (Task): 実行するタスク
+
+        Returns:
+            Optional[DataSet]: 出力DataSet。キャッシュが無ければ None
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                state, output_ds = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except BaseException as e:
+            logger.warning(f"cache load failed, {str(e)}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if state:
+            task.__dict__.update(state)
+
+        with self._lock:
+            self.hits += 1
+        return output_ds
+
+    def save(self, key: str, task, output_ds: DataSet):
+        """キャッシュの保存
+
+        Args:
+            key (str): キャッシュキー
+            task (Task): 実行後のタスク
+            output_ds (DataSet): 出力DataSet
+        """
+        try:
+            data = pickle.dumps((task.__getstate__(), output_ds), protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            try:
+                # タスクの状態が pickle できない場合は出力のみ保存する
+                data = pickle.dumps((None, output_ds), protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException as e:
+                logger.debug(f"task({task.__class__.__name__}) output is not serializable, {str(e)}")
+                return
+
+        if len(data) > self.max_bytes:
+            return
+
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+
+        with self._lock:
+            self.stores += 1
+            self._evict()
+
+    def _evict(self):
+        """最大サイズに収まるまで、最後に使われてから最も時間が経ったものから削除する
+        """
+        entries = []
+        for p in self.cache_dir.glob("*.pkl"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+
+        total = sum([e[1] for e in entries])
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """ヒット率等の統計情報
+
+        Returns:
+            dict: 統計情報
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """キャッシュの全削除
+        """
+        for p in self.cache_dir.glob("*.pkl"):
+            p.unlink()
@@ -5,12 +5,19 @@ from .data import DataType as DataType
 
 from .json_data import JsonData as JsonData
 from .raw_data import RawData as RawData
+from .lazy_data import LazyData as LazyData
+from .spill_store import SpillStore as SpillStore
 
 try:
     from .dataframe_data import DataFrameData as DataFrameData
 except ImportError:
     pass
 
+try:
+    from .parquet_data import ParquetData as ParquetData
+except ImportError:
+    pass
+
 try:
     from .sqlalchemy_model_data import SqlAlchemyModelData as SqlAlchemyModelData
 except ImportError:
@@ -1,7 +1,8 @@
 from abc import ABCMeta, abstractmethod
 from enum import Enum
 from logging import getLogger
-from typing import Generic, TypeVar, Any
+from typing import Generic, TypeVar, Any, Optional
+import sys
 
 logger = getLogger(__name__)
 TRepository = TypeVar("Repository")
@@ -15,9 +16,15 @@ class DataType(Enum):
     DATAFRAME = 1
     JSON = 2
     SQLALCHEMY_MODEL = 3
+    PARQUET = 4
 
 
 class Data(metaclass=ABCMeta):
+    # 中身 (サブクラスは content_ 経由で読み書きする)
+    _content = None
+    # 中身を管理している SpillStore (中身がディスクに退避されている場合は参照時に読み戻す)
+    _spill = None
+
     def __init__(self, repository: TRepository, data_type: DataType = DataType.RAW):
         """.ctor
 
@@ -28,6 +35,32 @@ class Data(metaclass=ABCMeta):
         self.repository = repository
         self.data_type_ = data_type
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        if self._spill is not None:
+            # 退避先は pickle 先から参照できないので中身を含める
+            state["_content"] = self.content_
+            del state["_spill"]
+        return state
+
+    def __setstate__(self, state: dict):
+        if "content_" in state:
+            # content_ を属性として持っていた頃の pickle
+            state["_content"] = state.pop("content_")
+        self.__dict__.update(state)
+
+    @property
+    def content_(self) -> Any:
+        if self._spill is not None:
+            return self._spill.accessed(self)
+        return self._content
+
+    @content_.setter
+    def content_(self, value: Any):
+        self._content = value
+        if self._spill is not None:
+            self._spill.updated(self)
+
     def save(self):
         """保存
         """
@@ -51,3 +84,19 @@ class Data(metaclass=ABCMeta):
             Any: データの中身
         """
         return None
+
+    def content_hash(self) -> Optional[bytes]:
+        """データの中身のハッシュ値(タスク結果キャッシュのキーに使用)
+
+        Returns:
+            Optional[bytes]: ハッシュ値。ハッシュ化できないデータの場合 None
+        """
+        return None
+
+    def memory_usage(self) -> int:
+        """データの中身が使用しているメモリ量の見積もり
+
+        Returns:
+            int: メモリ量(bytes)
+        """
+        return sys.getsizeof(self.content)
@@ -1,8 +1,12 @@
 from logging import getLogger
+from pathlib import Path
 from .data import Data, DataType
 import pandas as pd
-from io import StringIO
-from typing import TypeVar
+from io import BytesIO
+from typing import Dict, List, TypeVar, Optional, Union
+import functools
+import hashlib
+import json
 
 logger = getLogger(__name__)
 TRepository = TypeVar("Repository")
@@ -14,15 +18,117 @@ class DataFrameData(Data):
         self.content_ = content
 
     @classmethod
-    def load(cls, repository: TRepository) -> "DataFrameData":
-        return repository.load(DataFrameData.create_from_csv)
+    def load(cls, repository: TRepository, **options) -> "DataFrameData":
+        """リポジトリから CSV を読み込む
+
+        Args:
+            repository (TRepository): リポジトリ
+            options: create_from_csv() のオプション (engine, dtype, usecols, schema_cache 等)
+
+        Returns:
+            DataFrameData: 読み込んだデータ
+        """
+        ctor = functools.partial(DataFrameData.create_from_csv, **options)
+        if hasattr(repository, "load_path"):
+            # バイト列を経由せずファイルから直接パースする
+            return repository.load_path(ctor)
+        return repository.load(ctor)
 
     @classmethod
-    def create_from_csv(cls, raw_data: bytes, repository: TRepository = None) -> "DataFrameData":
-        sio = StringIO(raw_data.decode("utf-8"))
-        df = pd.read_csv(sio)
+    def create_from_csv(
+        cls,
+        raw_data: Union[bytes, Path],
+        repository: TRepository = None,
+        engine: str = None,
+        dtype: Dict[str, str] = None,
+        usecols: List[str] = None,
+        schema_cache: Union[bool, Path] = False,
+        **read_csv_kwargs,
+    ) -> "DataFrameData":
+        """CSV からの作成
+        バイト列は文字列にデコードせずにそのままパースする。
+
+        Args:
+            raw_data (Union[bytes, Path]): CSV のバイト列またはファイルパス
+            repository (TRepository, optional): リポジトリ. Defaults to None.
+            engine (str, optional): pd.read_csv の engine。"auto" の場合は pyarrow があれば pyarrow を使う.
+                Defaults to None (pandas の既定値).
+            dtype (Dict[str, str], optional): 列の型。指定した列は型推論しない. Defaults to None.
+            usecols (List[str], optional): 読み込む列. Defaults to None (全列).
+            schema_cache (Union[bool, Path], optional): 推論した列の型をサイドカーファイルに保存し、
+                次回以降の読み込みで dtype (日時の列は parse_dates) として使う。True の場合はファイルパス + ".schema.json"
+                (ファイルパスが分からない場合は保存しない). Defaults to False.
+            read_csv_kwargs: その他 pd.read_csv に渡す引数
+
+        Returns:
+            DataFrameData: 作成したデータ
+        """
+        if engine == "auto":
+            engine = "pyarrow" if _has_pyarrow() else None
+        if engine:
+            read_csv_kwargs["engine"] = engine
+        if usecols is not None:
+            read_csv_kwargs["usecols"] = usecols
+
+        schema_path = cls._schema_path(raw_data, repository, schema_cache)
+        schema = _read_schema(schema_path) if schema_path else None
+
+        def _read(schema: Optional[dict]) -> pd.DataFrame:
+            source = BytesIO(raw_data) if isinstance(raw_data, (bytes, bytearray)) else str(raw_data)
+            kwargs = dict(read_csv_kwargs)
+            types = dtype
+            if schema is not None and schema["dtype"]:
+                types = dict(schema["dtype"], **(dtype or {}))
+
+            if schema is not None and schema["parse_dates"]:
+                # 日時の列は dtype では読めないので parse_dates で読む
+                parse_dates = kwargs.get("parse_dates") or []
+                if isinstance(parse_dates, list):
+                    dates = [
+                        c
+                        for c in schema["parse_dates"]
+                        if c not in (dtype or {}) and c not in parse_dates and (usecols is None or c in usecols)
+                    ]
+                    kwargs["parse_dates"] = parse_dates + dates
+
+            if types and usecols is not None:
+                types = {k: v for k, v in types.items() if k in usecols}
+            if types:
+                kwargs["dtype"] = types
+            return pd.read_csv(source, **kwargs)
+
+        try:
+            df = _read(schema)
+        except (ValueError, TypeError) as e:
+            if schema is None:
+                raise
+            # 保存した型と合わなくなった場合は推論し直す
+            logger.info(f"cached schema {schema_path} does not match, re-infer. {str(e)}")
+            schema = None
+            df = _read(None)
+
+        if schema_path and (schema is None or set(df.columns) - _schema_columns(schema)):
+            _write_schema(schema_path, df, schema)
+
         return DataFrameData(df, repository)
 
+    @classmethod
+    def _schema_path(
+        cls, raw_data: Union[bytes, Path], repository: TRepository, schema_cache: Union[bool, Path]
+    ) -> Optional[Path]:
+        """スキーマのサイドカーファイルのパス
+
+        Returns:
+            Optional[Path]: サイドカーファイルのパス。保存しない場合は None
+        """
+        if not schema_cache:
+            return None
+        if schema_cache is not True:
+            return Path(schema_cache)
+
+        path = raw_data if isinstance(raw_data, (str, Path)) else getattr(repository, "path", None)
+        return Path(str(path) + ".schema.json") if path else None
+
     @classmethod
     def create_from_df(cls, df: pd.DataFrame, repository: TRepository = None) -> "DataFrameData":
         return DataFrameData(df, repository)
@@ -31,5 +137,81 @@ class DataFrameData(Data):
     def content(self) -> pd.DataFrame:
         return self.content_
 
+    def content_hash(self) -> Optional[bytes]:
+        h = hashlib.sha256()
+        # 列名・型も含める (Series の場合は名前と型)
+        if isinstance(self.content, pd.DataFrame):
+            h.update(repr((list(self.content.columns), str(self.content.dtypes))).encode("utf-8"))
+        else:
+            h.update(repr((self.content.name, str(self.content.dtype))).encode("utf-8"))
+        try:
+            h.update(pd.util.hash_pandas_object(self.content, index=True).values.tobytes())
+        except TypeError:
+            # list 等のハッシュ化できない値を含む場合
+            return None
+        return h.digest()
+
+    def memory_usage(self) -> int:
+        usage = self.content.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+
     def __str__(self) -> str:
         return f"DataFrameData:¥n{self.content.head()}"
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _read_schema(path: Path) -> Optional[dict]:
+    """サイドカーファイルから列の型を読み込む
+
+    Args:
+        path (Path): サイドカーファイル
+
+    Returns:
+        Optional[dict]: {"dtype": 列名→型, "parse_dates": 日時の列, "infer": 推論する列}。無い・読めない場合は None
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            schema = json.load(f)
+        return {"dtype": schema["dtype"], "parse_dates": schema.get("parse_dates", []), "infer": schema.get("infer", [])}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _schema_columns(schema: dict) -> set:
+    return set(schema["dtype"].keys()) | set(schema["parse_dates"]) | set(schema["infer"])
+
+
+def _write_schema(path: Path, df: pd.DataFrame, schema: Optional[dict]):
+    """推論した列の型をサイドカーファイルに保存する (usecols で読まなかった列の型は残す)
+    pd.read_csv の dtype で読めない型のうち、日時は parse_dates に、それ以外(timedelta 等)は推論する列に分ける
+
+    Args:
+        path (Path): サイドカーファイル
+        df (pd.DataFrame): 読み込んだ DataFrame
+        schema (Optional[dict]): 保存済みの列の型
+    """
+    columns = set([str(c) for c in df.columns])
+    dtype = {k: v for k, v in schema["dtype"].items() if k not in columns} if schema else {}
+    parse_dates = [c for c in schema["parse_dates"] if c not in columns] if schema else []
+    infer = [c for c in schema["infer"] if c not in columns] if schema else []
+
+    for c, t in df.dtypes.items():
+        if pd.api.types.is_datetime64_any_dtype(t):
+            parse_dates.append(str(c))
+        elif pd.api.types.is_timedelta64_dtype(t) or isinstance(t, (pd.PeriodDtype, pd.IntervalDtype)):
+            infer.append(str(c))
+        else:
+            dtype[str(c)] = str(t)
+
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"dtype": dtype, "parse_dates": parse_dates, "infer": infer}, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logger.warning(f"failed to save schema {path}. {str(e)}")
@@ -2,7 +2,8 @@ from logging import getLogger
 from .data import Data, DataType
 from io import StringIO
 import json
-from typing import TypeVar
+from typing import TypeVar, Optional
+import hashlib
 
 logger = getLogger(__name__)
 TRepository = TypeVar("Repository")
@@ -27,6 +28,20 @@ class JsonData(Data):
     def content(self) -> dict:
         return self.content_
 
+    def content_hash(self) -> Optional[bytes]:
+        try:
+            s = json.dumps(self.content, sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(s.encode("utf-8")).digest()
+
+    def memory_usage(self) -> int:
+        # 中身のオブジェクトを辿るのは重いため JSON 文字列長で近似する
+        try:
+            return len(json.dumps(self.content, ensure_ascii=False))
+        except (TypeError, ValueError):
+            return super().memory_usage()
+
     @property
     def __str__(self) -> str:
         return f"JsonData:{self.content}"
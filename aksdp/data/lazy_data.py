@@ -0,0 +1,122 @@
+from logging import getLogger
+from .data import Data, DataType
+from typing import Any, Callable, Optional, TypeVar
+import functools
+import hashlib
+import inspect
+import threading
+
+logger = getLogger(__name__)
+TRepository = TypeVar("Repository")
+
+
+def _loader_name(loader: Callable) -> Optional[str]:
+    """ローダーを識別する文字列
+    モジュールレベルの関数・メソッドとその functools.partial のみ識別できるものとし、
+    ラムダ・ローカル関数・呼び出し可能なオブジェクトは None を返す
+
+    Args:
+        loader (Callable): ローダー
+
+    Returns:
+        Optional[str]: 識別する文字列。識別できない場合 None
+    """
+    if isinstance(loader, functools.partial):
+        name = _loader_name(loader.func)
+        if name is None:
+            return None
+        return f"{name}{loader.args!r}{sorted(loader.keywords.items())!r}"
+
+    if not (inspect.isfunction(loader) or inspect.ismethod(loader)):
+        return None
+    qualname = loader.__qualname__
+    if "<lambda>" in qualname or "<locals>" in qualname:
+        return None
+    return f"{loader.__module__}.{qualname}"
+
+
+class LazyData(Data):
+    """初回の content アクセス時に Repository から読み込む Data
+
+    catalog_ds に登録しておくと、実際に中身を参照するタスクが実行されるまで読み込まない。
+    読み込んだ Data はキャッシュし、複数スレッドから同時に参照されても読み込みは1回だけ行う。
+    タスク結果キャッシュのハッシュ値は読み込まずにリポジトリの識別子(パス・更新日時, ETag 等)とローダーから求める。
+
+        catalog_ds.put("titanic", LazyData(LocalFileRepository(path), DataFrameData.load, DataType.DATAFRAME))
+    """
+
+    def __init__(
+        self, repository: TRepository, loader: Callable[[TRepository], Data], data_type: DataType = DataType.RAW
+    ):
+        """.ctor
+
+        Args:
+            repository (TRepository): 読み込み元のリポジトリ
+            loader (Callable[[TRepository], Data]): リポジトリから Data を作る関数 (例: DataFrameData.load)
+            data_type (DataType, optional): 読み込み前に返すデータの種類. Defaults to DataType.RAW.
+        """
+        super().__init__(repository, data_type)
+        self.loader = loader
+        self.data_ = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """読み込み済みかどうか
+
+        Returns:
+            bool: 読み込み済みなら True
+        """
+        return self.data_ is not None
+
+    def load(self) -> Data:
+        """読み込み (読み込み済みの場合はキャッシュを返す)
+
+        Returns:
+            Data: 読み込んだ Data
+        """
+        if self.data_ is None:
+            with self._lock:
+                if self.data_ is None:
+                    logger.debug(f"lazy load from {self.repository}")
+                    self.data_ = self.loader(self.repository)
+        return self.data_
+
+    def save(self):
+        # 読み込んでいなければリポジトリの内容から変わっていない
+        if self.data_ is not None:
+            self.data_.save()
+
+    @property
+    def data_type(self) -> DataType:
+        return self.data_.data_type if self.data_ is not None else self.data_type_
+
+    @property
+    def content(self) -> Any:
+        return self.load().content
+
+    def content_hash(self) -> Optional[bytes]:
+        # ハッシュ値を求めるためだけに読み込まないよう、リポジトリの識別子とローダーから求める
+        identity = self.repository.identity() if hasattr(self.repository, "identity") else None
+        loader = _loader_name(self.loader)
+        if identity is not None and loader is not None:
+            return hashlib.sha256(f"{identity}\0{loader}".encode("utf-8")).digest()
+
+        if self.data_ is not None:
+            return self.data_.content_hash()
+        return None
+
+    def memory_usage(self) -> int:
+        return self.data_.memory_usage() if self.data_ is not None else 0
+
+    def __str__(self) -> str:
+        return str(self.data_) if self.data_ is not None else f"LazyData({self.repository})"
@@ -0,0 +1,118 @@
+from logging import getLogger
+from pathlib import Path
+from .data import DataType
+from .dataframe_data import DataFrameData
+from typing import Any, List, Optional, TypeVar, Union
+import functools
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = getLogger(__name__)
+TRepository = TypeVar("Repository")
+
+
+class ParquetData(DataFrameData):
+    """Parquet 形式で保存・読み込みする DataFrame
+
+    CSV と異なり列の型を保持したまま保存でき、読み込み時に列と行の条件を指定すると
+    条件に合わない row group・列を読まずに済む。
+
+        ParquetData.load(repo, columns=["Name", "Age"], filters=[("Age", ">=", 20)])
+
+    タスクが必要とする列・行だけを遅延読み込みする場合は LazyData と組み合わせる。
+
+        LazyData(repo, functools.partial(ParquetData.load, columns=["Name"]), DataType.PARQUET)
+    """
+
+    def __init__(self, content: pd.DataFrame, repository: TRepository = None, row_group_size: int = None):
+        """.ctor
+
+        Args:
+            content (pd.DataFrame): DataFrame
+            repository (TRepository, optional): リポジトリ. Defaults to None.
+            row_group_size (int, optional): 保存時の row group の行数。行の条件で読み飛ばせる単位になる.
+                Defaults to None (pyarrow の既定値).
+        """
+        super().__init__(content, repository)
+        self.data_type_ = DataType.PARQUET
+        self.row_group_size = row_group_size
+
+    @classmethod
+    def load(cls, repository: TRepository, columns: List[str] = None, filters: Any = None) -> "ParquetData":
+        """リポジトリからの読み込み
+
+        Args:
+            repository (TRepository): リポジトリ
+            columns (List[str], optional): 読み込む列. Defaults to None (全列).
+            filters (Any, optional): 読み込む行の条件 (pyarrow.parquet.read_table の filters 形式.
+                例: [("Age", ">=", 20)]). Defaults to None.
+
+        Returns:
+            ParquetData: 読み込んだデータ
+        """
+        ctor = functools.partial(cls.create_from_parquet, columns=columns, filters=filters)
+        if hasattr(repository, "load_path"):
+            # ファイルから直接読むと、不要な row group・列はディスクから読み込まない
+            return repository.load_path(ctor)
+        return repository.load(ctor)
+
+    @classmethod
+    def create_from_parquet(
+        cls,
+        source: Union[bytes, Path],
+        repository: TRepository = None,
+        columns: List[str] = None,
+        filters: Any = None,
+    ) -> "ParquetData":
+        """Parquet ファイル・バイト列からの作成
+
+        Args:
+            source (Union[bytes, Path]): Parquet のバイト列またはファイルパス
+            repository (TRepository, optional): リポジトリ. Defaults to None.
+            columns (List[str], optional): 読み込む列. Defaults to None (全列).
+            filters (Any, optional): 読み込む行の条件. Defaults to None.
+
+        Returns:
+            ParquetData: 作成したデータ
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = pa.BufferReader(source)
+        else:
+            source = str(source)
+
+        table = pq.read_table(source, columns=columns, filters=filters)
+        return cls(table.to_pandas(), repository, _row_group_size(source))
+
+    @classmethod
+    def create_from_df(cls, df: pd.DataFrame, repository: TRepository = None) -> "ParquetData":
+        return cls(df, repository)
+
+    def write(self, path: Path):
+        """Parquet ファイルへの書き込み
+
+        Args:
+            path (Path): 書き込み先
+        """
+        table = pa.Table.from_pandas(self.content, preserve_index=False)
+        pq.write_table(table, str(path), row_group_size=self.row_group_size)
+
+    def __str__(self) -> str:
+        return f"ParquetData:¥n{self.content.head()}"
+
+
+def _row_group_size(source: Union[str, "pa.BufferReader"]) -> Optional[int]:
+    """保存時の row group の行数 (再保存時に同じ単位で書き込むため)
+
+    Args:
+        source (Union[str, pa.BufferReader]): Parquet ファイルのパスまたはバッファ
+
+    Returns:
+        Optional[int]: 最初の row group の行数。row group が1つ以下の場合は分からないので None
+    """
+    if not isinstance(source, str):
+        source.seek(0)
+    metadata = pq.ParquetFile(source).metadata
+    if metadata.num_row_groups <= 1:
+        return None
+    return metadata.row_group(0).num_rows
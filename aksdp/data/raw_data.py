@@ -1,6 +1,7 @@
 from logging import getLogger
 from .data import Data, DataType
-from typing import TypeVar
+from typing import TypeVar, Optional
+import hashlib
 
 logger = getLogger(__name__)
 TRepository = TypeVar("Repository")
@@ -23,5 +24,11 @@ class RawData(Data):
     def content(self) -> bytes:
         return self.content_
 
+    def content_hash(self) -> Optional[bytes]:
+        return hashlib.sha256(self.content).digest()
+
+    def memory_usage(self) -> int:
+        return len(self.content)
+
     def __str__(self) -> str:
         return f"RawData: {len(self.content)}bytes, b'{self.content[:16]}...'"
@@ -0,0 +1,210 @@
+from logging import getLogger
+from pathlib import Path
+from .data import Data
+from .raw_data import RawData
+from typing import Any, Union
+import collections
+import os
+import pickle
+import tempfile
+import threading
+import uuid
+import weakref
+
+try:
+    from .dataframe_data import DataFrameData
+except ImportError:
+    DataFrameData = None
+
+logger = getLogger(__name__)
+
+
+class SpillStore:
+    """メモリ予算を超えた Data の中身をディスクに退避する
+
+    track() した DataFrameData・RawData の中身の合計が budget_bytes を超えると、
+    最後に参照されてから最も時間が経ったものから spill_dir に書き出してメモリから外す。
+    退避した Data は次に content を参照した時点で読み戻す。
+    退避ファイルは読み戻した時点、または Data が破棄された時点で削除する。
+    """
+
+    def __init__(self, budget_bytes: int, spill_dir: Union[str, Path] = None):
+        """.ctor
+
+        Args:
+            budget_bytes (int): メモリ上に保持する中身の合計の上限(bytes)
+            spill_dir (Union[str, Path], optional): 退避先ディレクトリ。None の場合は一時ディレクトリ. Defaults to None.
+        """
+        self.budget_bytes = budget_bytes
+        self._tempdir = None
+        if spill_dir is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix="aksdp-spill-")
+            spill_dir = self._tempdir.name
+        self.spill_dir = Path(spill_dir)
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        # id(Data) → [weakref, 中身のサイズ, 退避ファイル(メモリ上にあれば None)]  (参照が古い順)
+        self._entries = collections.OrderedDict()
+
+        self.resident_bytes = 0
+        self.peak_bytes = 0
+        self.spill_count = 0
+        self.restore_count = 0
+
+    @staticmethod
+    def supports(data: Data) -> bool:
+        """退避できる Data かどうか
+
+        Args:
+            data (Data): Data
+
+        Returns:
+            bool: 退避できれば True
+        """
+        types = (RawData, DataFrameData) if DataFrameData is not None else (RawData,)
+        return isinstance(data, types)
+
+    def track(self, data: Data):
+        """Data を管理対象に加える (加えた結果予算を超えれば他の Data を退避する)
+
+        Args:
+            data (Data): Data
+        """
+        if not self.supports(data) or data._content is None:
+            return
+
+        with self._lock:
+            if data._spill is self:
+                return
+
+            key = id(data)
+            size = data.memory_usage()
+            self._entries[key] = [weakref.ref(data, lambda _, key=key: self._forget(key)), size, None]
+            data._spill = self
+            self._resident(size)
+            self._evict(key)
+
+    def accessed(self, data: Data) -> Any:
+        """Data の中身の参照 (退避されていれば読み戻す)
+
+        Args:
+            data (Data): Data
+
+        Returns:
+            Any: 中身
+        """
+        with self._lock:
+            e = self._entries.get(id(data))
+            if e is None:
+                return data._content
+
+            self._entries.move_to_end(id(data))
+            if e[2] is not None:
+                data._content = self._read(e[2], isinstance(data, RawData))
+                logger.debug(f"restored {e[1]} bytes from {e[2]}")
+                os.remove(e[2])
+                e[2] = None
+                self.restore_count += 1
+                self._resident(e[1])
+                self._evict(id(data))
+            return data._content
+
+    def updated(self, data: Data):
+        """Data の中身が置き換えられた
+
+        Args:
+            data (Data): Data
+        """
+        with self._lock:
+            e = self._entries.get(id(data))
+            if e is None:
+                return
+
+            if e[2] is not None:
+                os.remove(e[2])
+                e[2] = None
+            else:
+                self.resident_bytes -= e[1]
+
+            e[1] = data.memory_usage() if data._content is not None else 0
+            self._entries.move_to_end(id(data))
+            self._resident(e[1])
+            self._evict(id(data))
+
+    def _resident(self, size: int):
+        self.resident_bytes += size
+        self.peak_bytes = max(self.peak_bytes, self.resident_bytes)
+
+    def _forget(self, key: int):
+        """破棄された Data の管理情報・退避ファイルの削除
+
+        Args:
+            key (int): id(Data)
+        """
+        with self._lock:
+            e = self._entries.pop(key, None)
+            if e is None:
+                return
+            if e[2] is not None:
+                try:
+                    os.remove(e[2])
+                except OSError:
+                    pass
+            else:
+                self.resident_bytes -= e[1]
+
+    def _evict(self, keep: int):
+        """予算を超えていれば、参照が古い Data から退避する
+
+        Args:
+            keep (int): 退避しない Data の id (参照・追加した直後の Data)
+        """
+        for key, e in list(self._entries.items()):
+            if self.resident_bytes <= self.budget_bytes:
+                break
+            if key == keep or e[2] is not None:
+                continue
+
+            data = e[0]()
+            if data is None or data._content is None:
+                continue
+
+            path = self.spill_dir / f"{uuid.uuid4().hex}.bin"
+            self._write(path, data._content)
+            data._content = None
+            e[2] = path
+            self.resident_bytes -= e[1]
+            self.spill_count += 1
+            logger.debug(f"spilled {e[1]} bytes to {path}")
+
+    def _write(self, path: Path, content: Any):
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            with open(path, "wb") as f:
+                pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _read(self, path: Path, raw: bool) -> Any:
+        if raw:
+            return path.read_bytes()
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def report(self) -> dict:
+        """退避状況
+
+        Returns:
+            dict: budget_bytes(予算), resident_bytes(メモリ上の量), resident_peak_bytes(メモリ上の最大量),
+                spilled_bytes(退避中の量), spill_count(退避回数), restore_count(読み戻し回数)
+        """
+        with self._lock:
+            spilled = sum([e[1] for e in self._entries.values() if e[2] is not None])
+            return {
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": self.resident_bytes,
+                "resident_peak_bytes": self.peak_bytes,
+                "spilled_bytes": spilled,
+                "spill_count": self.spill_count,
+                "restore_count": self.restore_count,
+            }
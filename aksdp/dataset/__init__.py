@@ -1 +1,2 @@
 from .dataset import DataSet as DataSet
+from .dataset import SaveResult as SaveResult
@@ -1,14 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
 from aksdp.data import Data
-from typing import List
+from typing import Dict, List, NamedTuple, Optional
+import collections
+import threading
+import time
 
 logger = getLogger(__name__)
 
 
+class SaveResult(NamedTuple):
+    """DataSet.save_all() の Data 毎の結果"""
+
+    key: str
+    elapsed: float
+    error: Optional[BaseException] = None
+
+
 class DataSet:
+    # chain() で重ねる層の上限。超えた場合は1つの dict にまとめて参照を O(層数) に保つ
+    MAX_LAYERS = 32
+
     def __init__(self):
         self.data = {}
 
+    @classmethod
+    def chain(cls, *datasets: "DataSet") -> "DataSet":
+        """複数の DataSet を重ねた DataSet の作成
+        後ろの DataSet ほど優先する (merge を順に呼んだ場合と同じ)。
+        中身はコピーせず元の DataSet を参照する。put() は新しい最上位の層に書き込むため元の DataSet は変更されない。
+
+        Args:
+            datasets (DataSet): 重ねる DataSet (None は無視する)
+
+        Returns:
+            DataSet: 重ねた DataSet
+        """
+        layers = []
+        seen = set()
+        for ds in reversed(datasets):
+            if not ds:
+                continue
+            maps = ds.data.maps if isinstance(ds.data, collections.ChainMap) else [ds.data]
+            for m in maps:
+                if id(m) not in seen and m:
+                    seen.add(id(m))
+                    layers.append(m)
+
+        if len(layers) > cls.MAX_LAYERS:
+            layers = [dict(collections.ChainMap(*layers))]
+
+        r = cls()
+        r.data = collections.ChainMap({}, *layers)
+        return r
+
     def put(self, name: str, d: Data) -> "DataSet":
         self.data[name] = d
         return self
@@ -25,14 +70,83 @@ class DataSet:
                 self.data[k] = v
         return self
 
-    def save_all(self):
+    def save_all(
+        self, max_workers: int = None, repository_limits: Dict[type, int] = None, raise_on_error: bool = True
+    ) -> Dict[str, SaveResult]:
+        """全 Data の保存
+        失敗した Data があっても残りの保存は続け、全ての保存が終わってからエラーを送出する。
+        batch_save なリポジトリ(SqlAlchemyRepository 等)への保存はリポジトリ毎に save_many() で1回にまとめる。
+
+        Args:
+            max_workers (int, optional): 並行して保存する数。None の場合は順に保存する. Defaults to None.
+            repository_limits (Dict[type, int], optional): リポジトリのクラス→同時に保存する数の上限
+                (例: {S3FileRepository: 8, PandasDbRepository: 1}). Defaults to None.
+            raise_on_error (bool, optional): 失敗した Data があれば最初のエラーを送出する. Defaults to True.
+
+        Returns:
+            Dict[str, SaveResult]: key→保存結果 (まとめて保存した Data の elapsed はまとめた保存全体の時間)
+        """
+        # 保存単位 (key のリスト) に分ける
+        jobs = []
+        batches = {}
         for k, v in self.data.items():
-            logger.debug(f"save dataset[{k}]...")
-            v.save()
+            repo = v.repository
+            if repo is not None and getattr(repo, "batch_save", False) and type(v).save is Data.save:
+                if id(repo) not in batches:
+                    batches[id(repo)] = []
+                    jobs.append(batches[id(repo)])
+                batches[id(repo)].append(k)
+            else:
+                jobs.append([k])
+
+        limits = {}
+        for cls, n in (repository_limits or {}).items():
+            limits[cls] = threading.Semaphore(n)
+
+        def _save(keys: List[str]) -> List[SaveResult]:
+            datas = [self.data[k] for k in keys]
+            repo = datas[0].repository
+            sems = [sem for cls, sem in limits.items() if isinstance(repo, cls)]
+
+            logger.debug(f"save dataset[{','.join(keys)}]...")
+            for sem in sems:
+                sem.acquire()
+            start = time.perf_counter()
+            error = None
+            try:
+                if len(datas) > 1:
+                    repo.save_many(datas)
+                else:
+                    datas[0].save()
+            except BaseException as e:
+                logger.error(f"save dataset[{','.join(keys)}] failed. {str(e)}")
+                error = e
+            finally:
+                elapsed = time.perf_counter() - start
+                for sem in sems:
+                    sem.release()
+            return [SaveResult(k, elapsed, error) for k in keys]
+
+        if max_workers is None or max_workers <= 1 or len(jobs) <= 1:
+            saved = [_save(keys) for keys in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers) as pool:
+                saved = list(pool.map(_save, jobs))
+
+        results = {r.key: r for rs in saved for r in rs}
+        results = {k: results[k] for k in self.data.keys()}
+        if raise_on_error:
+            for r in results.values():
+                if r.error is not None:
+                    raise r.error
+        return results
 
     def apply(self, task) -> "DataSet":
         return task.main(self)
 
+    def __contains__(self, name: str) -> bool:
+        return name in self.data
+
     def __str__(self) -> str:
         keys = ",".join(self.keys())
         return f"DataSet({keys})"
@@ -0,0 +1,5 @@
+# flake8: noqa: F401
+
+from .socket_executor import SocketExecutor as SocketExecutor
+from .worker import serve as serve
+from .worker import start_worker as start_worker
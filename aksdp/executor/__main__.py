@@ -0,0 +1,22 @@
+"""ソケットワーカーの起動
+
+共有鍵は環境変数 AKSDP_WORKER_AUTHKEY に16進文字列で指定する。
+
+    $ AKSDP_WORKER_AUTHKEY=... python -m aksdp.executor --host 10.0.0.5 --port 7070
+"""
+import argparse
+import os
+
+from .worker import AUTHKEY_ENV, serve
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1", help="listen address")
+    parser.add_argument("--port", type=int, default=0, help="listen port (0: any free port)")
+    args = parser.parse_args()
+
+    def ready(address):
+        print(f"listening on {address[0]}:{address[1]}", flush=True)
+
+    authkey = os.environ.get(AUTHKEY_ENV)
+    serve(args.host, args.port, ready, bytes.fromhex(authkey) if authkey else None)
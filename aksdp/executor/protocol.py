@@ -0,0 +1,103 @@
+"""ワーカーとの通信プロトコル
+
+接続直後に共有鍵による相互認証(HMAC-SHA256 のチャレンジ・レスポンス)を行い、
+認証が済むまでは受信したデータを unpickle しない。
+
+メッセージは 8byte(ビッグエンディアン)の長さヘッダに pickle したオブジェクトを続けたもの。
+リクエストは (fn, args, kwargs)、レスポンスは (成功したかどうか, 戻り値または例外)。
+"""
+from multiprocessing import AuthenticationError
+from typing import Optional
+import hashlib
+import hmac
+import os
+import pickle
+import socket
+import struct
+
+_HEADER = struct.Struct("!Q")
+_NONCE_SIZE = 32
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+# 認証を済ませるまでの待ち時間(秒)
+HANDSHAKE_TIMEOUT = 10.0
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(min(size - len(buf), 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("connection closed by peer")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def _digest(authkey: Optional[bytes], role: bytes, nonce: bytes) -> bytes:
+    return hmac.new(authkey or b"", role + nonce, hashlib.sha256).digest()
+
+
+def server_handshake(sock: socket.socket, authkey: Optional[bytes]):
+    """ワーカー側の認証 (接続元が同じ鍵を持っていることを確認し、ワーカーも鍵を持っていることを示す)
+
+    Args:
+        sock (socket.socket): 接続元ソケット
+        authkey (Optional[bytes]): 共有鍵。None の場合は空の鍵として扱う
+
+    Raises:
+        AuthenticationError: 接続元の鍵が一致しない
+    """
+    nonce = os.urandom(_NONCE_SIZE)
+    sock.sendall(nonce)
+
+    reply = _recv_exact(sock, _DIGEST_SIZE + _NONCE_SIZE)
+    if not hmac.compare_digest(reply[:_DIGEST_SIZE], _digest(authkey, b"client", nonce)):
+        raise AuthenticationError("digest received was wrong")
+    sock.sendall(_digest(authkey, b"server", reply[_DIGEST_SIZE:]))
+
+
+def client_handshake(sock: socket.socket, authkey: Optional[bytes]):
+    """接続元側の認証 (server_handshake と対になる)
+
+    Args:
+        sock (socket.socket): ワーカーへのソケット
+        authkey (Optional[bytes]): 共有鍵。None の場合は空の鍵として扱う
+
+    Raises:
+        AuthenticationError: ワーカーの鍵が一致しない
+    """
+    challenge = _recv_exact(sock, _NONCE_SIZE)
+    nonce = os.urandom(_NONCE_SIZE)
+    sock.sendall(_digest(authkey, b"client", challenge) + nonce)
+
+    try:
+        reply = _recv_exact(sock, _DIGEST_SIZE)
+    except ConnectionError:
+        # 鍵が一致しない場合、ワーカーは応答せずに切断する
+        raise AuthenticationError("connection closed during authentication, authkey may be wrong")
+    if not hmac.compare_digest(reply, _digest(authkey, b"server", nonce)):
+        raise AuthenticationError("digest received was wrong")
+
+
+def send_message(sock: socket.socket, obj):
+    """メッセージの送信
+
+    Args:
+        sock (socket.socket): 送信先ソケット
+        obj (Any): 送信するオブジェクト
+    """
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock: socket.socket):
+    """メッセージの受信
+
+    Args:
+        sock (socket.socket): 受信元ソケット
+
+    Returns:
+        Any: 受信したオブジェクト
+    """
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return pickle.loads(_recv_exact(sock, size))
@@ -0,0 +1,133 @@
+from concurrent.futures import Executor, Future
+from logging import getLogger
+from typing import List, Optional, Tuple
+from .protocol import HANDSHAKE_TIMEOUT, client_handshake, recv_message, send_message
+import queue
+import socket
+import threading
+
+logger = getLogger(__name__)
+
+
+class SocketExecutor(Executor):
+    """ソケットで接続したワーカー(aksdp.executor.worker)で関数を実行する Executor
+
+    ワーカーごとに slots 本の接続を張り、空いている接続から順に投入された関数を送る。
+    ConcurrentGraph/ProcessGraph の executor として使用できる。
+    ProcessGraph と組み合わせると、Task と入力DataSetのみを転送し出力DataSetのみを受け取る。
+    接続ごとにワーカーと共有鍵で相互認証し、認証できないワーカーの応答は unpickle しない。
+    """
+
+    def __init__(
+        self,
+        addresses: List[Tuple[str, int]],
+        slots: int = 1,
+        timeout: float = None,
+        authkey: Optional[bytes] = None,
+    ):
+        """.ctor
+
+        Args:
+            addresses (List[Tuple[str, int]]): ワーカーのアドレス (host, port) のリスト
+            slots (int, optional): ワーカーごとの同時実行数. Defaults to 1.
+            timeout (float, optional): 接続・通信のタイムアウト秒. Defaults to None.
+            authkey (Optional[bytes], optional): ワーカーと共有する認証鍵. Defaults to None.
+        """
+        if not addresses:
+            raise ValueError("addresses is empty")
+
+        self.addresses = [(h, int(p)) for h, p in addresses]
+        self.timeout = timeout
+        self.authkey = authkey
+        self._max_workers = len(self.addresses) * slots
+        self._queue = queue.Queue()
+        self._shutdown = False
+        self._shutdown_lock = threading.Lock()
+
+        self._threads = []
+        for address in self.addresses:
+            for _ in range(slots):
+                t = threading.Thread(target=self._slot, args=(address,), daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _connect(self, address: Tuple[str, int]) -> socket.socket:
+        sock = socket.create_connection(address, timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            sock.settimeout(self.timeout or HANDSHAKE_TIMEOUT)
+            client_handshake(sock, self.authkey)
+            sock.settimeout(self.timeout)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _slot(self, address: Tuple[str, int]):
+        """ワーカーへの接続1本分の送受信ループ
+
+        Args:
+            address (Tuple[str, int]): ワーカーのアドレス
+        """
+        sock = None
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if sock is None:
+                    sock = self._connect(address)
+                send_message(sock, (fn, args, kwargs))
+                ok, result = recv_message(sock)
+            except BaseException as e:
+                # 通信エラーの場合は次の実行時に再接続する
+                logger.warning(f"worker({address[0]}:{address[1]}) communication failed. {str(e)}")
+                if sock is not None:
+                    sock.close()
+                    sock = None
+                future.set_exception(e)
+                continue
+
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+        if sock is not None:
+            sock.close()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        with self._shutdown_lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+
+            f = Future()
+            self._queue.put((f, fn, args, kwargs))
+            return f
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        with self._shutdown_lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+
+            if cancel_futures:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        item[0].cancel()
+
+            for _ in self._threads:
+                self._queue.put(None)
+
+        if wait:
+            for t in self._threads:
+                t.join()
@@ -0,0 +1,127 @@
+"""ソケットワーカー
+
+SocketExecutor から送られた関数を実行して結果を返す。
+タスクのクラスは pickle で参照渡しされるため、ワーカー側でも同じモジュールを import できること。
+
+受信した関数はそのまま実行するため、接続元は共有鍵で認証する。
+鍵は環境変数 AKSDP_WORKER_AUTHKEY で渡す(コマンドライン引数は他のユーザーからも見えるため使わない)。
+鍵を設定しない場合はループバックアドレスでしか待ち受けできない。
+
+    $ AKSDP_WORKER_AUTHKEY=... python -m aksdp.executor --host 10.0.0.5 --port 7070
+"""
+from logging import getLogger
+from multiprocessing import AuthenticationError
+from typing import Optional, Tuple
+from .protocol import HANDSHAKE_TIMEOUT, recv_message, send_message, server_handshake
+import ipaddress
+import os
+import pickle
+import socket
+import socketserver
+import subprocess
+import sys
+
+logger = getLogger(__name__)
+
+# 共有鍵を渡す環境変数
+AUTHKEY_ENV = "AKSDP_WORKER_AUTHKEY"
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        # 認証が済むまでは何も unpickle しない
+        try:
+            self.request.settimeout(HANDSHAKE_TIMEOUT)
+            server_handshake(self.request, self.server.authkey)
+            self.request.settimeout(None)
+        except (AuthenticationError, ConnectionError, socket.timeout) as e:
+            logger.warning(f"authentication failed, client={self.client_address}. {str(e)}")
+            return
+
+        # 1接続で複数のリクエストを順に処理する
+        while True:
+            try:
+                fn, args, kwargs = recv_message(self.request)
+            except ConnectionError:
+                return
+
+            try:
+                reply = (True, fn(*args, **kwargs))
+            except BaseException as e:
+                reply = (False, e)
+
+            try:
+                send_message(self.request, reply)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                send_message(self.request, (False, RuntimeError(f"result is not serializable, {str(e)}")))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, ready=None, authkey: Optional[bytes] = None):
+    """ワーカーの起動(終了するまで戻らない)
+
+    Args:
+        host (str, optional): 待ち受けアドレス. Defaults to "127.0.0.1".
+        port (int, optional): 待ち受けポート。0 の場合は空きポート. Defaults to 0.
+        ready (Callable, optional): 待ち受け開始時に (host, port) を渡して呼ぶ関数. Defaults to None.
+        authkey (Optional[bytes], optional): 接続元の認証に使う共有鍵. Defaults to None.
+
+    Raises:
+        ValueError: 鍵を設定せずにループバック以外のアドレスで待ち受けようとした
+    """
+    with _Server((host, port), _Handler) as server:
+        address = server.server_address[:2]
+        if not authkey and not _is_loopback(address[0]):
+            raise ValueError(f"authkey is required to listen on non-loopback address {address[0]}")
+        server.authkey = authkey
+        logger.info(f"worker listening on {address[0]}:{address[1]}")
+        if ready:
+            ready(address)
+        server.serve_forever()
+
+
+def start_worker(
+    host: str = "127.0.0.1", port: int = 0, authkey: Optional[bytes] = None, **popen_kwargs
+) -> Tuple[subprocess.Popen, Tuple[str, int]]:
+    """ワーカーを別プロセスで起動する
+
+    Args:
+        host (str, optional): 待ち受けアドレス. Defaults to "127.0.0.1".
+        port (int, optional): 待ち受けポート。0 の場合は空きポート. Defaults to 0.
+        authkey (Optional[bytes], optional): 接続元の認証に使う共有鍵. Defaults to None.
+        popen_kwargs: subprocess.Popen に渡す引数 (env, cwd 等)
+
+    Returns:
+        Tuple[subprocess.Popen, Tuple[str, int]]: ワーカープロセスと待ち受けアドレス
+    """
+    env = dict(popen_kwargs.pop("env", None) or os.environ)
+    env.pop(AUTHKEY_ENV, None)
+    if authkey:
+        env[AUTHKEY_ENV] = authkey.hex()
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "aksdp.executor", "--host", host, "--port", str(port)],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        env=env,
+        **popen_kwargs,
+    )
+
+    line = proc.stdout.readline()
+    if not line:
+        proc.wait()
+        raise RuntimeError(f"worker exited. (returncode={proc.returncode})")
+
+    h, p = line.split()[-1].rsplit(":", 1)
+    return proc, (h, int(p))
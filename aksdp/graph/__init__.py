@@ -3,5 +3,13 @@
 from .graph import Graph as Graph
 from .graph_task import TaskStatus as TaskStatus
 from .graph_task import GraphTask as GraphTask
+from .checkpoint import Checkpoint as Checkpoint
+from .scheduler import SchedulePolicy as SchedulePolicy
+from .scheduler import FifoPolicy as FifoPolicy
+from .scheduler import CriticalPathPolicy as CriticalPathPolicy
+from .resource_pool import ResourcePool as ResourcePool
 from .concurrent_graph import ConcurrentGraph as ConcurrentGraph
 from .debug_graph import DebugGraph as DebugGraph
+from .process_graph import ProcessGraph as ProcessGraph
+from .async_graph import AsyncGraph as AsyncGraph
+from .streaming_graph import StreamingGraph as StreamingGraph
@@ -0,0 +1,107 @@
+from logging import getLogger
+from aksdp.graph import Graph, TaskStatus, GraphTask
+from aksdp.dataset import DataSet
+from typing import List, Union
+import asyncio
+
+logger = getLogger(__name__)
+
+
+class AsyncGraph(Graph):
+    """イベントループ上でタスクを実行するGraph
+
+    main がコルーチンのタスクはイベントループ上で実行し、
+    それ以外のタスクは executor(省略時はイベントループのデフォルト executor)で実行する。
+    """
+
+    def __init__(
+        self, executor=None, catalog_ds: DataSet = None, disable_dynamic_dep: bool = False, max_concurrency: int = None
+    ):
+        """.ctor
+
+        Args:
+            executor (Executor, optional): 同期タスクの実行に使う executor. Defaults to None.
+            catalog_ds (DataSet, optional): カタログDataSet. Defaults to None.
+            disable_dynamic_dep (bool, optional): 動的依存解決の無効化. Defaults to False.
+            max_concurrency (int, optional): 同時実行タスク数の上限. Defaults to None.
+        """
+        super().__init__(catalog_ds, disable_dynamic_dep=disable_dynamic_dep)
+        self.pool = executor
+        self.max_concurrency = max_concurrency
+
+    async def _run_async(self, graph_task: GraphTask, input_ds: DataSet, semaphore: asyncio.Semaphore) -> GraphTask:
+        """タスクの起動
+
+        Args:
+            graph_task (GraphTask): 起動するタスク
+            input_ds (DataSet): 入力DataSet
+            semaphore (asyncio.Semaphore): 同時実行数制限
+
+        Returns:
+            GraphTask: 実行後のGraphTask
+        """
+        if semaphore:
+            async with semaphore:
+                return await self._run_async(graph_task, input_ds, None)
+
+        if asyncio.iscoroutinefunction(graph_task.task.main):
+            return await graph_task.run_async(input_ds)
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.pool, graph_task.run, input_ds)
+
+    async def run_async(self, ds: DataSet = None, targets: List[Union[str, GraphTask]] = None) -> DataSet:
+        """Graphの実行(コルーチン)
+
+        Args:
+            ds (DataSet, optional): デフォルトDataSet. Defaults to None.
+            targets (List[Union[str, GraphTask]], optional): 必要なデータkey・タスク. Defaults to None.
+
+        Returns:
+            DataSet: 最後に完了したタスクの出力DataSet
+        """
+        last_ds = ds
+        self.abort = False
+        futures = {}
+        self._begin_run(targets)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+
+        try:
+            while not self.abort:
+                for t in self.runnable_tasks():
+                    input_ds = self._make_task_inputs(t, ds)
+                    t.input_ds = input_ds
+                    t.status = TaskStatus.RUNNING
+                    futures[asyncio.ensure_future(self._run_async(t, input_ds, semaphore))] = t
+
+                if not futures:
+                    logger.debug("no runnables tasks, exit")
+                    break
+
+                done, _ = await asyncio.wait(futures.keys(), return_when=asyncio.FIRST_COMPLETED)
+
+                for f in done:
+                    gt = futures.pop(f)
+                    try:
+                        f.result()
+                        last_ds = gt.output_ds
+                        self._task_completed(gt)
+                    except BaseException as e:
+                        if not self._handle_error(gt, gt.input_ds, e):
+                            raise
+        finally:
+            # 中断時に残ったタスクはイベントループと共に破棄されるためキャンセルしておく
+            for f in futures:
+                f.cancel()
+            if futures:
+                await asyncio.wait(futures.keys())
+
+        return self._end_run(last_ds, ds)
+
+    def run(self, ds: DataSet = None, targets: List[Union[str, GraphTask]] = None) -> DataSet:
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.run_async(ds, targets))
+        finally:
+            loop.close()
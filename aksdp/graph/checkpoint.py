@@ -0,0 +1,163 @@
+from aksdp.dataset import DataSet
+from logging import getLogger
+from pathlib import Path
+from typing import Dict, Optional
+from .graph_task import GraphTask, TaskStatus
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+logger = getLogger(__name__)
+
+
+class Checkpoint:
+    """Graph 実行状態のチェックポイント
+
+    完了したタスクの出力DataSetと状態をタスクごとに pickle で保存し、
+    次回実行時に完了済みタスクを復元して未実行(INIT)・エラー(ERROR)のタスクのみ実行する。
+    タスクは Graph への追加順・クラス名と、パラメータ・カタログ入力のハッシュで識別するため、
+    パラメータや入力データを変えて実行した場合は該当タスクとその後続を再実行する。
+    全タスクが完了した時点で Graph がチェックポイントを削除する。
+    """
+
+    def __init__(self, base_dir: Path):
+        """.ctor
+
+        Args:
+            base_dir (Path): チェックポイントの保存先ディレクトリ
+        """
+        self.base_dir = Path(base_dir)
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def task_id(self, index: int, gt: GraphTask, catalog_ds: DataSet = None) -> str:
+        """タスクの識別子
+
+        Args:
+            index (int): Graph 内での位置
+            gt (GraphTask): タスク
+            catalog_ds (DataSet, optional): カタログDataSet. Defaults to None.
+
+        Returns:
+            str: 識別子
+        """
+        task_id = f"{index:05d}_{gt.task.__class__.__name__}"
+        fingerprint = self.fingerprint(gt, catalog_ds)
+        return f"{task_id}_{fingerprint[:16]}" if fingerprint else task_id
+
+    def fingerprint(self, gt: GraphTask, catalog_ds: DataSet = None) -> Optional[str]:
+        """タスクのパラメータと、input_datakeys() で宣言したカタログ入力のハッシュ
+        依存タスクの出力は、依存タスクが再実行された場合に後続も再実行することで反映する
+
+        Args:
+            gt (GraphTask): タスク
+            catalog_ds (DataSet, optional): カタログDataSet. Defaults to None.
+
+        Returns:
+            Optional[str]: ハッシュ。パラメータがシリアライズできない場合 None
+        """
+        h = hashlib.sha256()
+        try:
+            h.update(json.dumps(gt.task.params, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        except (TypeError, ValueError):
+            return None
+
+        keys = set(catalog_ds.keys()) if catalog_ds else set()
+        for k in sorted(keys & set(gt.task.input_datakeys())):
+            d = catalog_ds.get(k)
+            digest = d.content_hash()
+            if digest is None:
+                # ハッシュ化できない入力は変更を検知できないため、キー名のみ反映する
+                h.update(k.encode("utf-8") + b"\0")
+                continue
+            h.update(k.encode("utf-8"))
+            h.update(d.data_type.name.encode("utf-8"))
+            h.update(digest)
+
+        return h.hexdigest()
+
+    def _path(self, task_id: str) -> Path:
+        return self.base_dir / f"{task_id}.pkl"
+
+    def save(self, task_id: str, gt: GraphTask):
+        """タスクの状態の保存
+
+        Args:
+            task_id (str): タスクの識別子
+            gt (GraphTask): タスク
+        """
+        record = {"status": gt.status.name, "task_state": None, "output_ds": None}
+        if gt.status == TaskStatus.COMPLETED:
+            record["task_state"] = gt.task.__getstate__()
+            record["output_ds"] = gt.output_ds
+
+        try:
+            data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            try:
+                # タスクの状態が pickle できない場合は出力のみ保存する
+                record["task_state"] = None
+                data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException as e:
+                logger.warning(f"checkpoint save failed, task({task_id}) will be rerun. {str(e)}")
+                return
+
+        fd, tmp = tempfile.mkstemp(dir=self.base_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(task_id))
+
+    def restore(self, graph, task_ids: Dict[GraphTask, str] = None) -> int:
+        """保存した状態の復元
+        完了済みのタスクは出力DataSetと状態を戻し、エラー・取り消しのタスクは再実行できるよう INIT に戻す。
+        依存タスクが完了していない(再実行する)タスクは復元しない。
+
+        Args:
+            graph (Graph): 復元先のGraph
+            task_ids (Dict[GraphTask, str], optional): タスクの識別子. Defaults to None.
+
+        Returns:
+            int: 復元した完了済みタスク数
+        """
+        if task_ids is None:
+            task_ids = {gt: self.task_id(i, gt, graph.catalog_ds) for i, gt in enumerate(graph.graph)}
+
+        restored = 0
+        for gt in graph.graph:
+            if gt.status in (TaskStatus.ERROR, TaskStatus.CANCELLED):
+                gt.status = TaskStatus.INIT
+            if gt.status != TaskStatus.INIT:
+                continue
+            if not all([d.status == TaskStatus.COMPLETED for d in gt.dependencies_static]):
+                continue
+
+            path = self._path(task_ids[gt])
+            if not path.exists():
+                continue
+
+            try:
+                with open(path, "rb") as f:
+                    record = pickle.load(f)
+            except BaseException as e:
+                logger.warning(f"checkpoint load failed, {str(e)}")
+                continue
+
+            if record["status"] != TaskStatus.COMPLETED.name:
+                continue
+
+            if record["task_state"]:
+                gt.task.__dict__.update(record["task_state"])
+            gt.output_ds = record["output_ds"]
+            gt.status = TaskStatus.COMPLETED
+            restored += 1
+
+        logger.info(f"restored {restored} completed tasks from checkpoint({str(self.base_dir)})")
+        return restored
+
+    def clear(self):
+        """チェックポイントの全削除
+        """
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+        os.makedirs(self.base_dir, exist_ok=True)
@@ -1,65 +1,454 @@
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from logging import getLogger
 from aksdp.graph import Graph, TaskStatus, GraphTask
 from aksdp.dataset import DataSet
+from aksdp.task import TaskCancelledError, TaskTimeoutError
+from typing import Any, Dict, List, Optional, Union
+from .scheduler import SchedulePolicy
+from .resource_pool import ResourcePool
+import threading
 import time
 
+try:
+    from aksdp.task import PartitionedTask
+except ImportError:
+    PartitionedTask = None
+
 
 logger = getLogger(__name__)
 
 
+class _PartitionsFuture(Future):
+    """PartitionedTask の全部分の終了を表す Future
+
+    部分の実行中でも abandon() で結果を待たずに終了させられる。
+    取り消し・abandon() を含めて終了すると、まだ始まっていない部分を取り消す。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[Future] = []
+        self.lock = threading.RLock()
+        self.add_done_callback(self._cancel_parts)
+
+    def _cancel_parts(self, _):
+        for f in self.parts:
+            f.cancel()
+
+    def abandon(self, e: BaseException) -> bool:
+        """部分の終了を待たずに例外で終了させる
+
+        Args:
+            e (BaseException): 設定する例外
+
+        Returns:
+            bool: 終了させた場合 True (既に終了していれば False)
+        """
+        with self.lock:
+            if self.done():
+                return False
+            self.set_exception(e)
+            return True
+
+
 class ConcurrentGraph(Graph):
-    def __init__(self, executor=None, catalog_ds: DataSet = DataSet(), disable_dynamic_dep: bool = False):
+    def __init__(
+        self,
+        executor=None,
+        catalog_ds: DataSet = DataSet(),
+        disable_dynamic_dep: bool = False,
+        policy: SchedulePolicy = None,
+        max_inflight: int = None,
+        resources: Dict[str, Any] = None,
+        task_timeout: float = None,
+    ):
+        """.ctor
+
+        Args:
+            executor (Executor, optional): タスクを実行する executor. Defaults to None.
+            catalog_ds (DataSet, optional): カタログDataSet. Defaults to DataSet().
+            disable_dynamic_dep (bool, optional): 動的依存解決の無効化. Defaults to False.
+            policy (SchedulePolicy, optional): タスクの投入順を決めるポリシー. Defaults to None.
+            max_inflight (int, optional): executor に同時に投入するタスク数の上限.
+                policy 指定時の既定値は executor のワーカー数. Defaults to None.
+            resources (Dict[str, Any], optional): 同時実行タスクが使用できるリソースの容量
+                (例: {"cpu": 8, "memory": "32GB"}). Defaults to None.
+            task_timeout (float, optional): Task.timeout() を指定していないタスクの制限時間(秒). Defaults to None.
+        """
         super().__init__(catalog_ds, disable_dynamic_dep=disable_dynamic_dep)
 
         self.pool = executor
         if self.pool is None:
             self.pool = ThreadPoolExecutor()
 
+        self.policy = policy
+        self.max_inflight = max_inflight
+        if self.max_inflight is None and self.policy is not None:
+            # 投入済みのタスクは順番を変えられないので、ワーカー数分だけ投入して残りは優先順に待たせる
+            self.max_inflight = getattr(self.pool, "_max_workers", None)
+
+        self.resource_pool = ResourcePool(resources) if resources else None
+        self._acquired = {}
+        # リソース不足で投入を見送った最も優先度の高いタスク
+        self._blocked = None
+
+        self.task_timeout = task_timeout
+        self._started: Dict[Future, float] = {}
+        self._wakeup = Future()
+        self._wakeup_lock = threading.Lock()
+
     def _run(self, graph_task: GraphTask, input_ds: DataSet):
+        if PartitionedTask is not None and isinstance(graph_task.task, PartitionedTask):
+            return self._run_partitioned(graph_task, input_ds)
+
         # ProcessPoolを使用した場合、 GraphTask.run() 内でのアトリビュート更新が効かないので外から操作する
         graph_task.input_ds = input_ds
         graph_task.status = TaskStatus.RUNNING
         r = self.pool.submit(graph_task.run, input_ds)
         return r
 
-    def run(self, ds: DataSet = None):
+    def _submit_partition(self, graph_task: GraphTask, ds: DataSet) -> Future:
+        """分割した1つの部分を executor に投入する
+
+        Args:
+            graph_task (GraphTask): 実行する PartitionedTask
+            ds (DataSet): 部分の入力DataSet
+
+        Returns:
+            Future: 部分の出力DataSetを返す Future
+        """
+        return self.pool.submit(graph_task.task.run_partition, ds)
+
+    def _partition_output(self, graph_task: GraphTask, future: Future) -> DataSet:
+        """終了した部分の出力DataSetの取得
+
+        Args:
+            graph_task (GraphTask): 実行した PartitionedTask
+            future (Future): _submit_partition() が返した Future
+
+        Returns:
+            DataSet: 部分の出力DataSet
+        """
+        return future.result()
+
+    def _run_partitioned(self, graph_task: GraphTask, input_ds: DataSet) -> Future:
+        """PartitionedTask の実行
+        入力を分割して部分ごとに executor に投入し、全部分の終了後に出力を連結して完了させる。
+        状態遷移とフックは親側で行うため、返す Future の結果は None (完了済み)となる。
+
+        Args:
+            graph_task (GraphTask): 実行する PartitionedTask
+            input_ds (DataSet): 入力DataSet
+
+        Returns:
+            Future: 全部分の終了を表す Future
+        """
+        combined = _PartitionsFuture()
+        try:
+            graph_task.prepare(input_ds)
+
+            output_ds = graph_task.load_cache(input_ds)
+            if output_ds is not None:
+                graph_task.complete(output_ds)
+                combined.set_result(None)
+                return combined
+
+            parts = graph_task.task.split(input_ds)
+        except BaseException as e:
+            graph_task.fail(e)
+            combined.set_exception(e)
+            return combined
+
+        start = time.time()
+        lock = threading.Lock()
+        remaining = [len(parts)]
+
+        def _done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    return
+
+            # 取り消し・制限時間切れで切り離された後は、タスクの状態を変えない
+            if combined.done():
+                return
+
+            try:
+                output_ds = graph_task.task.merge([self._partition_output(graph_task, f) for f in futures])
+                graph_task.task._elapsed_time = time.time() - start
+                graph_task.record_span("main", start)
+                graph_task.save_cache(output_ds)
+                error = None
+            except BaseException as e:
+                error = e
+
+            with combined.lock:
+                if combined.done():
+                    return
+                if error is None:
+                    graph_task.complete(output_ds)
+                    combined.set_result(None)
+                else:
+                    graph_task.fail(error)
+                    combined.set_exception(error)
+
+        logger.debug(f"task({graph_task.task.__class__.__name__}) split into {len(parts)} partitions.")
+        futures = [self._submit_partition(graph_task, p) for p in parts]
+        combined.parts = futures
+        combined.set_running_or_notify_cancel()
+        for f in futures:
+            f.add_done_callback(_done)
+        return combined
+
+    def _collect(self, graph_task: GraphTask, future: Future):
+        """終了した Future の結果を GraphTask に反映する
+
+        Args:
+            graph_task (GraphTask): 実行したタスク
+            future (Future): 実行結果
+        """
+        rgt = future.result()
+        if rgt is None:
+            # 親側で完了済み(PartitionedTask)
+            return
+
+        if rgt is not graph_task:
+            # ProcessPool の場合は別プロセスで更新された結果を元の GraphTask に書き戻す
+            graph_task.task = rgt.task
+            graph_task.output_ds = rgt.output_ds
+            graph_task.status = rgt.status
+
+    def _next_tasks(self, inflight: int) -> List[GraphTask]:
+        """今回 executor に投入するタスクの選択
+
+        Args:
+            inflight (int): 実行中のタスク数
+
+        Returns:
+            List[GraphTask]: 投入するタスク
+        """
+        tasks = self.runnable_tasks()
+        if self.policy:
+            tasks = self.policy.order(tasks)
+
+        selected = []
+        blocked = None
+        for t in tasks:
+            if self.max_inflight and inflight + len(selected) >= self.max_inflight:
+                break
+
+            if self.resource_pool:
+                req = t.task.resources()
+                if not self.resource_pool.fits(req):
+                    if t is self._blocked:
+                        # 前回も投入できなかったタスクは、後ろのタスクで埋め続けると永久に待つため、
+                        # 以降は投入せずに空いたリソースを確保しておく
+                        blocked = t
+                        break
+                    # リソースが足りないタスクは飛ばし、後ろの小さいタスクを先に投入する
+                    blocked = blocked if blocked else t
+                    continue
+                self.resource_pool.acquire(req)
+                self._acquired[t] = req
+
+            selected.append(t)
+
+        self._blocked = blocked
+        return selected
+
+    def _release(self, graph_task: GraphTask):
+        """タスクが確保したリソースの解放
+
+        Args:
+            graph_task (GraphTask): 終了したタスク
+        """
+        req = self._acquired.pop(graph_task, None)
+        if req is not None:
+            self.resource_pool.release(req)
+
+    def _timeout_of(self, graph_task: GraphTask) -> Optional[float]:
+        timeout = graph_task.task.timeout()
+        return timeout if timeout is not None else self.task_timeout
+
+    def _watch_start(self, future: Future):
+        """制限時間の計測のため、executor が Future の実行を始めた時刻を記録する
+        concurrent.futures には実行開始の通知が無いため、executor が呼ぶ set_running_or_notify_cancel() を差し替える
+
+        Args:
+            future (Future): 制限時間付きのタスクの Future
+        """
+        set_running = future.set_running_or_notify_cancel
+
+        def set_running_or_notify_cancel() -> bool:
+            if not set_running():
+                return False
+            self._notify_started(future)
+            return True
+
+        future.set_running_or_notify_cancel = set_running_or_notify_cancel
+        if future.running() or future.done():
+            # 差し替える前に実行が始まっていた
+            self._notify_started(future)
+
+    def _notify_started(self, future: Future):
+        self._started.setdefault(future, time.time())
+
+        # 待機中の run() を起こして、次に制限時間を迎えるまでの待ち時間を計算し直させる
+        with self._wakeup_lock:
+            if not self._wakeup.done():
+                self._wakeup.set_result(None)
+
+    def _wait_timeout(self, features: Dict[Future, GraphTask]) -> Optional[float]:
+        """実行中の制限時間付きのタスクがあれば、次に制限時間を迎えるまでの待ち時間を求める
+        制限時間は executor で実行が始まってからの時間とする。実行開始前のタスクは開始時に run() が起こされるので含めない
+
+        Args:
+            features (Dict[Future, GraphTask]): 実行中の Future
+
+        Returns:
+            Optional[float]: 待ち時間。実行中の制限時間付きのタスクが無ければ None
+        """
+        now = time.time()
+        timeout = None
+        for f, gt in features.items():
+            start = self._started.get(f)
+            limit = self._timeout_of(gt)
+            if start is None or limit is None:
+                continue
+
+            remain = max(0.0, start + limit - now)
+            timeout = min(timeout, remain) if timeout is not None else remain
+        return timeout
+
+    def _expire(self, features: Dict[Future, GraphTask]) -> List[tuple]:
+        """制限時間を超えたタスクを取り消す
+        実行中のスレッド・プロセスは止められないので、取り消しを通知して結果を待たずに切り離す
+
+        Args:
+            features (Dict[Future, GraphTask]): 実行中の Future
+
+        Returns:
+            List[tuple]: 制限時間を超えたタスクと TaskTimeoutError
+        """
+        now = time.time()
+        expired = []
+        for f, gt in list(features.items()):
+            start = self._started.get(f)
+            limit = self._timeout_of(gt)
+            if start is None or limit is None or f.done() or now < start + limit:
+                continue
+
+            features.pop(f)
+            self._started.pop(f, None)
+            self._release(gt)
+            e = TaskTimeoutError(f"task({gt.task.__class__.__name__}) timed out after {limit}s")
+            self._abandon(f, e)
+            if gt.task._cancel_token is not None:
+                gt.task._cancel_token.cancel(f"timeout ({limit}s)")
+
+            gt.fail(e)
+            expired.append((gt, e))
+        return expired
+
+    def _abandon(self, future: Future, e: BaseException) -> bool:
+        """結果を待たずに Future を切り離す
+        実行待ちであれば取り消す。PartitionedTask は実行待ちの部分を取り消し、以降に部分が終了しても完了させない
+
+        Args:
+            future (Future): 切り離す Future
+            e (BaseException): PartitionedTask の Future に設定する例外
+
+        Returns:
+            bool: 取り消した場合 True (実行中の場合は False)
+        """
+        if future.cancel():
+            return True
+        if isinstance(future, _PartitionsFuture):
+            return future.abandon(e)
+        return False
+
+    def _cancel_inflight(self, features: Dict[Future, GraphTask]):
+        """実行中・実行待ちのタスクの取り消し
+        実行待ちの Future は取り消し、実行中のタスクには CancellationToken で取り消しを通知する
+
+        Args:
+            features (Dict[Future, GraphTask]): 実行中の Future
+        """
+        self.cancel_token.cancel("graph aborted")
+
+        pending = 0
+        for f, gt in features.items():
+            self._release(gt)
+            if self._abandon(f, TaskCancelledError("graph aborted")):
+                gt.status = TaskStatus.CANCELLED
+                pending += 1
+        self._started = {}
+
+        logger.info(f"cancelled {pending} pending tasks, notified {len(features) - pending} running tasks.")
+
+    def run(self, ds: DataSet = None, targets: List[Union[str, GraphTask]] = None):
         last_ds = ds
         self.abort = False
-        features = []
+        features = {}
+        self._started = {}
+        self._begin_run(targets)
+        if self.policy:
+            self.policy.prepare(self)
+        if self.resource_pool:
+            self.resource_pool.reset()
+            self._acquired = {}
+            self._blocked = None
 
-        while not self.abort:
-            tasks = self.runnable_tasks()
+        try:
+            while not self.abort:
+                for t in self._next_tasks(len(features)):
+                    input_ds = self._make_task_inputs(t, ds)
+                    f = self._run(t, input_ds)
+                    features[f] = t
+                    if self._timeout_of(t) is not None:
+                        self._watch_start(f)
 
-            for t in tasks:
-                input_ds = self._make_task_inputs(t, ds)
-                features.append((t, self._run(t, input_ds)))
+                if not features:
+                    logger.debug("no runnables tasks, exit")
+                    break
 
-            # どれかの Feature が終わるまで待つ
-            def all_feature_running(features):
-                return all([f.running() for f in features])
+                # 待ち時間の計算前に作り直し、以降に実行が始まったタスクで起きられるようにする
+                if self._wakeup.done():
+                    self._wakeup = Future()
 
-            while all_feature_running([f[1] for f in features]):
-                time.sleep(0.1)
+                # どれかの Future が終わった時点で起き、後続タスクを即座に投入する
+                done, _ = wait(
+                    list(features.keys()) + [self._wakeup],
+                    timeout=self._wait_timeout(features),
+                    return_when=FIRST_COMPLETED,
+                )
 
-            # 終了した features の result を吸い上げ、features を更新
-            _next_featrues = []
-            for f in features:
-                if f[1].done():
+                for f in done:
+                    if f is self._wakeup:
+                        continue
+                    gt = features.pop(f)
+                    self._started.pop(f, None)
+                    self._release(gt)
                     try:
-                        # 新しく返った GraphTask で差し替え
-                        rgt = f[1].result()
-                        self.graph[self.graph.index(f[0])] = rgt
-                        last_ds = rgt.output_ds
+                        self._collect(gt, f)
+                        last_ds = gt.output_ds
+                        self._task_completed(gt)
+                    except TaskCancelledError as e:
+                        if self.cancel_token.cancelled:
+                            # cancel() による取り消しはエラーとして扱わない
+                            gt.status = TaskStatus.CANCELLED
+                        elif not self._handle_error(gt, gt.input_ds, e):
+                            raise
                     except BaseException as e:
-                        if not self._handle_error(f[0], f[0].input_ds, e):
+                        if not self._handle_error(gt, gt.input_ds, e):
                             raise
-                else:
-                    _next_featrues.append(f)
-            features = _next_featrues
 
-            if not features and not self.runnable_tasks():
-                logger.debug("no runnables tasks, exit")
-                break
+                for gt, e in self._expire(features):
+                    if not self._handle_error(gt, gt.input_ds, e):
+                        raise e
+        finally:
+            # 中断・エラー時に残ったタスクを取り消す
+            if features:
+                self._cancel_inflight(features)
 
-        return last_ds
+        return self._end_run(last_ds, ds)
@@ -0,0 +1,131 @@
+from logging import getLogger
+from aksdp.dataset import DataSet
+from typing import Dict, List, Set
+from .graph_task import GraphTask, TaskStatus
+
+logger = getLogger(__name__)
+
+
+class DataLifetime:
+    """中間データの寿命管理
+
+    タスクの出力DataSetを、静的依存と宣言された入力データkeyから求めた後続タスクが
+    全て完了した時点で手放す(release=True の場合)。
+    また、保持している出力データのメモリ使用量(最大値・現在値)を集計する。
+    """
+
+    def __init__(self, graph_tasks: List[GraphTask], catalog_ds: DataSet, release: bool = True):
+        """.ctor
+
+        Args:
+            graph_tasks (List[GraphTask]): Graph内のタスク
+            catalog_ds (DataSet): カタログDataSet (常に保持されるため集計対象外)
+            release (bool, optional): 不要になった出力を手放すかどうか. Defaults to True.
+        """
+        self.release = release
+        self.peak_bytes = 0
+        self.current_bytes = 0
+        self.released_bytes = 0
+
+        self._dependents: Dict[GraphTask, List[GraphTask]] = {}
+        self._consumers: Dict[str, List[GraphTask]] = {}
+        self._waiting: Dict[GraphTask, Set[GraphTask]] = {}
+        self._counted: Dict[GraphTask, Set[GraphTask]] = {}
+        self._held: Dict[GraphTask, List[int]] = {}
+        self._live: Dict[int, List[int]] = {}
+        self._catalog = set([id(d) for d in catalog_ds.data.values()]) if catalog_ds else set()
+
+        for gt in graph_tasks:
+            for d in gt.dependencies_static:
+                self._dependents.setdefault(d, []).append(gt)
+            for k in gt.task.input_datakeys():
+                self._consumers.setdefault(k, []).append(gt)
+
+        # チェックポイントから復元された完了済みタスク
+        for gt in graph_tasks:
+            if gt.status == TaskStatus.COMPLETED and gt.output_ds is not None:
+                self._track_output(gt)
+
+    def _track_output(self, gt: GraphTask):
+        """完了タスクの出力を集計し、出力を待っている後続タスクを記録する
+
+        Args:
+            gt (GraphTask): 完了タスク
+        """
+        ids = []
+        if gt.output_ds:
+            for d in gt.output_ds.data.values():
+                if id(d) in self._catalog:
+                    continue
+
+                # 同じ Data が複数の出力DataSetに含まれる場合は1つとして数える
+                live = self._live.get(id(d))
+                if live is None:
+                    live = [0, d.memory_usage()]
+                    self._live[id(d)] = live
+                    self.current_bytes += live[1]
+                live[0] += 1
+                ids.append(id(d))
+        self._held[gt] = ids
+        self.peak_bytes = max(self.peak_bytes, self.current_bytes)
+
+        consumers = set([c for c in self._dependents.get(gt, []) if c.status == TaskStatus.INIT])
+        for k in gt.task.output_datakeys():
+            consumers.update([c for c in self._consumers.get(k, []) if c.status == TaskStatus.INIT and c is not gt])
+
+        if consumers:
+            self._waiting[gt] = consumers
+            for c in consumers:
+                self._counted.setdefault(c, set()).add(gt)
+
+    def _release_output(self, gt: GraphTask):
+        """出力DataSetを手放す
+
+        Args:
+            gt (GraphTask): 後続タスクが全て完了したタスク
+        """
+        for i in self._held.pop(gt, []):
+            live = self._live[i]
+            live[0] -= 1
+            if live[0] == 0:
+                del self._live[i]
+                self.current_bytes -= live[1]
+                self.released_bytes += live[1]
+
+        logger.debug(f"task({gt.task.__class__.__name__}) output released.")
+        gt.output_ds = None
+
+    def completed(self, gt: GraphTask):
+        """タスク完了の通知
+
+        Args:
+            gt (GraphTask): 完了したタスク
+        """
+        if self.release:
+            gt.input_ds = None
+            gt.task._in = {}
+
+        self._track_output(gt)
+
+        for p in self._counted.pop(gt, set()):
+            waiting = self._waiting.get(p)
+            if waiting is None:
+                continue
+
+            waiting.discard(gt)
+            if not waiting:
+                del self._waiting[p]
+                if self.release:
+                    self._release_output(p)
+
+    def report(self) -> dict:
+        """メモリ使用量の集計結果
+
+        Returns:
+            dict: peak_bytes(出力データの最大保持量), retained_bytes(現在の保持量), released_bytes(手放した量)
+        """
+        return {
+            "peak_bytes": self.peak_bytes,
+            "retained_bytes": self.current_bytes,
+            "released_bytes": self.released_bytes,
+        }
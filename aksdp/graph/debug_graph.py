@@ -40,6 +40,8 @@ class DebugGraph(Graph):
                     ext = ""
                     if d.data_type == DataType.DATAFRAME:
                         ext = ".csv"
+                    if d.data_type == DataType.PARQUET:
+                        ext = ".parquet"
                     if d.data_type == DataType.JSON:
                         ext = ".json"
 
@@ -0,0 +1,174 @@
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional
+from .graph_task import GraphTask, TaskStatus
+import heapq
+
+logger = getLogger(__name__)
+
+
+class DependencyIndex:
+    """実行可能タスク判定用のインデックス
+
+    データkey→提供済みタスクの索引と、タスク毎の未解決依存数を保持し、
+    タスク完了の度に完了タスクの後続分だけを差分更新する。
+    """
+
+    def __init__(self, graph_tasks: List[GraphTask], catalog_keys: Iterable[str], dynamic: bool = True):
+        """.ctor
+
+        Args:
+            graph_tasks (List[GraphTask]): Graph内のタスク
+            catalog_keys (Iterable[str]): カタログDataSetのkey
+            dynamic (bool, optional): 動的依存解決の有無. Defaults to True.
+        """
+        self.dynamic = dynamic
+        self.size = len(graph_tasks)
+
+        self._order = {gt: i for i, gt in enumerate(graph_tasks)}
+        self._providers: Dict[str, List[GraphTask]] = {}
+        self._consumers: Dict[str, List[GraphTask]] = {}
+        self._dependents: Dict[GraphTask, List[GraphTask]] = {}
+        self._input_keys: Dict[GraphTask, List[str]] = {}
+        self._pending_static: Dict[GraphTask, int] = {}
+        self._pending_keys: Dict[GraphTask, int] = {}
+        self._completed = set()
+        self._ready = set()
+        self._heap = []
+
+        catalog_keys = set(catalog_keys)
+
+        for gt in graph_tasks:
+            if gt.status == TaskStatus.COMPLETED:
+                self._add_provider(gt)
+
+        for gt in graph_tasks:
+            # 動的依存解決が有効な場合、動的依存は実行直前に決め直すので静的依存のみ数える
+            static = list(dict.fromkeys(gt.dependencies_static if self.dynamic else gt.dependencies))
+            for d in static:
+                self._dependents.setdefault(d, []).append(gt)
+            self._pending_static[gt] = len([d for d in static if d.status != TaskStatus.COMPLETED])
+
+            keys = []
+            if self.dynamic:
+                keys = [k for k in dict.fromkeys(gt.task.input_datakeys()) if k not in catalog_keys]
+            for k in keys:
+                self._consumers.setdefault(k, []).append(gt)
+            self._input_keys[gt] = keys
+            self._pending_keys[gt] = len([k for k in keys if len(self._providers.get(k, [])) != 1])
+
+            self._update(gt)
+
+    def _add_provider(self, gt: GraphTask) -> List[str]:
+        """完了タスクを出力keyの提供元として登録する
+
+        Args:
+            gt (GraphTask): 完了タスク
+
+        Returns:
+            List[str]: 登録したkey
+        """
+        self._completed.add(gt)
+        if not self.dynamic:
+            return []
+
+        keys = list(dict.fromkeys(gt.task.output_datakeys()))
+        for k in keys:
+            self._providers.setdefault(k, []).append(gt)
+        return keys
+
+    def _update(self, gt: GraphTask):
+        """タスクの実行可能状態を更新する
+
+        Args:
+            gt (GraphTask): 対象タスク
+        """
+        if gt.status == TaskStatus.INIT and self._pending_static[gt] == 0 and self._pending_keys[gt] == 0:
+            if gt not in self._ready:
+                self._ready.add(gt)
+                heapq.heappush(self._heap, (self._order[gt], id(gt), gt))
+        else:
+            self._ready.discard(gt)
+
+    def _resolve(self, gt: GraphTask) -> GraphTask:
+        """実行直前に動的依存を確定させる
+
+        Args:
+            gt (GraphTask): 実行可能タスク
+
+        Returns:
+            GraphTask: 実行可能タスク
+        """
+        if self.dynamic:
+            gt.dependencies_dynamic = list(dict.fromkeys([self._providers[k][0] for k in self._input_keys[gt]]))
+        return gt
+
+    def completed(self, gt: GraphTask):
+        """タスク完了の通知
+
+        Args:
+            gt (GraphTask): 完了したタスク
+        """
+        if gt in self._completed:
+            return
+
+        for k in self._add_provider(gt):
+            n = len(self._providers[k])
+            if n > 2:
+                continue
+
+            # 提供元がちょうど1つになれば解決、2つ以上になれば未解決に戻る
+            delta = -1 if n == 1 else 1
+            for c in self._consumers.get(k, []):
+                self._pending_keys[c] += delta
+                self._update(c)
+
+        for c in self._dependents.get(gt, []):
+            self._pending_static[c] -= 1
+            self._update(c)
+
+    def ready_except(self, gt: GraphTask, running: Iterable[GraphTask]) -> bool:
+        """未完了の静的依存が running のタスクだけであれば、動的依存を確定させて True を返す
+        (依存元の完了を待たずに開始する StreamingGraph 用)
+
+        Args:
+            gt (GraphTask): 対象タスク
+            running (Iterable[GraphTask]): 実行中とみなすタスク
+
+        Returns:
+            bool: 開始可能かどうか
+        """
+        if gt.status != TaskStatus.INIT or self._pending_keys[gt] != 0:
+            return False
+
+        running = set(running)
+        static = gt.dependencies_static if self.dynamic else gt.dependencies
+        if not all([d in self._completed or d in running for d in static]):
+            return False
+
+        self._resolve(gt)
+        return True
+
+    def runnable(self) -> List[GraphTask]:
+        """実行可能タスクの取得(Graphへの追加順)
+
+        Returns:
+            List[GraphTask]: 実行可能タスク
+        """
+        self._ready = set([gt for gt in self._ready if gt.status == TaskStatus.INIT])
+        return [self._resolve(gt) for gt in sorted(self._ready, key=self._order.get)]
+
+    def next_runnable(self) -> Optional[GraphTask]:
+        """先頭の実行可能タスクの取得
+
+        Returns:
+            Optional[GraphTask]: 実行可能タスク。無ければ None
+        """
+        while self._heap:
+            gt = self._heap[0][2]
+            if gt in self._ready and gt.status == TaskStatus.INIT:
+                return self._resolve(gt)
+
+            heapq.heappop(self._heap)
+            if gt in self._ready and gt.status != TaskStatus.INIT:
+                self._ready.discard(gt)
+        return None
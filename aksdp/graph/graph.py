@@ -1,8 +1,14 @@
 from logging import getLogger
-from aksdp.task import Task
+from aksdp.task import Task, CancellationToken
+from aksdp.data import SpillStore
 from aksdp.dataset import DataSet
-from typing import List, Callable
+from typing import List, Callable, Union
 from .graph_task import GraphTask, TaskStatus
+from .dependency_index import DependencyIndex
+from .data_lifetime import DataLifetime
+from .resource_pool import parse_quantity
+from pathlib import Path
+import time
 
 logger = getLogger(__name__)
 
@@ -16,6 +22,28 @@ class Graph:
         self.abort = False
         self.catalog_ds = catalog_ds if catalog_ds else DataSet()
         self.disable_dynamic_dep = disable_dynamic_dep
+        # TaskCache を設定すると、入力が変わらないタスクの実行結果を再利用する
+        self.cache = None
+        # Checkpoint を設定すると、完了したタスクの出力を保存して次回実行時に再開する
+        self.checkpoint = None
+        # True にすると、後続タスクが全て完了した中間データを手放す
+        self.release_intermediates = False
+        # True にすると、保持している出力データのメモリ量を集計する (release_intermediates 時は常に集計)
+        self.track_memory = False
+        # 設定すると、出力データ(DataFrameData/RawData)の中身の合計がこの量を超えた分を spill_dir に退避する
+        # (bytes または "8GB" のような単位付き文字列)
+        self.memory_budget = None
+        # 退避先ディレクトリ (None の場合は一時ディレクトリ)
+        self.spill_dir = None
+        self._spill_store = None
+        self._index = None
+        self._task_ids = {}
+        self._restored_ds = None
+        self._lifetime = None
+        # run(targets=...) で実行対象に絞ったタスク (None は全タスク)
+        self._active = None
+        # 実行中のタスクへの取り消し通知 (run の度に作り直す)
+        self.cancel_token = CancellationToken()
 
     def append(self, task: Task, dependencies: List[GraphTask] = []) -> GraphTask:
         """Taskの追加
@@ -29,6 +57,8 @@ class Graph:
         """
         gt = GraphTask(task, dependencies)
         self.graph.append(gt)
+        self._index = None
+        self._active = None
         return gt
 
     def add_error_handler(self, cls, fn: Callable):
@@ -71,6 +101,9 @@ class Graph:
             bool: エラーハンドリングしたかどうか
         """
         graph_task.status = TaskStatus.ERROR
+        if self.checkpoint and graph_task in self._task_ids:
+            self.checkpoint.save(self._task_ids[graph_task], graph_task)
+
         for eh in self.error_handlers:
             if isinstance(e, eh[0]):
                 self.abort = True
@@ -89,74 +122,245 @@ class Graph:
         Returns:
             DataSet: 入力DataSet
         """
-        ds = DataSet()
-        ds.merge(self.catalog_ds)
+        start = time.time()
+        graph_task.trace = {"scheduled": start}
 
+        # カタログ・依存タスクの出力はコピーせずに重ねる
         if not graph_task.dependencies:
-            ds.merge(default_ds)
+            ds = DataSet.chain(self.catalog_ds, default_ds)
         else:
-            for d in graph_task.dependencies:
-                ds.merge(d.output_ds)
+            ds = DataSet.chain(self.catalog_ds, *[d.output_ds for d in graph_task.dependencies])
+
+        graph_task.record_span("inputs", start)
         return ds
 
-    def run(self, ds: DataSet = None) -> DataSet:
+    def run(self, ds: DataSet = None, targets: List[Union[str, GraphTask]] = None) -> DataSet:
+        """Graphの実行
+
+        Args:
+            ds (DataSet, optional): デフォルトDataSet. Defaults to None.
+            targets (List[Union[str, GraphTask]], optional): 必要なデータkey・タスク。
+                指定した場合はその生成に必要なタスクのみ実行する. Defaults to None.
+
+        Returns:
+            DataSet: 最後に完了したタスクの出力DataSet
+        """
         last_ds = ds
         self.abort = False
+        self._begin_run(targets)
 
         while not self.abort:
-            if not self.runnable_tasks():
+            t = self._index.next_runnable()
+            if t is None:
                 break
 
-            t = self.runnable_tasks()[0]
-
             input_ds = self._make_task_inputs(t, ds)
             last_ds = self._run(t, input_ds)
+            self._task_completed(t)
+
+        return self._end_run(last_ds, ds)
+
+    def _begin_run(self, targets: List[Union[str, GraphTask]] = None):
+        """Graph 実行開始時の前処理
+
+        Args:
+            targets (List[Union[str, GraphTask]], optional): 必要なデータkey・タスク. Defaults to None.
+        """
+        for gt in self.graph:
+            gt.cache = self.cache
+
+        restored = 0
+        if self.checkpoint:
+            self._task_ids = {gt: self.checkpoint.task_id(i, gt, self.catalog_ds) for i, gt in enumerate(self.graph)}
+            restored = self.checkpoint.restore(self, self._task_ids)
+
+        self._active = self._required_tasks(targets) if targets else None
+
+        # 全タスクを復元して何も実行しなかった場合に返す出力
+        completed = [gt for gt in self._active_tasks() if gt.status == TaskStatus.COMPLETED]
+        self._restored_ds = completed[-1].output_ds if restored and completed else None
+
+        self.cancel_token = CancellationToken()
+        for gt in self._active_tasks():
+            gt.task._cancel_token = CancellationToken(self.cancel_token)
+
+        self._lifetime = None
+        if self.release_intermediates or self.track_memory:
+            self._lifetime = DataLifetime(self._active_tasks(), self.catalog_ds, release=self.release_intermediates)
+
+        if self.memory_budget is not None:
+            # 前回の実行結果も退避先を参照しているため、SpillStore は作り直さない
+            budget = parse_quantity(self.memory_budget)
+            if self._spill_store is None or (self.spill_dir and Path(self.spill_dir) != self._spill_store.spill_dir):
+                self._spill_store = SpillStore(budget, self.spill_dir)
+            self._spill_store.budget_bytes = budget
+        else:
+            self._spill_store = None
+
+        self._reset_index()
+
+    def _end_run(self, last_ds: DataSet, ds: DataSet = None) -> DataSet:
+        """Graph 実行終了時の後処理
+        全タスクが完了していればチェックポイントを削除する
+
+        Args:
+            last_ds (DataSet): 最後に完了したタスクの出力DataSet
+            ds (DataSet, optional): デフォルトDataSet. Defaults to None.
+
+        Returns:
+            DataSet: Graph の出力DataSet。タスクを実行せずに全て復元した場合は、最後のタスクの復元した出力
+        """
+        if last_ds is ds and self._restored_ds is not None:
+            last_ds = self._restored_ds
+
+        if self.checkpoint and not self.abort and all([gt.status == TaskStatus.COMPLETED for gt in self.graph]):
+            self.checkpoint.clear()
 
         return last_ds
 
-    def runnable_tasks(self) -> List[GraphTask]:
-        """実行可能タスクの取得
+    def _required_tasks(self, targets: List[Union[str, GraphTask]]) -> List[GraphTask]:
+        """指定したデータkey・タスクの生成に必要なタスクを、静的依存と入出力データkeyを遡って求める
+
+        Args:
+            targets (List[Union[str, GraphTask]]): 必要なデータkey・タスク
 
         Returns:
-            List[GraphTask]: 実行可能タスク
+            List[GraphTask]: 実行対象のタスク (Graphへの追加順)
         """
-        if self.disable_dynamic_dep:
-            # 動的依存解決無効
-            return [g for g in self.graph if g.is_runnable()]
+        dynamic = not self.disable_dynamic_dep
+        catalog_keys = set(self.catalog_ds.keys())
 
-        # 動的依存解決
-        runnable_tasks = []
-        init_tasks = [g for g in self.graph if g.status == TaskStatus.INIT]
-        completed_tasks = [g for g in self.graph if g.status == TaskStatus.COMPLETED]
+        def _providers(key: str) -> List[GraphTask]:
+            return [gt for gt in self.graph if key in gt.task.output_datakeys()]
 
-        def _find_datakey_provider(key: str) -> List[GraphTask]:
-            return [gt for gt in completed_tasks if key in gt.task.output_datakeys()]
+        stack = []
+        for t in targets:
+            if isinstance(t, GraphTask):
+                stack.append(t)
+                continue
+
+            providers = _providers(t)
+            if not providers and t not in catalog_keys:
+                raise ValueError(f"task provide data({t}) not found.")
+            stack.extend(providers)
+
+        required = set()
+        while stack:
+            gt = stack.pop()
+            if gt in required:
+                continue
+            required.add(gt)
+
+            # 完了済み(チェックポイントから復元)のタスクの依存元は実行不要
+            if gt.status == TaskStatus.COMPLETED:
+                continue
+
+            stack.extend(gt.dependencies_static if dynamic else gt.dependencies)
+            if dynamic:
+                for k in gt.task.input_datakeys():
+                    if k not in catalog_keys:
+                        stack.extend(_providers(k))
+
+        tasks = [gt for gt in self.graph if gt in required]
+        pruned = [gt.task.__class__.__name__ for gt in self.graph if gt not in required]
+        if pruned:
+            logger.info(f"pruned {len(pruned)} tasks not required for targets: {','.join(pruned)}")
+        return tasks
+
+    def _active_tasks(self) -> List[GraphTask]:
+        """今回の実行対象のタスク
 
-        for gt in init_tasks:
-            deps = set()
-            for ik in gt.task.input_datakeys():
-                if ik in self.catalog_ds.keys():
-                    continue
+        Returns:
+            List[GraphTask]: 実行対象のタスク
+        """
+        return self.graph if self._active is None else self._active
 
-                prv = _find_datakey_provider(ik)
+    def _reset_index(self) -> DependencyIndex:
+        """現在のタスク状態から依存関係インデックスを作り直す
 
-                if len(prv) != 1:
-                    # logger.debug(f"data({ik}) provide from {len(prv)} tasks.")
-                    break
+        Returns:
+            DependencyIndex: 依存関係インデックス
+        """
+        self._index = DependencyIndex(
+            self._active_tasks(), self.catalog_ds.keys(), dynamic=not self.disable_dynamic_dep
+        )
+        return self._index
 
-                deps.add(prv[0])
-            else:
-                gt.dependencies_dynamic = list(deps)
+    def _task_completed(self, graph_task: GraphTask):
+        """タスク終了時の処理。完了していればインデックスに反映する
+
+        Args:
+            graph_task (GraphTask): 終了したタスク
+        """
+        if graph_task.status == TaskStatus.COMPLETED and self._index:
+            self._index.completed(graph_task)
+
+        if self.checkpoint and graph_task in self._task_ids:
+            self.checkpoint.save(self._task_ids[graph_task], graph_task)
+
+        if graph_task.status == TaskStatus.COMPLETED and self._lifetime:
+            self._lifetime.completed(graph_task)
+
+        if graph_task.status == TaskStatus.COMPLETED and self._spill_store and graph_task.output_ds:
+            for d in graph_task.output_ds.data.values():
+                self._spill_store.track(d)
+
+    def cancel(self, reason: str = "graph cancelled"):
+        """実行の取り消し
+        以降のタスクを起動せず、実行中のタスクに取り消しを通知する(別スレッドから呼び出し可)
 
-                if gt.is_runnable():
-                    runnable_tasks.append(gt)
+        Args:
+            reason (str, optional): 取り消し理由. Defaults to "graph cancelled".
+        """
+        self.abort = True
+        self.cancel_token.cancel(reason)
+
+    def reset(self):
+        """全タスクの実行状態を初期状態に戻す
+        Graph を組み直さずに繰り返し実行する場合に、run() の前に呼ぶ。
+        Task インスタンス自体は使い回すため、main で書き換えた属性は戻らない。
+        """
+        for gt in self.graph:
+            gt.reset()
+        self.abort = False
+        self._index = None
+        self._active = None
+        self._lifetime = None
+
+    def memory_report(self) -> dict:
+        """直近の実行で保持した出力データのメモリ量
+        release_intermediates または track_memory が有効な場合のみ集計する
+        memory_budget を設定している場合は SpillStore.report() の退避状況も含める
+
+        Returns:
+            dict: peak_bytes(最大保持量), retained_bytes(現在の保持量), released_bytes(手放した量)
+        """
+        report = self._lifetime.report() if self._lifetime else None
+        if self._spill_store:
+            report = dict(report or {})
+            report.update(self._spill_store.report())
+        return report
+
+    def runnable_tasks(self) -> List[GraphTask]:
+        """実行可能タスクの取得
+
+        Returns:
+            List[GraphTask]: 実行可能タスク
+        """
+        if (
+            self._index is None
+            or self._index.size != len(self._active_tasks())
+            or self._index.dynamic == self.disable_dynamic_dep
+        ):
+            self._reset_index()
 
-        return runnable_tasks
+        return self._index.runnable()
 
     def autoresolve_dependencies(self):
         """グラフ依存関係の自動解決
         """
         logger.info("run task dependencies auto resolver...")
+        catalog_keys = set(self.catalog_ds.keys())
 
         def _find_datakey_provider(key: str) -> List[GraphTask]:
             return [gt for gt in self.graph if key in gt.task.output_datakeys()]
@@ -172,7 +376,7 @@ class Graph:
                     logger.error(msg)
                     raise ValueError(msg)
 
-                if len(prv) == 0 and ik not in self.catalog_ds.keys():
+                if len(prv) == 0 and ik not in catalog_keys:
                     # input を提供するタスクが無く、カタログにも同キーが無い場合はエラー
                     msg = f"task provide data({ik}) not found."
                     logger.info(msg)
@@ -1,8 +1,11 @@
 from logging import getLogger
 from aksdp.task import Task
 from aksdp.dataset import DataSet
-from typing import List, Callable
+from typing import Any, Dict, List, Callable, Tuple
 from enum import Enum
+import os
+import threading
+import time
 
 logger = getLogger(__name__)
 
@@ -12,6 +15,7 @@ class TaskStatus(Enum):
     RUNNING = 1
     COMPLETED = 2
     ERROR = 3
+    CANCELLED = 4
 
 
 class GraphTask(object):
@@ -28,6 +32,10 @@ class GraphTask(object):
         self.output_ds = None
         self._pre_run_hook = self.empty_hook
         self._post_run_hook = self.empty_hook
+        self.cache = None
+        self._cache_key = None
+        # 実行トレース(scheduled/finished 時刻と、区間ごとの開始・終了時刻と実行したワーカー)
+        self.trace: Dict[str, Any] = {}
 
         self._dependencies_static = dependencies if dependencies else []
         self._dependencies_dynamic = []
@@ -36,6 +44,10 @@ class GraphTask(object):
     def dependencies(self) -> List["GraphTask"]:
         return self._dependencies_static + self._dependencies_dynamic
 
+    @property
+    def dependencies_static(self) -> List["GraphTask"]:
+        return self._dependencies_static
+
     @property
     def dependencies_dynamic(self):
         return self._dependencies_dynamic
@@ -102,6 +114,102 @@ class GraphTask(object):
 
         return all([gt.status == TaskStatus.COMPLETED for gt in self.dependencies])
 
+    def reset(self):
+        """実行状態を初期状態に戻す(同じGraphを繰り返し実行する場合用)
+        """
+        self.status = TaskStatus.INIT
+        self.input_ds = None
+        self.output_ds = None
+        self.trace = {}
+        self._cache_key = None
+        self._dependencies_dynamic = []
+        self.task._in = {}
+        self.task._elapsed_time = None
+
+    def record_span(self, name: str, start: float, end: float = None, worker: Tuple[int, int] = None):
+        """実行トレースに区間を記録する
+
+        Args:
+            name (str): 区間名 (inputs, pre_hook, main, post_hook)
+            start (float): 開始時刻 (time.time())
+            end (float, optional): 終了時刻。省略時は現在時刻. Defaults to None.
+            worker (Tuple[int, int], optional): 実行した (プロセスID, スレッドID)。省略時は呼び出し元. Defaults to None.
+        """
+        pid, tid = worker if worker else (os.getpid(), threading.get_ident())
+        self.trace[name] = {"start": start, "end": end if end is not None else time.time(), "pid": pid, "tid": tid}
+
+    def prepare(self, ds: DataSet = None):
+        """実行前処理(入力DataSetの設定、実行前フック呼び出し)
+
+        Args:
+            ds (DataSet, optional): 入力DataSet. Defaults to None.
+        """
+        self.input_ds = ds
+        self.status = TaskStatus.RUNNING
+        logger.debug(f"task({self.task.__class__.__name__}) started.")
+        logger.debug(f"  input_ds = {str(ds)}")
+
+        start = time.time()
+        self.pre_run_hook(ds)
+        self.record_span("pre_hook", start)
+
+    def complete(self, output_ds: DataSet):
+        """実行後処理(実行後フック呼び出し、出力DataSetの設定)
+
+        Args:
+            output_ds (DataSet): 出力DataSet
+        """
+        start = time.time()
+        self.post_run_hook(output_ds)
+        self.record_span("post_hook", start)
+        self.trace["finished"] = time.time()
+
+        elapse = self.task.elapsed_time if self.task.elapsed_time is not None else 0.0
+        logger.debug(f"task({self.task.__class__.__name__}) completed. (elapse={elapse:.3f}s)")
+        logger.debug(f"  output_ds = {str(output_ds)}")
+        self.output_ds = output_ds
+        self.status = TaskStatus.COMPLETED
+
+    def fail(self, e: BaseException):
+        """エラー時の処理
+
+        Args:
+            e (BaseException): 例外インスタンス
+        """
+        logger.error(f"task({self.task.__class__.__name__}) failed. {str(e)}")
+        self.status = TaskStatus.ERROR
+
+    def load_cache(self, ds: DataSet) -> DataSet:
+        """キャッシュから出力DataSetを取得する
+
+        Args:
+            ds (DataSet): 入力DataSet
+
+        Returns:
+            DataSet: キャッシュされた出力DataSet。キャッシュが無ければ None
+        """
+        self._cache_key = None
+        if self.cache is None or not self.task.cacheable():
+            return None
+
+        self._cache_key = self.cache.fingerprint(self.task, ds)
+        if self._cache_key is None:
+            return None
+
+        output_ds = self.cache.load(self._cache_key, self.task)
+        if output_ds is not None:
+            logger.debug(f"task({self.task.__class__.__name__}) cache hit.")
+        return output_ds
+
+    def save_cache(self, output_ds: DataSet):
+        """出力DataSetをキャッシュに保存する
+
+        Args:
+            output_ds (DataSet): 出力DataSet
+        """
+        if self.cache is not None and self._cache_key is not None and output_ds is not None:
+            self.cache.save(self._cache_key, self.task, output_ds)
+
     def run(self, ds: DataSet = None) -> "GraphTask":
         """タスク実行
 
@@ -112,20 +220,41 @@ class GraphTask(object):
             GraphTask: 実行後のGraphTask
         """
         try:
-            self.input_ds = ds
-            self.status = TaskStatus.RUNNING
-            logger.debug(f"task({self.task.__class__.__name__}) started.")
-            logger.debug(f"  input_ds = {str(ds)}")
-            self.pre_run_hook(ds)
-            output_ds = self.task.gmain(ds)
-            self.post_run_hook(output_ds)
-
-            logger.debug(f"task({self.task.__class__.__name__}) completed. (elapse={self.task.elapsed_time:.3f}s)")
-            logger.debug(f"  output_ds = {str(output_ds)}")
-            self.output_ds = output_ds
-            self.status = TaskStatus.COMPLETED
+            self.prepare(ds)
+            output_ds = self.load_cache(ds)
+            if output_ds is None:
+                start = time.time()
+                output_ds = self.task.gmain(ds)
+                self.record_span("main", start)
+                # 実行中に取り消された場合は結果を使わない
+                self.task.raise_if_cancelled()
+                self.save_cache(output_ds)
+            self.complete(output_ds)
+        except BaseException as e:
+            self.fail(e)
+            raise
+        return self
+
+    async def run_async(self, ds: DataSet = None) -> "GraphTask":
+        """タスク実行(main がコルーチンのタスク向け)
+
+        Args:
+            ds (DataSet, optional): 入力DataSet. Defaults to None.
+
+        Returns:
+            GraphTask: 実行後のGraphTask
+        """
+        try:
+            self.prepare(ds)
+            output_ds = self.load_cache(ds)
+            if output_ds is None:
+                start = time.time()
+                output_ds = await self.task.gmain_async(ds)
+                self.record_span("main", start)
+                self.task.raise_if_cancelled()
+                self.save_cache(output_ds)
+            self.complete(output_ds)
         except BaseException as e:
-            logger.error(f"task({self.task.__class__.__name__}) failed. {str(e)}")
-            self.status = TaskStatus.ERROR
+            self.fail(e)
             raise
         return self
@@ -0,0 +1,347 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from logging import getLogger
+from aksdp.graph import GraphTask, TaskStatus
+from aksdp.dataset import DataSet
+from .concurrent_graph import ConcurrentGraph, PartitionedTask
+from .scheduler import SchedulePolicy
+from . import shm_transport
+from typing import Any, Callable, Dict, List
+import os
+import pickle
+import threading
+import time
+import weakref
+
+logger = getLogger(__name__)
+
+# ワーカー側で、タスクの結果がまだ参照していて close できなかったセグメント
+_unclosed = []
+
+
+def execute_envelope(payload: bytes) -> bytes:
+    """ワーカープロセス側のタスク実行
+
+    Args:
+        payload (bytes): pickle した (Task, 入力DataSet)
+
+    Returns:
+        bytes: pickle した (実行後のTask, 出力DataSet, 実行区間)
+    """
+    task, input_ds = pickle.loads(payload)
+    start = time.time()
+    output_ds = task.gmain(input_ds)
+    span = (start, time.time(), os.getpid(), threading.get_ident())
+    return pickle.dumps((task, output_ds, span), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def execute_partition_envelope(payload: bytes) -> bytes:
+    """ワーカープロセス側の PartitionedTask の部分実行
+
+    Args:
+        payload (bytes): pickle した (PartitionedTask, 部分の入力DataSet)
+
+    Returns:
+        bytes: pickle した部分の出力DataSet
+    """
+    task, input_ds = pickle.loads(payload)
+    return pickle.dumps(task.run_partition(input_ds), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _execute_shared(fn: Callable, packed: shm_transport.Packed, min_bytes: int, tracker: int) -> shm_transport.Packed:
+    """共有メモリで受け取った入力を使ったワーカープロセス側の実行
+
+    Args:
+        fn (Callable): (Task, 入力DataSet) を受け取り、返送するオブジェクトを返す関数
+        packed (shm_transport.Packed): 共有メモリで転送された (Task, 入力DataSet)
+        min_bytes (int): 返送時に共有メモリを使うバッファの合計サイズの下限
+        tracker (int): 親プロセスのリソーストラッカーの識別子
+
+    Returns:
+        shm_transport.Packed: 返送する組 (セグメントは親プロセスが削除する)
+    """
+    _unclosed[:] = [s for s in _unclosed if not shm_transport.close(s)]
+    # セグメントの後始末は親プロセスが行うので、別のトラッカーを使っている場合は管理対象から外す
+    untrack = shm_transport.tracker_id() != tracker
+
+    (task, input_ds), segment = shm_transport.unpack(packed, untrack)
+    try:
+        result = fn(task, input_ds)
+        # 入力の列は共有メモリを参照したままなので、返送前に参照を外す
+        task._in = {}
+        del input_ds
+        r, _ = shm_transport.pack(result, min_bytes, untrack)
+        del result, task
+    finally:
+        if segment is not None and not shm_transport.close(segment):
+            _unclosed.append(segment)
+    return r
+
+
+def _run_task(task, input_ds) -> tuple:
+    start = time.time()
+    output_ds = task.gmain(input_ds)
+    span = (start, time.time(), os.getpid(), threading.get_ident())
+    return task, output_ds, span
+
+
+def _run_partition(task, input_ds) -> DataSet:
+    return task.run_partition(input_ds)
+
+
+def execute_shared_envelope(packed: shm_transport.Packed, min_bytes: int, tracker: int = None) -> shm_transport.Packed:
+    """ワーカープロセス側のタスク実行 (共有メモリ転送)
+
+    Args:
+        packed (shm_transport.Packed): 共有メモリで転送された (Task, 入力DataSet)
+        min_bytes (int): 返送時に共有メモリを使うバッファの合計サイズの下限
+        tracker (int, optional): 親プロセスのリソーストラッカーの識別子. Defaults to None.
+
+    Returns:
+        shm_transport.Packed: (実行後のTask, 出力DataSet, 実行区間)
+    """
+    return _execute_shared(_run_task, packed, min_bytes, tracker)
+
+
+def execute_shared_partition_envelope(
+    packed: shm_transport.Packed, min_bytes: int, tracker: int = None
+) -> shm_transport.Packed:
+    """ワーカープロセス側の PartitionedTask の部分実行 (共有メモリ転送)
+
+    Args:
+        packed (shm_transport.Packed): 共有メモリで転送された (PartitionedTask, 部分の入力DataSet)
+        min_bytes (int): 返送時に共有メモリを使うバッファの合計サイズの下限
+        tracker (int, optional): 親プロセスのリソーストラッカーの識別子. Defaults to None.
+
+    Returns:
+        shm_transport.Packed: 部分の出力DataSet
+    """
+    return _execute_shared(_run_partition, packed, min_bytes, tracker)
+
+
+class ProcessGraph(ConcurrentGraph):
+    """ProcessPoolExecutor でタスクを実行するGraph
+
+    GraphTask ごと pickle すると依存タスクの入出力まで転送されるため、
+    Task と使用する入力データのみをワーカーに送り、出力DataSetのみを受け取る。
+    実行前/後フックと状態遷移は親プロセス側で行う。
+
+    shared_memory=True の場合、DataFrame の列・NumPy 配列・大きな bytes を共有メモリで受け渡す。
+    ワーカーは入力の列をコピーせずに参照する。出力は親プロセスで1回コピーして受け取る。
+    セグメントは親プロセスが Future の終了時(取り消し・タイムアウト含む)に削除する。
+    """
+
+    def __init__(
+        self,
+        executor=None,
+        catalog_ds: DataSet = DataSet(),
+        disable_dynamic_dep: bool = False,
+        policy: SchedulePolicy = None,
+        max_inflight: int = None,
+        resources: Dict[str, Any] = None,
+        task_timeout: float = None,
+        shared_memory: bool = False,
+        shared_memory_min_bytes: int = 1024 * 1024,
+    ):
+        """.ctor
+
+        Args:
+            executor (Executor, optional): タスクを実行する executor. Defaults to None (ProcessPoolExecutor).
+            catalog_ds (DataSet, optional): カタログDataSet. Defaults to DataSet().
+            disable_dynamic_dep (bool, optional): 動的依存解決の無効化. Defaults to False.
+            policy (SchedulePolicy, optional): タスクの投入順を決めるポリシー. Defaults to None.
+            max_inflight (int, optional): executor に同時に投入するタスク数の上限. Defaults to None.
+            resources (Dict[str, Any], optional): 同時実行タスクが使用できるリソースの容量. Defaults to None.
+            task_timeout (float, optional): Task.timeout() を指定していないタスクの制限時間(秒). Defaults to None.
+            shared_memory (bool, optional): 入出力の列データを共有メモリで受け渡す. Defaults to False.
+            shared_memory_min_bytes (int, optional): 共有メモリを使う列データの合計サイズの下限. Defaults to 1MB.
+        """
+        if shared_memory and not shm_transport.available():
+            logger.warning("multiprocessing.shared_memory is not available, disable shared memory transfer.")
+            shared_memory = False
+        self._tracker = None
+        if shared_memory:
+            # ワーカーの起動前にリソーストラッカーを起動してワーカーと共有する
+            self._tracker = shm_transport.tracker_id()
+
+        super().__init__(
+            executor if executor else ProcessPoolExecutor(),
+            catalog_ds,
+            disable_dynamic_dep=disable_dynamic_dep,
+            policy=policy,
+            max_inflight=max_inflight,
+            resources=resources,
+            task_timeout=task_timeout,
+        )
+        self.transfer_stats: List[dict] = []
+        self._sent_bytes = {}
+        self._received_bytes = {}
+
+        self.shared_memory = shared_memory
+        self.shared_memory_min_bytes = shared_memory_min_bytes
+        self._shared_bytes = {}
+        self._outputs = weakref.WeakKeyDictionary()
+        self._outputs_lock = threading.Lock()
+
+    def _project_inputs(self, graph_task: GraphTask, input_ds: DataSet) -> DataSet:
+        """入力DataSetを Task.input_datakeys() で宣言されたデータに絞る
+
+        Args:
+            graph_task (GraphTask): 実行するタスク
+            input_ds (DataSet): 入力DataSet
+
+        Returns:
+            DataSet: 転送する入力DataSet
+        """
+        keys = graph_task.task.input_datakeys()
+        if not keys or input_ds is None:
+            return input_ds
+
+        ds = DataSet()
+        for k in keys:
+            if k in input_ds.keys():
+                ds.put(k, input_ds.get(k))
+        return ds
+
+    def _submit_shared(self, graph_task: GraphTask, fn: Callable, obj: Any) -> Future:
+        """共有メモリで入力を渡してワーカーに投入する
+
+        Args:
+            graph_task (GraphTask): 実行するタスク
+            fn (Callable): ワーカー側で実行する関数
+            obj (Any): 転送するオブジェクト
+
+        Returns:
+            Future: 返送された組を返す Future
+        """
+        packed, segment = shm_transport.pack(obj, self.shared_memory_min_bytes)
+        payload_bytes, shared_bytes = shm_transport.packed_size(packed)
+        self._sent_bytes[graph_task] = self._sent_bytes.get(graph_task, 0) + payload_bytes
+        self._shared_bytes[graph_task] = self._shared_bytes.get(graph_task, 0) + shared_bytes
+
+        try:
+            f = self.pool.submit(fn, packed, self.shared_memory_min_bytes, self._tracker)
+        except BaseException:
+            if segment is not None:
+                shm_transport.unlink(segment)
+            raise
+
+        def _done(f: Future):
+            if segment is not None:
+                shm_transport.unlink(segment)
+            # 結果を受け取らずに切り離された場合もセグメントが残らないよう、ここで受け取っておく
+            if not f.cancelled() and f.exception() is None:
+                self._shared_output(f)
+
+        f.add_done_callback(_done)
+        return f
+
+    def _shared_output(self, future: Future) -> tuple:
+        """共有メモリで返送された結果の受け取り (返送側のセグメントは削除する)
+
+        Args:
+            future (Future): _submit_shared() が返した Future
+
+        Returns:
+            tuple: (pickle 本体, バッファ, 共有メモリのサイズ)
+        """
+        with self._outputs_lock:
+            r = self._outputs.get(future)
+            if r is None:
+                packed = future.result()
+                _, shared_bytes = shm_transport.packed_size(packed)
+                payload, buffers = shm_transport.take(packed)
+                r = (payload, buffers, shared_bytes)
+                self._outputs[future] = r
+            return r
+
+    def _receive(self, graph_task: GraphTask, future: Future) -> Any:
+        """ワーカーから返送されたオブジェクトの復元
+
+        Args:
+            graph_task (GraphTask): 実行したタスク
+            future (Future): ワーカーに投入した Future
+
+        Returns:
+            Any: 返送されたオブジェクト
+        """
+        if not self.shared_memory:
+            result = future.result()
+            self._received_bytes[graph_task] = self._received_bytes.get(graph_task, 0) + len(result)
+            return pickle.loads(result)
+
+        payload, buffers, shared_bytes = self._shared_output(future)
+        self._received_bytes[graph_task] = self._received_bytes.get(graph_task, 0) + len(payload)
+        self._shared_bytes[graph_task] = self._shared_bytes.get(graph_task, 0) + shared_bytes
+        return pickle.loads(payload, buffers=buffers)
+
+    def _submit_partition(self, graph_task: GraphTask, ds: DataSet) -> Future:
+        obj = (graph_task.task, self._project_inputs(graph_task, ds))
+        if self.shared_memory:
+            return self._submit_shared(graph_task, execute_shared_partition_envelope, obj)
+
+        payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        self._sent_bytes[graph_task] = self._sent_bytes.get(graph_task, 0) + len(payload)
+        return self.pool.submit(execute_partition_envelope, payload)
+
+    def _partition_output(self, graph_task: GraphTask, future: Future) -> DataSet:
+        return self._receive(graph_task, future)
+
+    def _run(self, graph_task: GraphTask, input_ds: DataSet) -> Future:
+        if PartitionedTask is not None and isinstance(graph_task.task, PartitionedTask):
+            return self._run_partitioned(graph_task, input_ds)
+
+        try:
+            graph_task.prepare(input_ds)
+
+            # キャッシュにヒットした場合はワーカーに送らず完了させる
+            output_ds = graph_task.load_cache(input_ds)
+            if output_ds is not None:
+                graph_task.complete(output_ds)
+                f = Future()
+                f.set_result(None)
+                return f
+
+            obj = (graph_task.task, self._project_inputs(graph_task, input_ds))
+            if self.shared_memory:
+                return self._submit_shared(graph_task, execute_shared_envelope, obj)
+
+            payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException as e:
+            f = Future()
+            f.set_exception(e)
+            return f
+
+        self._sent_bytes[graph_task] = len(payload)
+        return self.pool.submit(execute_envelope, payload)
+
+    def _collect(self, graph_task: GraphTask, future: Future):
+        try:
+            if future.result() is not None:
+                task, output_ds, (start, end, pid, tid) = self._receive(graph_task, future)
+
+                graph_task.task = task
+                graph_task.record_span("main", start, end, (pid, tid))
+                graph_task.save_cache(output_ds)
+                graph_task.complete(output_ds)
+        except BaseException as e:
+            if graph_task.status != TaskStatus.ERROR:
+                graph_task.fail(e)
+            raise
+        finally:
+            sent_bytes = self._sent_bytes.pop(graph_task, None)
+            received_bytes = self._received_bytes.pop(graph_task, 0)
+            shared_bytes = self._shared_bytes.pop(graph_task, 0)
+
+        if sent_bytes is None:
+            # キャッシュヒットで完了済み
+            return
+
+        name = graph_task.task.__class__.__name__
+        stats = {"task": name, "sent_bytes": sent_bytes, "received_bytes": received_bytes}
+        if self.shared_memory:
+            stats["shared_bytes"] = shared_bytes
+        logger.debug(
+            f"task({name}) transferred. (sent={sent_bytes}bytes, received={received_bytes}bytes,"
+            f" shared={shared_bytes}bytes)"
+        )
+        self.transfer_stats.append(stats)
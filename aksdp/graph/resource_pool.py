@@ -0,0 +1,86 @@
+from logging import getLogger
+from typing import Dict, Union
+import re
+
+logger = getLogger(__name__)
+
+_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_quantity(v: Union[int, float, str]) -> float:
+    """リソース量の解釈。"8GB", "512M" のような単位付き文字列も受け付ける
+
+    Args:
+        v (Union[int, float, str]): リソース量
+
+    Returns:
+        float: リソース量
+    """
+    if isinstance(v, (int, float)):
+        return float(v)
+
+    m = re.fullmatch(r"\s*([0-9.]+)\s*([KMGT]?)i?B?\s*", str(v), re.IGNORECASE)
+    if not m:
+        raise ValueError(f"invalid resource quantity: {v}")
+    return float(m.group(1)) * _UNITS[m.group(2).upper()]
+
+
+class ResourcePool:
+    """Graph 全体で使用可能なリソース(CPU, メモリ等)の管理
+    """
+
+    def __init__(self, capacity: Dict[str, Union[int, float, str]]):
+        """.ctor
+
+        Args:
+            capacity (Dict[str, Union[int, float, str]]): リソース名→容量 (例: {"cpu": 8, "memory": "32GB"})
+        """
+        self.capacity = {k: parse_quantity(v) for k, v in capacity.items()}
+        self.used = {k: 0.0 for k in self.capacity.keys()}
+
+    def _requirements(self, req: Dict[str, Union[int, float, str]]) -> Dict[str, float]:
+        # 容量が設定されていないリソースは管理対象外
+        return {k: parse_quantity(v) for k, v in req.items() if k in self.capacity} if req else {}
+
+    def fits(self, req: Dict[str, Union[int, float, str]]) -> bool:
+        """要求リソースを確保できるかどうか
+
+        Args:
+            req (Dict[str, Union[int, float, str]]): 要求リソース
+
+        Returns:
+            bool: 確保できるかどうか
+        """
+        for k, v in self._requirements(req).items():
+            if self.used[k] + v <= self.capacity[k]:
+                continue
+
+            # 単独で容量を超えるタスクは、そのリソースを誰も使っていなければ実行を許可する(永久に待たせない)
+            if v > self.capacity[k] and self.used[k] == 0:
+                logger.warning(f"resource({k}) requirement {v} exceeds capacity {self.capacity[k]}")
+                continue
+            return False
+        return True
+
+    def acquire(self, req: Dict[str, Union[int, float, str]]):
+        """要求リソースの確保
+
+        Args:
+            req (Dict[str, Union[int, float, str]]): 要求リソース
+        """
+        for k, v in self._requirements(req).items():
+            self.used[k] += v
+
+    def release(self, req: Dict[str, Union[int, float, str]]):
+        """確保したリソースの解放
+
+        Args:
+            req (Dict[str, Union[int, float, str]]): 確保したリソース
+        """
+        for k, v in self._requirements(req).items():
+            self.used[k] = max(self.used[k] - v, 0.0)
+
+    def reset(self):
+        """確保済みリソースを全て解放する
+        """
+        self.used = {k: 0.0 for k in self.capacity.keys()}
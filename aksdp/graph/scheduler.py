@@ -0,0 +1,158 @@
+from logging import getLogger
+from pathlib import Path
+from typing import Dict, List
+from .graph_task import GraphTask
+import json
+
+logger = getLogger(__name__)
+
+
+class SchedulePolicy:
+    """実行可能タスクの投入順を決めるポリシー
+    既定では Graph への追加順(FIFO)で投入する。
+    """
+
+    def prepare(self, graph):
+        """Graph 実行開始時の前処理
+
+        Args:
+            graph (Graph): 実行するGraph
+        """
+        pass
+
+    def order(self, tasks: List[GraphTask]) -> List[GraphTask]:
+        """実行可能タスクを投入順に並べる
+
+        Args:
+            tasks (List[GraphTask]): 実行可能タスク(Graphへの追加順)
+
+        Returns:
+            List[GraphTask]: 投入順に並べたタスク
+        """
+        return tasks
+
+
+class FifoPolicy(SchedulePolicy):
+    """Graph への追加順に投入するポリシー
+    """
+
+    pass
+
+
+class CriticalPathPolicy(SchedulePolicy):
+    """残りの最長経路(クリティカルパス)が長いタスクから投入するポリシー
+
+    タスクの所要時間は以下の優先順で見積もる。
+      1. durations に登録された時間(タスクのクラス名で引く)
+      2. Task.params["estimated_duration"]
+      3. 前回実行時の Task.elapsed_time
+      4. default_duration
+    """
+
+    def __init__(self, durations: Dict[str, float] = None, default_duration: float = 1.0):
+        """.ctor
+
+        Args:
+            durations (Dict[str, float], optional): タスクのクラス名→所要時間(秒). Defaults to None.
+            default_duration (float, optional): 見積もりが無いタスクの所要時間(秒). Defaults to 1.0.
+        """
+        self.durations = dict(durations) if durations else {}
+        self.default_duration = default_duration
+        self.ranks: Dict[GraphTask, float] = {}
+
+    def estimate(self, gt: GraphTask) -> float:
+        """タスクの所要時間見積もり
+
+        Args:
+            gt (GraphTask): タスク
+
+        Returns:
+            float: 所要時間(秒)
+        """
+        name = gt.task.__class__.__name__
+        if name in self.durations:
+            return self.durations[name]
+
+        hint = gt.task.params.get("estimated_duration")
+        if hint is not None:
+            return float(hint)
+
+        if gt.task.elapsed_time is not None:
+            return gt.task.elapsed_time
+
+        return self.default_duration
+
+    def prepare(self, graph):
+        # 静的依存と宣言された入出力データkeyから後続タスクを求める
+        successors = {gt: [] for gt in graph.graph}
+        providers = {}
+        for gt in graph.graph:
+            for k in gt.task.output_datakeys():
+                providers.setdefault(k, []).append(gt)
+
+        for gt in graph.graph:
+            for d in gt.dependencies:
+                if d in successors:
+                    successors[d].append(gt)
+            for k in gt.task.input_datakeys():
+                for p in providers.get(k, []):
+                    if p is not gt:
+                        successors[p].append(gt)
+
+        # rank = 自身の所要時間 + 後続タスクの rank の最大値
+        self.ranks = {}
+        for root in graph.graph:
+            stack = [(root, False)]
+            visiting = set()
+            while stack:
+                gt, expanded = stack.pop()
+                if gt in self.ranks:
+                    continue
+
+                if expanded:
+                    visiting.discard(gt)
+                    succ = [self.ranks.get(s, 0.0) for s in successors[gt]]
+                    self.ranks[gt] = self.estimate(gt) + (max(succ) if succ else 0.0)
+                    continue
+
+                if gt in visiting:
+                    logger.warning(f"dependency cycle detected at {gt.task.__class__.__name__}")
+                    continue
+
+                visiting.add(gt)
+                stack.append((gt, True))
+                stack.extend([(s, False) for s in successors[gt] if s not in self.ranks])
+
+    def order(self, tasks: List[GraphTask]) -> List[GraphTask]:
+        return sorted(tasks, key=lambda gt: -self.ranks.get(gt, self.estimate(gt)))
+
+    def record(self, graph):
+        """実行済みGraphのタスク所要時間を見積もりとして記録する
+
+        Args:
+            graph (Graph): 実行済みGraph
+        """
+        for gt in graph.graph:
+            if gt.task.elapsed_time is not None:
+                self.durations[gt.task.__class__.__name__] = gt.task.elapsed_time
+
+    def save(self, path: Path):
+        """所要時間の見積もりを JSON で保存する
+
+        Args:
+            path (Path): 保存先
+        """
+        path.write_text(json.dumps(self.durations, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path, default_duration: float = 1.0) -> "CriticalPathPolicy":
+        """保存した所要時間の見積もりからポリシーを作成する
+
+        Args:
+            path (Path): 保存した JSON
+            default_duration (float, optional): 見積もりが無いタスクの所要時間(秒). Defaults to 1.0.
+
+        Returns:
+            CriticalPathPolicy: ポリシー
+        """
+        return CriticalPathPolicy(json.loads(path.read_text(encoding="utf-8")), default_duration)
@@ -0,0 +1,218 @@
+"""共有メモリを使ったプロセス間のオブジェクト転送
+
+pickle protocol 5 の out-of-band バッファ (DataFrame の列・NumPy 配列・大きな bytes) を
+multiprocessing.shared_memory のセグメントに書き込み、pickle 本体と分けて渡す。
+受信側はセグメント上のバッファをそのまま参照するため、列データをコピーせずに復元できる。
+
+転送するオブジェクトは (pickle 本体, セグメント名, 各バッファのサイズ) の組で表す。
+バッファが無い・小さい場合はセグメントを作らず、セグメント名は None になる。
+"""
+
+from logging import getLogger
+from aksdp.data import Data
+from typing import Any, List, Optional, Tuple
+import gc
+import io
+import pickle
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    # Python 3.7 以前
+    shared_memory = None
+
+logger = getLogger(__name__)
+
+# これより小さい bytes は pickle 本体に含める
+BYTES_MIN = 64 * 1024
+
+Packed = Tuple[bytes, Optional[str], Optional[List[int]]]
+
+
+def available() -> bool:
+    """共有メモリでの転送が使えるかどうか
+
+    Returns:
+        bool: 使えれば True
+    """
+    return shared_memory is not None
+
+
+def tracker_id() -> Optional[int]:
+    """このプロセスが使っているリソーストラッカーの識別子
+    ワーカーの起動前に親プロセスでトラッカーを起動しておくと、ワーカーも同じトラッカーを使う。
+    異なるトラッカーを使っている場合、ワーカーはセグメントを自分のトラッカーから外す必要がある
+    (外さないとワーカー終了時に、親プロセスが削除済みのセグメントを後始末しようとして警告が出る)。
+
+    Returns:
+        Optional[int]: トラッカーのプロセスID。トラッカーが無い環境(Windows)では None
+    """
+    try:
+        resource_tracker.ensure_running()
+        return resource_tracker._resource_tracker._pid
+    except (NameError, AttributeError):
+        return None
+
+
+def _untrack(segment):
+    try:
+        resource_tracker.unregister(segment._name, "shared_memory")
+    except (NameError, AttributeError):
+        pass
+
+
+def _data_from_buffer(cls: type, state: dict, buf) -> Data:
+    data = cls.__new__(cls)
+    data.__setstate__(state)
+    # bytes は自前のメモリを持つ必要があるので、ここでは1回コピーする
+    data._content = bytes(buf)
+    return data
+
+
+class _Pickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        # bytes 自体には reducer_override が呼ばれないため、中身が大きな bytes の Data (RawData 等) で処理する
+        if isinstance(obj, Data) and type(obj._content) is bytes and len(obj._content) >= BYTES_MIN:
+            state = obj.__getstate__()
+            content = state.pop("_content")
+            return _data_from_buffer, (type(obj), state, pickle.PickleBuffer(content))
+        return NotImplemented
+
+
+def pack(obj: Any, min_bytes: int, untrack: bool = False) -> Tuple[Packed, Any]:
+    """オブジェクトの pickle (out-of-band バッファの合計が min_bytes 以上なら共有メモリに書き込む)
+    作成したセグメントは受信側が使い終わった後に unlink() すること
+
+    Args:
+        obj (Any): 転送するオブジェクト
+        min_bytes (int): 共有メモリを使うバッファの合計サイズの下限
+        untrack (bool, optional): 作成したセグメントをこのプロセスのトラッカーから外す. Defaults to False.
+
+    Returns:
+        Tuple[Packed, SharedMemory]: 転送する組と、作成したセグメント(作成しなかった場合は None)
+    """
+    buffers = []
+    f = io.BytesIO()
+    _Pickler(f, protocol=5, buffer_callback=buffers.append).dump(obj)
+    if not buffers:
+        return (f.getvalue(), None, None), None
+
+    raws = [b.raw() for b in buffers]
+    total = sum([r.nbytes for r in raws])
+    if total < min_bytes:
+        return (pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), None, None), None
+
+    segment = shared_memory.SharedMemory(create=True, size=total)
+    if untrack:
+        _untrack(segment)
+    offset = 0
+    sizes = []
+    for r in raws:
+        segment.buf[offset : offset + r.nbytes] = r
+        offset += r.nbytes
+        sizes.append(r.nbytes)
+    payload = f.getvalue()
+    del raws, buffers, r
+    segment.close()
+    return (payload, segment.name, sizes), segment
+
+
+def packed_size(packed: Packed) -> Tuple[int, int]:
+    """転送サイズ
+
+    Args:
+        packed (Packed): 転送する組
+
+    Returns:
+        Tuple[int, int]: (pickle 本体のサイズ, 共有メモリのサイズ)
+    """
+    payload, _, sizes = packed
+    return len(payload), sum(sizes) if sizes else 0
+
+
+def _views(segment, sizes: List[int]) -> List[memoryview]:
+    views = []
+    offset = 0
+    for n in sizes:
+        views.append(segment.buf[offset : offset + n])
+        offset += n
+    return views
+
+
+def unpack(packed: Packed, untrack: bool = False) -> Tuple[Any, Any]:
+    """共有メモリ上のバッファを参照したままのオブジェクトの復元
+    返したセグメントは、復元したオブジェクトを使い終わった後に close() すること
+
+    Args:
+        packed (Packed): 転送された組
+        untrack (bool, optional): セグメントをこのプロセスのトラッカーから外す. Defaults to False.
+
+    Returns:
+        Tuple[Any, SharedMemory]: 復元したオブジェクトと、参照しているセグメント(無ければ None)
+    """
+    payload, name, sizes = packed
+    if name is None:
+        return pickle.loads(payload), None
+
+    segment = shared_memory.SharedMemory(name=name)
+    if untrack:
+        _untrack(segment)
+    return pickle.loads(payload, buffers=_views(segment, sizes)), segment
+
+
+def take(packed: Packed) -> Tuple[bytes, Optional[List[bytearray]]]:
+    """共有メモリ上のバッファをコピーして受け取り、セグメントを削除する
+
+    Args:
+        packed (Packed): 転送された組
+
+    Returns:
+        Tuple[bytes, Optional[List[bytearray]]]: pickle 本体と、pickle.loads() に渡すバッファ
+    """
+    payload, name, sizes = packed
+    if name is None:
+        return payload, None
+
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        views = _views(segment, sizes)
+        buffers = [bytearray(v) for v in views]
+        for v in views:
+            v.release()
+    finally:
+        segment.close()
+        segment.unlink()
+    return payload, buffers
+
+
+def close(segment) -> bool:
+    """セグメントの close (まだ参照しているオブジェクトがあれば close しない)
+
+    Args:
+        segment (SharedMemory): セグメント
+
+    Returns:
+        bool: close できれば True
+    """
+    try:
+        segment.close()
+        return True
+    except BufferError:
+        gc.collect()
+    try:
+        segment.close()
+        return True
+    except BufferError:
+        return False
+
+
+def unlink(segment):
+    """セグメントの削除 (削除済みの場合は何もしない)
+
+    Args:
+        segment (SharedMemory): セグメント
+    """
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,248 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from logging import getLogger
+from aksdp.dataset import DataSet
+from aksdp.task import StreamingTask, TaskCancelledError
+from typing import Dict, Iterator, List, Union
+from .graph import Graph
+from .graph_task import GraphTask, TaskStatus
+import queue
+import threading
+import time
+
+logger = getLogger(__name__)
+
+# ストリームの終端
+_END = object()
+
+
+class StreamCancelled(Exception):
+    """他のステージのエラーでストリームが中断された"""
+
+    pass
+
+
+class StreamingGraph(Graph):
+    """StreamingTask 同士を上限付きキューで繋いでパイプライン実行するGraph
+
+    StreamingTask の後続の StreamingTask (静的依存で繋いだもの)は依存元の完了を待たずに開始し、
+    依存元が yield したバッチをキュー経由で順に受け取って処理する。
+    キューが一杯になると依存元は後続が追いつくまで待つため、保持するバッチ数は queue_depth で抑えられる。
+    後続に通常のタスクがある場合、または後続が無い場合のみ、全バッチを連結した出力DataSetを作る。
+    """
+
+    def __init__(self, catalog_ds: DataSet = None, disable_dynamic_dep: bool = False, queue_depth: int = 4):
+        """.ctor
+
+        Args:
+            catalog_ds (DataSet, optional): カタログDataSet. Defaults to None.
+            disable_dynamic_dep (bool, optional): 動的依存解決の無効化. Defaults to False.
+            queue_depth (int, optional): ステージ間キューに溜められるバッチ数. Defaults to 4.
+        """
+        super().__init__(catalog_ds, disable_dynamic_dep=disable_dynamic_dep)
+        self.queue_depth = queue_depth
+        self._cancel = threading.Event()
+
+    def cancel(self, reason: str = "graph cancelled"):
+        """実行の取り消し
+        以降のタスクを起動せず、実行中のステージのキュー待ちを中断する(別スレッドから呼び出し可)
+
+        Args:
+            reason (str, optional): 取り消し理由. Defaults to "graph cancelled".
+        """
+        super().cancel(reason)
+        self._cancel.set()
+
+    def _cancelled(self, e: BaseException) -> bool:
+        # cancel() による取り消しはエラーとして扱わない
+        return self.cancel_token.cancelled and isinstance(e, (StreamCancelled, TaskCancelledError))
+
+    def _send(self, q: queue.Queue, item):
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._cancel.is_set():
+                    raise StreamCancelled()
+
+    def _receive(self, q: queue.Queue, producers: int) -> Iterator[DataSet]:
+        """依存元のバッチの受信 (全依存元の終端まで)
+
+        Args:
+            q (queue.Queue): 受信キュー
+            producers (int): 依存元の数
+
+        Returns:
+            Iterator[DataSet]: バッチ
+        """
+        ended = 0
+        while ended < producers:
+            if self._cancel.is_set():
+                raise StreamCancelled()
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self._cancel.is_set():
+                    raise StreamCancelled()
+                continue
+
+            if item is _END:
+                ended += 1
+                continue
+            yield item
+
+    def _run_stage(
+        self, graph_task: GraphTask, input_ds: DataSet, inbox: queue.Queue, producers: int, outboxes: List, collect: bool
+    ):
+        """1ステージの実行
+
+        Args:
+            graph_task (GraphTask): 実行するタスク
+            input_ds (DataSet): 入力DataSet
+            inbox (queue.Queue): 依存元からバッチを受け取るキュー。無ければ None
+            producers (int): inbox に送ってくる依存元の数
+            outboxes (List[queue.Queue]): バッチを送る後続のキュー
+            collect (bool): 出力バッチを連結して出力DataSetにするかどうか
+        """
+        try:
+            graph_task.prepare(input_ds)
+
+            task = graph_task.task
+            start = time.time()
+            if isinstance(task, StreamingTask):
+                batches = self._receive(inbox, producers) if inbox else None
+                collected = []
+                for b in task.stream(input_ds, batches):
+                    for q in outboxes:
+                        self._send(q, b)
+                    if collect:
+                        collected.append(b)
+                output_ds = task.merge(collected) if collect else DataSet()
+            else:
+                output_ds = task.gmain(input_ds)
+            graph_task.record_span("main", start)
+
+            graph_task.complete(output_ds)
+        except BaseException as e:
+            graph_task.fail(e)
+            self._cancel.set()
+            raise
+        finally:
+            if not self._cancel.is_set():
+                for q in outboxes:
+                    self._send(q, _END)
+
+    def _start_streams(self, tasks: List[GraphTask], running: set, dependents: Dict, consumers: Dict) -> List[tuple]:
+        """開始するタスクと、その StreamingTask の後続のうち同時に開始できるものの接続を決める
+
+        Args:
+            tasks (List[GraphTask]): 依存元が全て完了した開始タスク
+            running (set): 実行中のタスク
+            dependents (Dict): タスク→静的依存している後続タスク
+            consumers (Dict): タスク→出力を使用する後続タスク (静的依存と出力データkeyから求めたもの)
+
+        Returns:
+            List[tuple]: (タスク, 受信キュー, 依存元数, 送信キュー, 出力を連結するか)
+        """
+        started = list(tasks)
+        inbox: Dict[GraphTask, queue.Queue] = {}
+        producers: Dict[GraphTask, int] = {}
+        outboxes: Dict[GraphTask, List[queue.Queue]] = {}
+
+        i = 0
+        while i < len(started):
+            gt = started[i]
+            i += 1
+            outboxes[gt] = []
+            if not isinstance(gt.task, StreamingTask):
+                continue
+
+            active = running | set(started)
+            for c in dependents.get(gt, []):
+                if not isinstance(c.task, StreamingTask):
+                    continue
+                if c not in inbox:
+                    if c in started or not self._index.ready_except(c, active):
+                        continue
+                    inbox[c] = queue.Queue(self.queue_depth)
+                    producers[c] = 0
+                    started.append(c)
+                producers[c] += 1
+                outboxes[gt].append(inbox[c])
+
+        result = []
+        for gt in started:
+            # 後続が全てストリームで繋がっていれば出力を連結しない
+            streamed = len(outboxes[gt])
+            collect = streamed == 0 or streamed < len(consumers.get(gt, set()))
+            result.append((gt, inbox.get(gt), producers.get(gt, 0), outboxes[gt], collect))
+        return result
+
+    def run(self, ds: DataSet = None, targets: List[Union[str, GraphTask]] = None) -> DataSet:
+        last_ds = ds
+        self.abort = False
+        self._cancel.clear()
+        self._begin_run(targets)
+
+        tasks = self._active_tasks()
+        dependents: Dict[GraphTask, List[GraphTask]] = {}
+        consumers: Dict[GraphTask, set] = {}
+        for gt in tasks:
+            for d in gt.dependencies_static:
+                dependents.setdefault(d, []).append(gt)
+                consumers.setdefault(d, set()).add(gt)
+        if not self.disable_dynamic_dep:
+            for gt in tasks:
+                keys = set(gt.task.output_datakeys())
+                for c in tasks:
+                    if c is not gt and keys & set(c.task.input_datakeys()):
+                        consumers.setdefault(gt, set()).add(c)
+
+        # 実行中のステージ全てにスレッドを割り当てないとキュー待ちで止まるため、タスク数分のスレッドを用意する
+        pool = ThreadPoolExecutor(max(1, len(tasks)))
+        futures = {}
+        error = None
+        try:
+            while not self.abort and not self._cancel.is_set():
+                for t, inbox, producers, outboxes, collect in self._start_streams(
+                    self.runnable_tasks(), set(futures.values()), dependents, consumers
+                ):
+                    input_ds = self._make_task_inputs(t, ds)
+                    t.status = TaskStatus.RUNNING
+                    futures[pool.submit(self._run_stage, t, input_ds, inbox, producers, outboxes, collect)] = t
+
+                if not futures:
+                    logger.debug("no runnables tasks, exit")
+                    break
+
+                done, _ = wait(futures.keys(), return_when=FIRST_COMPLETED)
+                # パイプラインの各ステージはほぼ同時に終わるので、完了順に処理して最後の出力を返す
+                for f in sorted(done, key=lambda f: futures[f].trace.get("finished", 0.0)):
+                    gt = futures.pop(f)
+                    try:
+                        f.result()
+                        last_ds = gt.output_ds
+                        self._task_completed(gt)
+                    except BaseException as e:
+                        if self._cancelled(e):
+                            gt.status = TaskStatus.CANCELLED
+                        elif not isinstance(e, StreamCancelled):
+                            # ストリームは中断済みなので、残りのステージの終了を待ってからエラー処理する
+                            error = error if error else (gt, e)
+
+            if futures:
+                wait(futures.keys())
+                for f, gt in futures.items():
+                    if f.exception() is None:
+                        self._task_completed(gt)
+                    elif self._cancelled(f.exception()):
+                        gt.status = TaskStatus.CANCELLED
+        finally:
+            pool.shutdown(wait=True)
+
+        if error:
+            gt, e = error
+            if not self._handle_error(gt, gt.input_ds, e):
+                raise e
+
+        return self._end_run(last_ds, ds)
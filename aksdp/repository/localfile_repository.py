@@ -2,6 +2,7 @@ from logging import getLogger
 from .repository import Repository
 from pathlib import Path
 from aksdp.data import Data, DataType
+from typing import Optional
 import json
 
 logger = getLogger(__name__)
@@ -20,9 +21,29 @@ class LocalFileRepository(Repository):
             self.path.write_bytes(json_str.encode("utf-8"))
         elif data.data_type == DataType.DATAFRAME:
             data.content.to_csv(str(self.path), index=False)
+        elif data.data_type == DataType.PARQUET:
+            data.write(self.path)
         else:
             raise ValueError("LocalFileRepository.save() not support DataType {data.data_type}")
 
     def load(self, ctor):
         raw_data = self.path.read_bytes()
         return ctor(raw_data, self)
+
+    def load_path(self, ctor):
+        """ファイルパスを渡して読み込む (ファイルの一部だけを読む形式向け)
+
+        Args:
+            ctor (Callable): (ファイルパス, リポジトリ) から Data を作る関数
+
+        Returns:
+            Data: 読み込んだ Data
+        """
+        return ctor(self.path, self)
+
+    def identity(self) -> Optional[str]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return f"file://{self.path.resolve()}:{st.st_size}:{st.st_mtime_ns}"
@@ -14,7 +14,7 @@ class PandasDbRepository(Repository):
         self.table_name = table_name
 
     def save(self, data: Data):
-        if data.data_type == DataType.DATAFRAME:
+        if data.data_type in (DataType.DATAFRAME, DataType.PARQUET):
             data.content.to_sql(self.table_name, self.engine, if_exists="replace", index=False)
         else:
             raise ValueError("PandasDbRepository.save() not support DataType {data.data_type}")
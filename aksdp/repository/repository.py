@@ -1,7 +1,29 @@
 from abc import ABCMeta, abstractmethod
+from typing import List, Optional
 
 
 class Repository(metaclass=ABCMeta):
+    # True の場合、DataSet.save_all() で同じリポジトリへの保存を save_many() にまとめる
+    batch_save = False
+
     @abstractmethod
     def save(self, data):
         pass
+
+    def save_many(self, datas: List):
+        """複数 Data の保存
+
+        Args:
+            datas (List[Data]): 保存する Data
+        """
+        for d in datas:
+            self.save(d)
+
+    def identity(self) -> Optional[str]:
+        """保存されている内容を読み込まずに識別する文字列 (内容が変わると変わる)
+        LazyData が読み込み前にキャッシュキーを求めるために使用する
+
+        Returns:
+            Optional[str]: 識別する文字列。求められない場合 None
+        """
+        return None
@@ -4,6 +4,7 @@ from logging import getLogger
 from .localfile_repository import LocalFileRepository
 from pathlib import Path
 from aksdp.data import Data
+from typing import Optional
 from urllib.parse import urlparse
 
 logger = getLogger(__name__)
@@ -34,12 +35,19 @@ class S3FileRepository(LocalFileRepository):
 
         self._upload_extra_args = {}
 
-    def load(self, ctor):
+    def _download(self):
         logger.debug(f"s3 download {self.s3_url} -> {self.path.resolve()}")
         with open(self.path.resolve(), "wb") as f:
             self.s3client.download_fileobj(self.s3_bucket, self.s3_key, f)
+
+    def load(self, ctor):
+        self._download()
         return super().load(ctor)
 
+    def load_path(self, ctor):
+        self._download()
+        return super().load_path(ctor)
+
     def save(self, data: Data):
         super().save(data)
 
@@ -48,6 +56,14 @@ class S3FileRepository(LocalFileRepository):
             str(self.path.resolve()), self.s3_bucket, self.s3_key, ExtraArgs=self.upload_extra_args
         )
 
+    def identity(self) -> Optional[str]:
+        try:
+            etag = self.s3client.head_object(Bucket=self.s3_bucket, Key=self.s3_key)["ETag"]
+        except Exception as e:
+            logger.debug(f"s3 head_object failed {self.s3_url}, {str(e)}")
+            return None
+        return f"{self.s3_url}:{etag}"
+
     @property
     def upload_extra_args(self) -> dict:
         return self._upload_extra_args
@@ -2,12 +2,15 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 from logging import getLogger
 from aksdp.data import Data, DataType
 from .repository import Repository
+from typing import List
 
 logger = getLogger(__name__)
 
 
 class SqlAlchemyRepository(Repository):
     Session = None
+    # セッションはスレッド間で共有できないため、同じリポジトリへの保存は1回の commit にまとめる
+    batch_save = True
 
     def __init__(self, engine):
         session_factory = sessionmaker(bind=engine)
@@ -27,6 +30,12 @@ class SqlAlchemyRepository(Repository):
         else:
             raise ValueError(f"SqlAlchemyRepository.save() not support DataType {data.data_type}")
 
+    def save_many(self, datas: List[Data]):
+        for data in datas:
+            if data.data_type != DataType.SQLALCHEMY_MODEL:
+                raise ValueError(f"SqlAlchemyRepository.save() not support DataType {data.data_type}")
+        self.commit()
+
     def query(self, model_class):
         return self.session.query(model_class)
 
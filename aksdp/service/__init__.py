@@ -0,0 +1,3 @@
+# flake8: noqa: F401
+
+from .graph_service import GraphService as GraphService
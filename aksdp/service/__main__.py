@@ -0,0 +1,20 @@
+"""Graph 定義ファイルをHTTPサービスとして起動する
+
+    $ python -m aksdp.service graph.yml --port 8080 --size 4
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from .graph_service import GraphService
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("config", help="graph definition file (yaml/json)")
+    parser.add_argument("--host", default="127.0.0.1", help="listen address")
+    parser.add_argument("--port", type=int, default=8080, help="listen port")
+    parser.add_argument("--size", type=int, default=4, help="number of warm graphs (concurrent invocations)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    GraphService.from_file(Path(args.config), args.size).serve(args.host, args.port)
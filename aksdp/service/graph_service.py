@@ -0,0 +1,218 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from logging import getLogger
+from pathlib import Path
+from aksdp.data import JsonData
+from aksdp.dataset import DataSet
+from aksdp.graph import Graph
+from typing import Callable, Dict
+import collections
+import json
+import queue
+import socketserver
+import threading
+import time
+
+logger = getLogger(__name__)
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer は Python 3.7 以降のため同じものを定義する
+    daemon_threads = True
+
+
+class GraphService:
+    """組み立て済みの Graph を保持して繰り返し実行するサービス
+
+    起動時に size 個の Graph を組み立てておき(タスクモジュールの import や executor の生成は起動時のみ)、
+    呼び出しの度に空いている Graph を reset() して実行する。同時に size 件まで並行して実行できる。
+    serve() で HTTP エンドポイントとして公開できる。
+    """
+
+    def __init__(self, builder: Callable[[], Graph], size: int = 4, history: int = 10000):
+        """.ctor
+
+        Args:
+            builder (Callable[[], Graph]): Graph を組み立てる関数
+            size (int, optional): 保持する Graph の数(同時実行数). Defaults to 4.
+            history (int, optional): レイテンシ集計に使う直近の呼び出し数. Defaults to 10000.
+        """
+        self.size = size
+        self._graphs = queue.Queue()
+        for _ in range(size):
+            self._graphs.put(builder())
+
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=history)
+        self._count = 0
+        self._errors = 0
+
+    @classmethod
+    def from_file(cls, path: Path, size: int = 4) -> "GraphService":
+        """YAML/JSON 定義ファイルから組み立てるサービスの作成
+
+        Args:
+            path (Path): Graph 定義ファイル
+            size (int, optional): 保持する Graph の数(同時実行数). Defaults to 4.
+
+        Returns:
+            GraphService: サービス
+        """
+        from aksdp.util.graph_factory import create_from_file
+
+        return cls(lambda: create_from_file(Path(path)), size)
+
+    def invoke(self, ds: DataSet = None) -> DataSet:
+        """Graph の実行
+
+        Args:
+            ds (DataSet, optional): デフォルトDataSet. Defaults to None.
+
+        Returns:
+            DataSet: 最後に完了したタスクの出力DataSet
+        """
+        graph = self._graphs.get()
+        start = time.perf_counter()
+        try:
+            graph.reset()
+            output_ds = graph.run(ds)
+        except BaseException:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self._graphs.put(graph)
+            with self._lock:
+                self._count += 1
+                self._latencies.append(elapsed)
+
+        return output_ds
+
+    def stats(self) -> dict:
+        """呼び出し回数・エラー数・レイテンシ(秒)のパーセンタイル
+
+        Returns:
+            dict: 統計情報
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            count, errors = self._count, self._errors
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))]
+
+        return {
+            "count": count,
+            "errors": errors,
+            "mean": sum(latencies) / len(latencies) if latencies else None,
+            "p50": percentile(50),
+            "p90": percentile(90),
+            "p99": percentile(99),
+            "max": latencies[-1] if latencies else None,
+        }
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8080, ready: Callable = None):
+        """HTTP エンドポイントとして公開する(終了するまで戻らない)
+
+        POST /run : 入力DataSetを受け取って実行し、出力DataSetを返す
+            入力は application/json の {key: 中身} で、各値を JsonData として渡す。出力も {key: 中身} で返す
+            (認証なしで受け付けるため、pickle した DataSet は受け付けない)
+        GET /stats : stats() の結果を JSON で返す
+
+        Args:
+            host (str, optional): 待ち受けアドレス. Defaults to "127.0.0.1".
+            port (int, optional): 待ち受けポート。0 の場合は空きポート. Defaults to 8080.
+            ready (Callable, optional): 待ち受け開始時に (host, port) を渡して呼ぶ関数. Defaults to None.
+        """
+        server = self.create_server(host, port)
+        try:
+            if ready:
+                ready(server.server_address[:2])
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+    def create_server(self, host: str = "127.0.0.1", port: int = 8080) -> HTTPServer:
+        """HTTP サーバの作成 (serve_forever/shutdown は呼び出し側で行う)
+
+        Args:
+            host (str, optional): 待ち受けアドレス. Defaults to "127.0.0.1".
+            port (int, optional): 待ち受けポート。0 の場合は空きポート. Defaults to 8080.
+
+        Returns:
+            HTTPServer: HTTP サーバ (リクエストごとにスレッドで処理する)
+        """
+        handler = type("Handler", (_Handler,), {"service": self})
+        server = _ThreadingHTTPServer((host, port), handler)
+        logger.info(f"graph service listening on {server.server_address[0]}:{server.server_address[1]}")
+        return server
+
+
+def _to_json(ds: DataSet) -> Dict:
+    r = {}
+    if ds:
+        for k in ds.keys():
+            content = ds.get(k).content
+            if hasattr(content, "to_dict"):
+                # DataFrame
+                content = content.to_dict(orient="records")
+            r[k] = content
+    return r
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: GraphService = None
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _reply(self, code: int, body: bytes, content_type: str):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reply_json(self, code: int, obj):
+        self._reply(code, json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8"), "application/json")
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._reply_json(200, self.service.stats())
+        else:
+            self._reply_json(404, {"error": "not found"})
+
+    def _read_input(self) -> DataSet:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        ds = DataSet()
+        for k, v in (json.loads(body) if body else {}).items():
+            ds.put(k, JsonData(v))
+        return ds
+
+    def do_POST(self):
+        if self.path != "/run":
+            self._reply_json(404, {"error": "not found"})
+            return
+
+        content_type = self.headers.get("Content-Type")
+        if content_type and not content_type.startswith("application/json"):
+            self._reply_json(415, {"error": f"unsupported content type {content_type}"})
+            return
+
+        try:
+            ds = self._read_input()
+        except BaseException as e:
+            self._reply_json(400, {"error": str(e)})
+            return
+
+        try:
+            output_ds = self.service.invoke(ds)
+        except BaseException as e:
+            logger.error(f"graph run failed, {str(e)}")
+            self._reply_json(500, {"error": str(e)})
+            return
+
+        self._reply_json(200, _to_json(output_ds))
@@ -1,3 +1,12 @@
 # flake8: noqa: F401
 
 from .task import Task as Task
+from .cancellation import CancellationToken as CancellationToken
+from .cancellation import TaskCancelledError as TaskCancelledError
+from .cancellation import TaskTimeoutError as TaskTimeoutError
+from .streaming_task import StreamingTask as StreamingTask
+
+try:
+    from .partitioned_task import PartitionedTask as PartitionedTask
+except ImportError:
+    pass
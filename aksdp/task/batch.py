@@ -0,0 +1,66 @@
+from aksdp.data import Data, JsonData, RawData
+from aksdp.dataset import DataSet
+from typing import Any, Iterable, List
+import copy
+
+try:
+    import pandas as pd
+    from aksdp.data import DataFrameData
+except ImportError:
+    pd = None
+    DataFrameData = None
+
+
+def _with_content(data: Data, content: Any) -> Data:
+    # 連結元と同じクラス・リポジトリ等の属性を持つ Data を作る
+    r = copy.copy(data)
+    r.content_ = content
+    return r
+
+
+def concat_data(datas: List[Data]) -> Data:
+    """同じ key の Data の連結
+    DataFrameData は行方向に連結、内容がリストの JsonData はリストを連結、RawData はバイト列を連結する。
+    全て同じ Data (入力をそのまま出力した場合等)の場合と、連結できない場合は連結しない。
+    連結した Data のクラス・リポジトリは先頭の Data に合わせる
+
+    Args:
+        datas (List[Data]): 連結する Data (順序通り)
+
+    Returns:
+        Data: 連結した Data。全て同じ Data の場合は先頭、連結できない場合は最後の Data
+    """
+    if all([d is datas[0] for d in datas]):
+        return datas[0]
+
+    if DataFrameData is not None and all([isinstance(d, DataFrameData) for d in datas]):
+        return _with_content(datas[0], pd.concat([d.content for d in datas]))
+    if all([isinstance(d, JsonData) and isinstance(d.content, list) for d in datas]):
+        return _with_content(datas[0], [v for d in datas for v in d.content])
+    if all([isinstance(d, RawData) for d in datas]):
+        return _with_content(datas[0], b"".join([d.content for d in datas]))
+    return datas[-1]
+
+
+def concat_datasets(datasets: List[DataSet], shared_keys: Iterable[str] = ()) -> DataSet:
+    """DataSet の key ごとの連結
+
+    Args:
+        datasets (List[DataSet]): 連結する DataSet (順序通り)
+        shared_keys (Iterable[str], optional): 全 DataSet で共通の内容を持つ key。連結せず先頭の Data を使う.
+            Defaults to ().
+
+    Returns:
+        DataSet: 連結した DataSet
+    """
+    keys = []
+    for o in datasets:
+        if o:
+            keys.extend([k for k in o.keys() if k not in keys])
+
+    shared_keys = set(shared_keys)
+    ds = DataSet()
+    for k in keys:
+        datas = [o.get(k) for o in datasets if o and k in o.keys()]
+        ds.put(k, datas[0] if k in shared_keys else concat_data(datas))
+    return ds
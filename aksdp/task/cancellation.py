@@ -0,0 +1,62 @@
+import threading
+
+
+class TaskCancelledError(Exception):
+    """タスクの実行が取り消された"""
+
+    pass
+
+
+class TaskTimeoutError(TaskCancelledError):
+    """タスクの実行が制限時間を超えた"""
+
+    pass
+
+
+class CancellationToken:
+    """協調的な取り消し通知
+
+    Graph がタスクの取り消しを要求すると cancelled が True になる。
+    時間のかかるタスクは main の途中で cancelled を確認するか raise_if_cancelled() を呼んで処理を打ち切ること。
+    親トークンを指定すると、親が取り消された場合も取り消し扱いになる。
+    別プロセスには取り消し状態を伝えられないため、pickle すると未取り消しのトークンになる。
+    """
+
+    def __init__(self, parent: "CancellationToken" = None):
+        """.ctor
+
+        Args:
+            parent (CancellationToken, optional): 親トークン. Defaults to None.
+        """
+        self.parent = parent
+        self.reason = None
+        self._event = threading.Event()
+
+    def __getstate__(self) -> dict:
+        return {"parent": None, "reason": None}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = "cancelled"):
+        """取り消しの要求
+
+        Args:
+            reason (str, optional): 取り消し理由. Defaults to "cancelled".
+        """
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def raise_if_cancelled(self):
+        """取り消されていれば TaskCancelledError を送出する
+        """
+        if self._event.is_set():
+            raise TaskCancelledError(self.reason)
+        if self.parent is not None:
+            self.parent.raise_if_cancelled()
@@ -0,0 +1,95 @@
+from aksdp.data import DataFrameData
+from aksdp.dataset import DataSet
+from typing import List
+from .task import Task
+from .batch import concat_datasets
+import copy
+import os
+import time
+
+
+class PartitionedTask(Task):
+    """入力DataFrameを行方向に分割して部分ごとに main を実行するタスク
+
+    partition_datakey() の DataFrameData を num_partitions() 個に分割し、部分ごとに main を呼び出す。
+    ConcurrentGraph/ProcessGraph では部分ごとに executor で並列実行される。
+    各部分の出力DataSetは key ごとに DataFrameData を連結して1つの出力DataSetにまとめる。
+    分割しなかった入力データは、output_datakeys() に含まれない限りそのまま出力されたものとして連結しない。
+    """
+
+    # split() で分割しなかった入力データの key (merge() で連結しない)
+    _shared_datakeys: List[str] = []
+
+    def partition_datakey(self) -> str:
+        """分割する入力データの key。既定では input_datakeys() の先頭
+
+        Returns:
+            str: 分割する入力データの key
+        """
+        keys = self.input_datakeys()
+        return keys[0] if keys else None
+
+    def num_partitions(self) -> int:
+        """分割数。既定では params["partitions"]、未指定ならCPU数
+
+        Returns:
+            int: 分割数
+        """
+        return int(self.params.get("partitions", os.cpu_count() or 1))
+
+    def split(self, ds: DataSet) -> List[DataSet]:
+        """入力DataSetの分割
+
+        Args:
+            ds (DataSet): 入力DataSet
+
+        Returns:
+            List[DataSet]: 部分ごとの入力DataSet
+        """
+        key = self.partition_datakey()
+        self._shared_datakeys = []
+        if ds is None or key is None or key not in ds.keys():
+            return [ds]
+
+        outputs = set(self.output_datakeys())
+        self._shared_datakeys = [k for k in ds.keys() if k != key and k not in outputs]
+
+        df = ds.get(key).content
+        n = max(1, min(self.num_partitions(), len(df)))
+        size = -(-len(df) // n)
+
+        parts = []
+        for i in range(n):
+            # 分割対象以外のデータは各部分で共有する
+            part = DataSet.chain(ds)
+            part.put(key, DataFrameData(df.iloc[i * size : (i + 1) * size]))
+            parts.append(part)
+        return parts
+
+    def merge(self, outputs: List[DataSet]) -> DataSet:
+        """部分ごとの出力DataSetの連結 (DataFrameData は行方向に連結する。分割しなかった入力データは連結しない)
+
+        Args:
+            outputs (List[DataSet]): 部分ごとの出力DataSet (分割順)
+
+        Returns:
+            DataSet: 出力DataSet
+        """
+        return concat_datasets(outputs, self._shared_datakeys)
+
+    def run_partition(self, ds: DataSet) -> DataSet:
+        """1つの部分の実行。並列実行時にタスクの状態が混ざらないよう複製して実行する
+
+        Args:
+            ds (DataSet): 部分の入力DataSet
+
+        Returns:
+            DataSet: 部分の出力DataSet
+        """
+        return Task.gmain(copy.copy(self), ds)
+
+    def gmain(self, d: DataSet) -> DataSet:
+        start = time.time()
+        r = self.merge([self.run_partition(p) for p in self.split(d)])
+        self._elapsed_time = time.time() - start
+        return r
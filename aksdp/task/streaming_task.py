@@ -0,0 +1,62 @@
+from aksdp.dataset import DataSet
+from typing import Iterable, Iterator, List
+from .task import Task
+from .batch import concat_datasets
+import time
+
+
+class StreamingTask(Task):
+    """出力を DataSet のバッチとして順に yield するタスク
+
+    main はジェネレータとして実装し、出力DataSetをバッチ単位で yield する。
+    StreamingGraph で依存元も StreamingTask の場合、main は依存元のバッチ1つごとに
+    (バッチ以外の入力とバッチを合わせた DataSet を引数として)呼び出される。
+    全バッチの処理後に finish が呼ばれるので、集計結果等はそこで yield する。
+    StreamingGraph 以外の Graph では、全バッチを連結した DataSet を出力とする。
+    """
+
+    def finish(self) -> Iterator[DataSet]:
+        """全バッチの処理後に呼ばれる。残りの出力があれば yield する
+
+        Returns:
+            Iterator[DataSet]: 出力DataSetのバッチ
+        """
+        return iter([])
+
+    def merge(self, batches: List[DataSet]) -> DataSet:
+        """出力バッチの連結 (StreamingGraph 以外で実行した場合、および後続が通常のタスクの場合に使用)
+
+        Args:
+            batches (List[DataSet]): 出力DataSetのバッチ
+
+        Returns:
+            DataSet: 出力DataSet
+        """
+        return concat_datasets(batches)
+
+    def stream(self, d: DataSet, batches: Iterable[DataSet] = None) -> Iterator[DataSet]:
+        """バッチ単位の実行
+
+        Args:
+            d (DataSet): 入力DataSet
+            batches (Iterable[DataSet], optional): 依存元から受け取るバッチ。None の場合は d で main を1回呼ぶ.
+                Defaults to None.
+
+        Returns:
+            Iterator[DataSet]: 出力DataSetのバッチ
+        """
+        start = time.time()
+        if batches is None:
+            self._expand_inputs(d)
+            yield from self.main(d)
+        else:
+            for b in batches:
+                bd = DataSet.chain(d, b)
+                self._expand_inputs(bd)
+                yield from self.main(bd)
+
+        yield from self.finish()
+        self._elapsed_time = time.time() - start
+
+    def gmain(self, d: DataSet) -> DataSet:
+        return self.merge(list(self.stream(d)))
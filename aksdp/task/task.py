@@ -1,10 +1,40 @@
 from aksdp.dataset import DataSet
 from abc import ABCMeta, abstractmethod
-from typing import List
+from typing import Any, Dict, Iterator, List
+from .cancellation import CancellationToken
+import collections.abc
 import time
 
 
+class _LazyInputs(collections.abc.Mapping):
+    """入力DataSetの中身を参照された時点で取り出す self._in
+    参照しない入力の読み込み(LazyData)や変換は行わない
+    """
+
+    def __init__(self, ds: DataSet):
+        self._ds = ds
+        self._cache = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._cache:
+            if key not in self._ds.keys():
+                raise KeyError(key)
+            self._cache[key] = self._ds.get(key).content
+        return self._cache[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._ds.keys()))
+
+    def __len__(self) -> int:
+        return len(self._ds.keys())
+
+
 class Task(metaclass=ABCMeta):
+    # サブクラスが super().__init__() を呼ばない場合の既定値
+    _params = None
+    _elapsed_time = None
+    _cancel_token: CancellationToken = None
+
     def __init__(self, params: dict = {}):
         """.ctor
         """
@@ -24,6 +54,16 @@ class Task(metaclass=ABCMeta):
         """
         pass
 
+    def _expand_inputs(self, d: DataSet):
+        """入力DataSetの中身を self._in から参照できるようにする
+        中身の取り出しは self._in[key] の初回参照時に行う
+
+        Args:
+            d (DataSet): 入力DataSet
+        """
+        # DataSet 自動展開
+        self._in = _LazyInputs(d) if d else {}
+
     def gmain(self, d: DataSet) -> DataSet:
         """タスクの処理(Graphから呼び出す用)
 
@@ -33,12 +73,7 @@ class Task(metaclass=ABCMeta):
         Returns:
             DataSet: 出力DataSet
         """
-        self._in = {}
-
-        # DataSet 自動展開
-        if d:
-            for k in d.keys():
-                self._in[k] = d.get(k).content
+        self._expand_inputs(d)
 
         # 実行
         start = time.time()
@@ -47,6 +82,32 @@ class Task(metaclass=ABCMeta):
 
         return r
 
+    async def gmain_async(self, d: DataSet) -> DataSet:
+        """タスクの処理(AsyncGraphから呼び出す用、main がコルーチンのタスク向け)
+
+        Args:
+            d (DataSet): 入力DataSet
+
+        Returns:
+            DataSet: 出力DataSet
+        """
+        self._expand_inputs(d)
+
+        # 実行
+        start = time.time()
+        r = await self.main(d)
+        self._elapsed_time = time.time() - start
+
+        return r
+
+    def __getstate__(self) -> dict:
+        # 展開済みの入力(self._in)は pickle 対象から外す
+        state = self.__dict__.copy()
+        state["_in"] = {}
+        # 取り消し通知は実行中の Graph に紐付くものなので保存しない
+        state.pop("_cancel_token", None)
+        return state
+
     def input_datakeys(self) -> List[str]:
         """入力DataSetの中から実際に使用するデータの key を列挙する
 
@@ -63,6 +124,48 @@ class Task(metaclass=ABCMeta):
         """
         return []
 
+    def cacheable(self) -> bool:
+        """実行結果をキャッシュしてよいかどうか
+        入力・params 以外(外部DB・現在時刻等)に結果が依存するタスクは False を返すこと
+
+        Returns:
+            bool: キャッシュ可否
+        """
+        return True
+
+    def resources(self) -> Dict[str, Any]:
+        """タスクの実行に必要なリソース量を列挙する
+        既定では params["resources"] を使用する
+
+        Returns:
+            Dict[str, Any]: リソース名→必要量 (例: {"cpu": 1, "memory": "8GB"})
+        """
+        return self.params.get("resources", {})
+
+    def timeout(self) -> float:
+        """タスクの制限時間(秒)。ConcurrentGraph で超過すると取り消す
+        既定では params["timeout"] を使用する
+
+        Returns:
+            float: 制限時間。無制限の場合 None
+        """
+        return self.params.get("timeout")
+
+    @property
+    def cancelled(self) -> bool:
+        """Graph から取り消しを要求されたかどうか
+
+        Returns:
+            bool: 取り消し要求の有無
+        """
+        return self._cancel_token is not None and self._cancel_token.cancelled
+
+    def raise_if_cancelled(self):
+        """取り消しを要求されていれば TaskCancelledError を送出する
+        """
+        if self._cancel_token is not None:
+            self._cancel_token.raise_if_cancelled()
+
     @property
     def elapsed_time(self):
         """実行時間の取得
@@ -1,6 +1,7 @@
 # flake8: noqa: F401
 
 from .plantuml import PlantUML as PlantUML
+from .chrome_trace import ChromeTrace as ChromeTrace
 
 try:
     from .airflow import AirFlow as AirFlow
@@ -0,0 +1,83 @@
+from logging import getLogger
+from aksdp.graph import Graph
+from pathlib import Path
+from typing import List
+import json
+
+logger = getLogger(__name__)
+
+
+class ChromeTrace:
+    """Graph の実行トレースを Chrome trace-event 形式に変換する
+
+    出力したJSONは Perfetto (https://ui.perfetto.dev) や chrome://tracing で開ける。
+    タスク本体(main)・実行前/後フック・入力DataSet作成(inputs)を、実行したプロセス/スレッドごとに並べる。
+    """
+
+    SPANS = ["inputs", "pre_hook", "main", "post_hook"]
+
+    @classmethod
+    def graph_to_events(cls, graph: Graph) -> List[dict]:
+        traced = [(i, gt) for i, gt in enumerate(graph.graph) if gt.trace.get("scheduled") is not None]
+        if not traced:
+            return []
+
+        origin = min([gt.trace["scheduled"] for _, gt in traced])
+
+        def us(t: float) -> float:
+            return round((t - origin) * 1e6, 3)
+
+        events = []
+        threads = {}
+        for i, gt in traced:
+            name = gt.task.__class__.__name__
+            spans = dict([(k, gt.trace[k]) for k in cls.SPANS if k in gt.trace])
+
+            if "inputs" in spans:
+                threads.setdefault((spans["inputs"]["pid"], spans["inputs"]["tid"]), "scheduler")
+
+            # inputs 作成後から実行開始までをキュー待ち時間とする
+            queued = None
+            begin = [spans[k]["start"] for k in ["pre_hook", "main"] if k in spans]
+            if "inputs" in spans and begin:
+                queued = max(0.0, min(begin) - spans["inputs"]["end"])
+
+            for k, span in spans.items():
+                threads.setdefault((span["pid"], span["tid"]), None)
+
+                args = {"index": i, "status": gt.status.name}
+                if k == "main" and queued is not None:
+                    args["queued_ms"] = round(queued * 1000, 3)
+
+                events.append(
+                    {
+                        "name": name if k == "main" else f"{name}.{k}",
+                        "cat": k,
+                        "ph": "X",
+                        "ts": us(span["start"]),
+                        "dur": round(max(0.0, span["end"] - span["start"]) * 1e6, 3),
+                        "pid": span["pid"],
+                        "tid": span["tid"],
+                        "args": args,
+                    }
+                )
+
+        # スレッド名のメタデータ
+        n = 0
+        for (pid, tid), label in threads.items():
+            if label is None:
+                label = f"worker-{n}"
+                n += 1
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": label}})
+
+        return events
+
+    @classmethod
+    def graph_to_json(cls, graph: Graph) -> str:
+        return json.dumps({"traceEvents": cls.graph_to_events(graph), "displayTimeUnit": "ms"})
+
+    @classmethod
+    def save(cls, graph: Graph, path: Path):
+        with open(path, "w") as f:
+            f.write(cls.graph_to_json(graph))
+        logger.info(f"chrome trace saved. ({str(path)})")
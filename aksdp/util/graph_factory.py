@@ -2,8 +2,10 @@ import yaml
 import json
 from pathlib import Path
 from logging import getLogger
-from aksdp.graph import Graph, ConcurrentGraph, DebugGraph
+from aksdp.graph import Graph, ConcurrentGraph, DebugGraph, ProcessGraph, AsyncGraph, StreamingGraph
+from aksdp.graph import CriticalPathPolicy, Checkpoint
 from aksdp.task import Task
+from aksdp.cache import TaskCache
 from typing import List
 import importlib
 
@@ -14,13 +16,25 @@ logger = getLogger(__name__)
 includes:
     - xxx.yaml
 graph:
-    class: Graph/ConcurrentGraph/DebugGraph
+    class: Graph/ConcurrentGraph/ProcessGraph/AsyncGraph/StreamingGraph/DebugGraph
     base_dir: DebugGraph only
+    policy: fifo/critical_path (ConcurrentGraph/ProcessGraph only)
+    resources: (ConcurrentGraph/ProcessGraph only)
+      cpu: 8
+      memory: 32GB
+    max_concurrency: AsyncGraph only
+    queue_depth: StreamingGraph only
+    cache:
+      dir: cache directory
+      max_bytes: 1073741824
+    checkpoint_dir: checkpoint directory
 
 tasks:
   - name:
     class:
     params:
+      resources:
+        memory: 8GB
     dependencies:
       - 
   - class:
@@ -29,13 +43,35 @@ tasks:
 """
 
 
+def create_policy(config: dict):
+    policy = config.get("policy")
+    if policy == "critical_path":
+        return CriticalPathPolicy()
+    return None
+
+
 def create_graph(config: dict) -> Graph:
     clazz = config.get("class")
     if clazz == "ConcurrentGraph":
-        return ConcurrentGraph()
+        graph = ConcurrentGraph(policy=create_policy(config), resources=config.get("resources"))
+    elif clazz == "ProcessGraph":
+        graph = ProcessGraph(policy=create_policy(config), resources=config.get("resources"))
+    elif clazz == "AsyncGraph":
+        graph = AsyncGraph(max_concurrency=config.get("max_concurrency"))
+    elif clazz == "StreamingGraph":
+        graph = StreamingGraph(queue_depth=config.get("queue_depth", 4))
     elif clazz == "DebugGraph":
-        return DebugGraph(Path(config.get("base_dir")))
-    return Graph()
+        graph = DebugGraph(Path(config.get("base_dir")))
+    else:
+        graph = Graph()
+
+    cache = config.get("cache")
+    if cache:
+        graph.cache = TaskCache(Path(cache.get("dir")), cache.get("max_bytes", 1024 ** 3))
+
+    if config.get("checkpoint_dir"):
+        graph.checkpoint = Checkpoint(Path(config.get("checkpoint_dir")))
+    return graph
 
 
 def create_tasks(task_config: list) -> List[Task]:
@@ -0,0 +1,50 @@
+"""ConcurrentGraph のタスクあたりスケジューリングオーバーヘッド計測
+
+    $ python -m benchmarks.concurrent_graph_overhead -n 500
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aksdp.graph import ConcurrentGraph
+
+from .dag import SleepTask, build_deep, build_wide
+
+SHAPES = {"wide": build_wide, "deep": build_deep}
+
+
+def measure(shape: str, n: int, workers: int, sleep: float) -> dict:
+    graph = SHAPES[shape](ConcurrentGraph(ThreadPoolExecutor(workers)), n, SleepTask, {"sleep": sleep})
+
+    start = time.perf_counter()
+    graph.run()
+    elapsed = time.perf_counter() - start
+
+    # 理想的な実行時間(タスク本体の処理時間のみ)との差をオーバーヘッドとする
+    if shape == "deep":
+        ideal = n * sleep
+    else:
+        ideal = -(-n // workers) * sleep
+
+    return {
+        "shape": shape,
+        "tasks": n,
+        "workers": workers,
+        "elapsed": elapsed,
+        "overhead_per_task_ms": (elapsed - ideal) / n * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--tasks", type=int, default=500, help="number of tasks")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="number of pool workers")
+    parser.add_argument("-s", "--sleep", type=float, default=0.0, help="sleep seconds in each task")
+    args = parser.parse_args()
+
+    for shape in SHAPES:
+        r = measure(shape, args.tasks, args.workers, args.sleep)
+        print(
+            f"{r['shape']:>5}: tasks={r['tasks']} workers={r['workers']} elapsed={r['elapsed']:.3f}s"
+            f" overhead/task={r['overhead_per_task_ms']:.3f}ms"
+        )
@@ -0,0 +1,43 @@
+"""偏ったDAGでの FIFO / クリティカルパス優先スケジューリングの比較
+
+    $ python -m benchmarks.critical_path --width 24 --depth 8 -w 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aksdp.graph import ConcurrentGraph, CriticalPathPolicy, FifoPolicy
+
+from .dag import SleepTask, build_skewed
+
+
+def measure(policy, width: int, depth: int, workers: int, sleep: float):
+    graph = build_skewed(
+        ConcurrentGraph(ThreadPoolExecutor(workers), policy=policy), width, depth, SleepTask, {"sleep": sleep}
+    )
+
+    start = time.perf_counter()
+    graph.run()
+    return time.perf_counter() - start, graph
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=24, help="number of independent tasks")
+    parser.add_argument("--depth", type=int, default=8, help="length of the task chain")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="number of pool workers")
+    parser.add_argument("-s", "--sleep", type=float, default=0.05, help="sleep seconds in each task")
+    args = parser.parse_args()
+
+    fifo, graph = measure(FifoPolicy(), args.width, args.depth, args.workers, args.sleep)
+
+    # FIFO 実行時の elapsed_time を見積もりとして使う
+    policy = CriticalPathPolicy()
+    policy.record(graph)
+    cp, _ = measure(policy, args.width, args.depth, args.workers, args.sleep)
+
+    lower_bound = max(args.depth, (args.width + args.depth) / args.workers) * args.sleep
+    print(f"width={args.width} depth={args.depth} workers={args.workers} sleep={args.sleep}s")
+    print(f"         fifo: {fifo:.3f}s")
+    print(f"critical path: {cp:.3f}s")
+    print(f"  lower bound: {lower_bound:.3f}s")
@@ -0,0 +1,155 @@
+"""ベンチマーク用の合成DAG生成
+"""
+from aksdp.data import JsonData
+from aksdp.dataset import DataSet
+from aksdp.graph import Graph
+from aksdp.task import Task
+import random
+import time
+
+
+class NoopTask(Task):
+    """何もしないタスク
+    """
+
+    def main(self, ds):
+        return DataSet()
+
+
+class SleepTask(Task):
+    """params["sleep"] 秒スリープするタスク
+    """
+
+    def main(self, ds):
+        time.sleep(self.params.get("sleep", 0))
+        return DataSet()
+
+
+class BusyTask(Task):
+    """params["busy"] 秒CPUを使い続けるタスク
+    """
+
+    def main(self, ds):
+        end = time.perf_counter() + self.params.get("busy", 0)
+        while time.perf_counter() < end:
+            pass
+        return DataSet()
+
+
+class KeyedTask(Task):
+    """params["inputs"]/params["outputs"] を入出力データの key として宣言するタスク
+    params["sleep"] 秒スリープし、宣言した出力データを返す
+    """
+
+    def input_datakeys(self):
+        return self.params.get("inputs", [])
+
+    def output_datakeys(self):
+        return self.params.get("outputs", [])
+
+    def main(self, ds):
+        time.sleep(self.params.get("sleep", 0))
+        out = DataSet()
+        for k in self.output_datakeys():
+            out.put(k, JsonData({"key": k}))
+        return out
+
+
+def build_wide(graph: Graph, n: int, task_class=NoopTask, params: dict = None) -> Graph:
+    """互いに依存の無い n 個のタスクを並べる
+
+    Args:
+        graph (Graph): タスクを追加するGraph
+        n (int): タスク数
+        task_class (class, optional): タスクのクラス. Defaults to NoopTask.
+        params (dict, optional): タスクのパラメータ. Defaults to None.
+
+    Returns:
+        Graph: タスクを追加したGraph
+    """
+    for _ in range(n):
+        graph.append(task_class(params))
+    return graph
+
+
+def build_deep(graph: Graph, n: int, task_class=NoopTask, params: dict = None) -> Graph:
+    """n 個のタスクを一直線に依存させる
+
+    Args:
+        graph (Graph): タスクを追加するGraph
+        n (int): タスク数
+        task_class (class, optional): タスクのクラス. Defaults to NoopTask.
+        params (dict, optional): タスクのパラメータ. Defaults to None.
+
+    Returns:
+        Graph: タスクを追加したGraph
+    """
+    gt = None
+    for _ in range(n):
+        gt = graph.append(task_class(params), [gt] if gt else [])
+    return graph
+
+
+def build_skewed(graph: Graph, width: int, depth: int, task_class=SleepTask, params: dict = None) -> Graph:
+    """互いに依存の無い width 個のタスクの後に、depth 個の直列タスクを並べる
+    追加順に投入すると長い直列タスクの開始が遅れる形のDAG
+
+    Args:
+        graph (Graph): タスクを追加するGraph
+        width (int): 独立タスク数
+        depth (int): 直列タスク数
+        task_class (class, optional): タスクのクラス. Defaults to SleepTask.
+        params (dict, optional): タスクのパラメータ. Defaults to None.
+
+    Returns:
+        Graph: タスクを追加したGraph
+    """
+    build_wide(graph, width, task_class, params)
+    return build_deep(graph, depth, task_class, params)
+
+
+def build_diamond(graph: Graph, width: int, levels: int, task_class=NoopTask, params: dict = None) -> Graph:
+    """1タスクから width 個に分岐し、levels 段の格子を経て1タスクに合流するDAG
+    格子の各タスクは前段の隣接する(最大3個の)タスクに依存する
+
+    Args:
+        graph (Graph): タスクを追加するGraph
+        width (int): 格子の幅
+        levels (int): 格子の段数
+        task_class (class, optional): タスクのクラス. Defaults to NoopTask.
+        params (dict, optional): タスクのパラメータ. Defaults to None.
+
+    Returns:
+        Graph: タスクを追加したGraph
+    """
+    prev = [graph.append(task_class(params))]
+    for level in range(levels):
+        if level == 0:
+            prev = [graph.append(task_class(params), prev) for _ in range(width)]
+            continue
+        prev = [graph.append(task_class(params), prev[max(0, j - 1) : j + 2]) for j in range(width)]
+    graph.append(task_class(params), prev)
+    return graph
+
+
+def build_random(graph: Graph, n: int, fanin: int = 3, seed: int = 0, params: dict = None) -> Graph:
+    """入出力データの key を宣言した n 個の KeyedTask からなるランダムなDAG
+    依存関係は静的には指定せず、動的依存解決で決まる
+
+    Args:
+        graph (Graph): タスクを追加するGraph
+        n (int): タスク数
+        fanin (int, optional): 1タスクあたりの最大入力数. Defaults to 3.
+        seed (int, optional): 乱数シード. Defaults to 0.
+        params (dict, optional): タスクのパラメータ(inputs/outputs 以外). Defaults to None.
+
+    Returns:
+        Graph: タスクを追加したGraph
+    """
+    rnd = random.Random(seed)
+    for i in range(n):
+        inputs = [f"k{j}" for j in sorted(rnd.sample(range(i), min(i, rnd.randint(0, fanin))))]
+        p = dict(params if params else {})
+        p.update({"inputs": inputs, "outputs": [f"k{i}"]})
+        graph.append(KeyedTask(p))
+    return graph
@@ -0,0 +1,56 @@
+"""GraphService (組み立て済みGraphの再利用) と呼び出し毎の組み立てのレイテンシ比較
+
+    $ python -m benchmarks.graph_service_latency -n 500 -c 8
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aksdp.graph import ConcurrentGraph
+from aksdp.service import GraphService
+
+from .dag import NoopTask, build_diamond
+
+
+def build() -> ConcurrentGraph:
+    return build_diamond(ConcurrentGraph(ThreadPoolExecutor(4)), 4, 4, NoopTask)
+
+
+def cold_invoke(_) -> float:
+    start = time.perf_counter()
+    graph = build()
+    try:
+        graph.run()
+    finally:
+        graph.pool.shutdown()
+    return time.perf_counter() - start
+
+
+def percentiles(latencies) -> dict:
+    s = sorted(latencies)
+    return dict([(f"p{p}", s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]) for p in [50, 90, 99]])
+
+
+def report(name: str, stats: dict, elapsed: float, n: int):
+    print(
+        f"{name:>5}: p50={stats['p50'] * 1000:.2f}ms p90={stats['p90'] * 1000:.2f}ms"
+        f" p99={stats['p99'] * 1000:.2f}ms throughput={n / elapsed:.0f}req/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--requests", type=int, default=500, help="number of invocations")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="concurrent invocations")
+    args = parser.parse_args()
+
+    with ThreadPoolExecutor(args.concurrency) as clients:
+        # 呼び出し毎に Graph と executor を作る場合 (レイテンシには組み立て時間も含める)
+        start = time.perf_counter()
+        latencies = list(clients.map(cold_invoke, range(args.requests)))
+        report("cold", percentiles(latencies), time.perf_counter() - start, args.requests)
+
+        service = GraphService(build, size=args.concurrency)
+        start = time.perf_counter()
+        list(clients.map(lambda _: service.invoke(), range(args.requests)))
+        report("warm", service.stats(), time.perf_counter() - start, args.requests)
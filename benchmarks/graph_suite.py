@@ -0,0 +1,188 @@
+"""Graph 実装ごとのスケジューリングオーバーヘッド・スループット・メモリ使用量の計測
+
+合成DAG(chain/wide/diamond/random) × Graph実装(graph/concurrent/debug) × タスク(noop/sleep)を実行し、
+結果をJSONで保存する。保存したJSON同士を比較してコミット間の差分を確認できる。
+
+    $ python -m benchmarks.graph_suite -n 200 -o after.json
+    $ python -m benchmarks.graph_suite --compare before.json after.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from aksdp.graph import ConcurrentGraph, DebugGraph, Graph
+
+from .dag import NoopTask, SleepTask, build_deep, build_diamond, build_random, build_wide
+
+TASKS = {"noop": NoopTask, "sleep": SleepTask}
+
+
+def build(shape: str, graph: Graph, n: int, task: str, sleep: float) -> Graph:
+    params = {"sleep": sleep} if task == "sleep" else {}
+    if shape == "chain":
+        return build_deep(graph, n, TASKS[task], params)
+    if shape == "wide":
+        return build_wide(graph, n, TASKS[task], params)
+    if shape == "diamond":
+        width = 8
+        return build_diamond(graph, width, max(1, (n - 2) // width), TASKS[task], params)
+    if shape == "random":
+        return build_random(graph, n, params=params)
+    raise ValueError(f"unknown shape {shape}")
+
+
+def new_graph(kind: str, workers: int, work_dir: Path) -> Graph:
+    if kind == "graph":
+        return Graph()
+    if kind == "concurrent":
+        return ConcurrentGraph(ThreadPoolExecutor(workers))
+    if kind == "debug":
+        return DebugGraph(work_dir)
+    raise ValueError(f"unknown graph {kind}")
+
+
+def ideal_time(graph: Graph, workers: int) -> float:
+    """タスク本体の処理時間のみから求めた理想的な実行時間
+
+    直列実行なら処理時間の合計、並列実行なら クリティカルパス長 と 合計/ワーカー数 の大きい方。
+    """
+    duration = {}
+    for gt in graph.graph:
+        main = gt.trace.get("main")
+        duration[gt] = main["end"] - main["start"] if main else 0.0
+
+    work = sum(duration.values())
+    if not isinstance(graph, ConcurrentGraph):
+        return work
+
+    # Graph への追加順は依存順になっている
+    finish = {}
+    for gt in graph.graph:
+        finish[gt] = duration[gt] + max([finish.get(d, 0.0) for d in gt.dependencies] + [0.0])
+    return max(max(finish.values()), work / workers)
+
+
+def measure(kind: str, shape: str, task: str, n: int, workers: int, sleep: float, repeat: int) -> dict:
+    runs = []
+    with tempfile.TemporaryDirectory() as d:
+        for _ in range(repeat):
+            graph = build(shape, new_graph(kind, workers, Path(d)), n, task, sleep)
+            start = time.perf_counter()
+            graph.run()
+            elapsed = time.perf_counter() - start
+            runs.append((elapsed, ideal_time(graph, workers), len(graph.graph)))
+
+        # メモリは計測時間に影響するので別に実行する
+        graph = build(shape, new_graph(kind, workers, Path(d)), n, task, sleep)
+        tracemalloc.start()
+        graph.run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    elapsed, ideal, tasks = sorted(runs)[len(runs) // 2]
+    return {
+        "graph": kind,
+        "shape": shape,
+        "task": task,
+        "tasks": tasks,
+        "elapsed": elapsed,
+        "ideal": ideal,
+        "overhead_per_task_us": max(0.0, elapsed - ideal) / tasks * 1e6,
+        "throughput": tasks / elapsed,
+        "peak_memory_bytes": peak,
+    }
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def compare(base: dict, new: dict, threshold: float) -> bool:
+    """2つの計測結果の比較
+
+    Returns:
+        bool: オーバーヘッドが threshold(%) 以上悪化した組み合わせがあれば True
+    """
+
+    def key(r):
+        return (r["graph"], r["shape"], r["task"], r["tasks"])
+
+    before = dict([(key(r), r) for r in base["results"]])
+    regressed = False
+
+    print(f"{'graph':>10} {'shape':>8} {'task':>6} {'tasks':>6} {'overhead/task(us)':>26} {'peak memory(KB)':>22}")
+    for r in new["results"]:
+        b = before.get(key(r))
+        if b is None:
+            continue
+
+        ratio = (r["overhead_per_task_us"] + 1e-9) / (b["overhead_per_task_us"] + 1e-9) - 1
+        mark = ""
+        if ratio * 100 >= threshold:
+            mark = " !"
+            regressed = True
+
+        print(
+            f"{r['graph']:>10} {r['shape']:>8} {r['task']:>6} {r['tasks']:>6}"
+            f" {b['overhead_per_task_us']:>9.1f} -> {r['overhead_per_task_us']:>9.1f} ({ratio:+6.1%})"
+            f" {b['peak_memory_bytes'] / 1024:>9.0f} -> {r['peak_memory_bytes'] / 1024:>9.0f}{mark}"
+        )
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--tasks", type=int, default=200, help="number of tasks per graph")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="number of pool workers")
+    parser.add_argument("-s", "--sleep", type=float, default=0.001, help="sleep seconds in sleep tasks")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="repeat count (median is reported)")
+    parser.add_argument("--graphs", nargs="+", default=["graph", "concurrent", "debug"])
+    parser.add_argument("--shapes", nargs="+", default=["chain", "wide", "diamond", "random"])
+    parser.add_argument("--task-types", nargs="+", default=list(TASKS.keys()))
+    parser.add_argument("-o", "--output", help="save results as json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        sys.exit(1 if compare(base, new, args.threshold) else 0)
+
+    results = []
+    for kind in args.graphs:
+        for shape in args.shapes:
+            for task in args.task_types:
+                r = measure(kind, shape, task, args.tasks, args.workers, args.sleep, args.repeat)
+                results.append(r)
+                print(
+                    f"{kind:>10} {shape:>8} {task:>6}: tasks={r['tasks']} elapsed={r['elapsed']:.3f}s"
+                    f" overhead/task={r['overhead_per_task_us']:.1f}us throughput={r['throughput']:.0f}tasks/s"
+                    f" peak={r['peak_memory_bytes'] / 1024:.0f}KB"
+                )
+
+    if args.output:
+        params = {"tasks": args.tasks, "workers": args.workers, "sleep": args.sleep, "repeat": args.repeat}
+        with open(args.output, "w") as f:
+            json.dump({"meta": metadata(), "params": params, "results": results}, f, indent=2)
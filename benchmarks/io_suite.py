@@ -0,0 +1,222 @@
+"""Data × Repository の読み込み・保存性能の計測
+
+行数・列の型を変えたデータについて、Data と Repository の組み合わせごとに
+save/load のレイテンシ・スループット・ピークメモリを計測する。
+S3 は moto があれば moto、無ければローカルディレクトリを使う代替クライアントで計測する。
+
+    $ python -m benchmarks.io_suite --rows 1000 10000 100000 -o io.json
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from aksdp.data import DataFrameData, JsonData, ParquetData, RawData
+from aksdp.repository import LocalFileRepository, PandasDbRepository, S3FileRepository
+
+from .graph_suite import metadata
+
+
+class LocalS3Client:
+    """S3 クライアントの代替(バケット/キーをローカルディレクトリ上のファイルに対応させる)
+    S3FileRepository が使う upload_file/download_fileobj のみ実装
+    """
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+
+    def _path(self, bucket: str, key: str) -> Path:
+        return self.base_dir / bucket / key
+
+    def upload_file(self, filename: str, bucket: str, key: str, ExtraArgs: dict = None):
+        path = self._path(bucket, key)
+        os.makedirs(path.parent, exist_ok=True)
+        shutil.copyfile(filename, path)
+
+    def download_fileobj(self, bucket: str, key: str, fileobj):
+        with open(self._path(bucket, key), "rb") as f:
+            shutil.copyfileobj(f, fileobj)
+
+
+def make_dataframe(rows: int, column_type: str, columns: int = 8) -> pd.DataFrame:
+    rnd = np.random.default_rng(0)
+    data = {}
+    for i in range(columns):
+        t = column_type if column_type != "mixed" else ["int", "float", "str"][i % 3]
+        if t == "int":
+            data[f"c{i}"] = rnd.integers(0, 1000000, rows)
+        elif t == "float":
+            data[f"c{i}"] = rnd.random(rows)
+        elif t == "str":
+            data[f"c{i}"] = [f"value-{v}" for v in rnd.integers(0, 1000000, rows)]
+        else:
+            raise ValueError(f"unknown column type {column_type}")
+    return pd.DataFrame(data)
+
+
+def make_data(kind: str, df: pd.DataFrame):
+    if kind == "dataframe":
+        return DataFrameData(df)
+    if kind == "json":
+        return JsonData(df.to_dict(orient="records"))
+    if kind == "raw":
+        return RawData(df.to_csv(index=False).encode("utf-8"))
+    if kind == "parquet":
+        return ParquetData(df)
+    raise ValueError(f"unknown data {kind}")
+
+
+LOADERS = {"dataframe": DataFrameData.load, "json": JsonData.load, "raw": RawData.load, "parquet": ParquetData.load}
+EXTENSIONS = {"dataframe": ".csv", "json": ".json", "raw": ".bin", "parquet": ".parquet"}
+
+# 計測する Data × Repository の組み合わせ
+PAIRS = [
+    ("dataframe", "local"),
+    ("dataframe", "sqlite"),
+    ("dataframe", "s3"),
+    ("json", "local"),
+    ("json", "s3"),
+    ("raw", "local"),
+    ("raw", "s3"),
+    ("parquet", "local"),
+    ("parquet", "s3"),
+]
+
+
+class Repositories:
+    """計測用 Repository の生成"""
+
+    def __init__(self, work_dir: Path):
+        self.work_dir = Path(work_dir)
+        self.engine = create_engine(f"sqlite:///{self.work_dir / 'bench.sqlite3'}")
+        self.s3_backend = "local"
+        self._moto = None
+
+        try:
+            import boto3
+            from moto import mock_aws
+
+            self._moto = mock_aws()
+            self._moto.start()
+            boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="bench")
+            self.s3_backend = "moto"
+        except ImportError:
+            pass
+
+    def close(self):
+        if self._moto:
+            self._moto.stop()
+        self.engine.dispose()
+
+    def create(self, repo: str, name: str):
+        if repo == "local":
+            return LocalFileRepository(self.work_dir / name)
+        if repo == "sqlite":
+            return PandasDbRepository(self.engine, name.split(".")[0])
+        if repo == "s3":
+            r = S3FileRepository("dummy", "dummy", f"s3://bench/{name}")
+            if self.s3_backend == "local":
+                r.s3client = LocalS3Client(self.work_dir / "s3")
+            return r
+        raise ValueError(f"unknown repository {repo}")
+
+
+def stored_bytes(repos: Repositories, repo, kind: str) -> int:
+    if isinstance(repo, PandasDbRepository):
+        # テーブルサイズは取れないので CSV 換算のサイズで代用する
+        return len(LOADERS["raw"](repo).content)
+    return repo.path.stat().st_size
+
+
+def measure(repos: Repositories, kind: str, repo_kind: str, rows: int, column_type: str, repeat: int) -> dict:
+    df = make_dataframe(rows, column_type)
+    name = f"{kind}_{column_type}_{rows}{EXTENSIONS[kind]}"
+
+    saves, loads = [], []
+    for _ in range(repeat):
+        data = make_data(kind, df)
+        data.repository = repos.create(repo_kind, name)
+
+        start = time.perf_counter()
+        data.save()
+        saves.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        LOADERS[kind](data.repository)
+        loads.append(time.perf_counter() - start)
+
+    size = stored_bytes(repos, data.repository, kind)
+
+    # メモリは計測時間に影響するので別に実行する
+    data = make_data(kind, df)
+    data.repository = repos.create(repo_kind, name)
+    tracemalloc.start()
+    data.save()
+    _, save_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    LOADERS[kind](data.repository)
+    _, load_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    save, load = sorted(saves)[len(saves) // 2], sorted(loads)[len(loads) // 2]
+    return {
+        "data": kind,
+        "repository": repo_kind,
+        "rows": rows,
+        "column_type": column_type,
+        "bytes": size,
+        "save_sec": save,
+        "load_sec": load,
+        "save_mb_per_sec": size / save / 1e6,
+        "load_mb_per_sec": size / load / 1e6,
+        "save_peak_memory_bytes": save_peak,
+        "load_peak_memory_bytes": load_peak,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000], help="row counts")
+    parser.add_argument("--column-types", nargs="+", default=["int", "float", "str", "mixed"])
+    parser.add_argument("--pairs", nargs="+", help="data:repository pairs (e.g. dataframe:local)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="repeat count (median is reported)")
+    parser.add_argument("-o", "--output", help="save results as json")
+    args = parser.parse_args()
+
+    pairs = [tuple(p.split(":")) for p in args.pairs] if args.pairs else PAIRS
+
+    results = []
+    with tempfile.TemporaryDirectory() as d:
+        repos = Repositories(Path(d))
+        print(f"s3 backend: {repos.s3_backend}")
+        try:
+            for kind, repo_kind in pairs:
+                for column_type in args.column_types:
+                    for rows in args.rows:
+                        r = measure(repos, kind, repo_kind, rows, column_type, args.repeat)
+                        results.append(r)
+                        print(
+                            f"{kind:>9} {repo_kind:>6} {column_type:>5} rows={rows:>7}"
+                            f" size={r['bytes'] / 1e6:8.2f}MB"
+                            f" save={r['save_sec'] * 1000:9.2f}ms ({r['save_mb_per_sec']:7.1f}MB/s)"
+                            f" load={r['load_sec'] * 1000:9.2f}ms ({r['load_mb_per_sec']:7.1f}MB/s)"
+                            f" peak(save/load)={r['save_peak_memory_bytes'] / 1e6:.1f}/"
+                            f"{r['load_peak_memory_bytes'] / 1e6:.1f}MB"
+                        )
+        finally:
+            repos.close()
+
+    if args.output:
+        params = {"rows": args.rows, "column_types": args.column_types, "repeat": args.repeat}
+        meta = metadata()
+        meta["s3_backend"] = repos.s3_backend
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "params": params, "results": results}, f, indent=2)
@@ -0,0 +1,53 @@
+"""SocketExecutor のワーカー数によるスケーリング計測
+
+localhost 上にワーカーを起動し、ワーカー数 1/2/4 で同じDAGの実行時間を比較する。
+
+    $ python -m benchmarks.socket_executor_scaling -n 40 -b 0.05
+"""
+import argparse
+import time
+
+from aksdp.executor import SocketExecutor, start_worker
+from aksdp.graph import ProcessGraph
+
+from .dag import BusyTask, build_wide
+
+
+def measure(addresses, n: int, busy: float) -> dict:
+    executor = SocketExecutor(addresses)
+    graph = build_wide(ProcessGraph(executor), n, BusyTask, {"busy": busy})
+
+    start = time.perf_counter()
+    graph.run()
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+
+    return {"workers": len(addresses), "tasks": n, "elapsed": elapsed, "throughput": n / elapsed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--tasks", type=int, default=40, help="number of tasks")
+    parser.add_argument("-b", "--busy", type=float, default=0.05, help="cpu seconds in each task")
+    parser.add_argument("-w", "--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts")
+    args = parser.parse_args()
+
+    workers = [start_worker() for _ in range(max(args.workers))]
+    try:
+        addresses = [w[1] for w in workers]
+
+        # ワーカー側のモジュール import を済ませておく
+        measure(addresses, len(addresses), 0)
+
+        base = None
+        for w in args.workers:
+            r = measure(addresses[:w], args.tasks, args.busy)
+            base = base if base else r["elapsed"]
+            print(
+                f"workers={r['workers']}: tasks={r['tasks']} elapsed={r['elapsed']:.3f}s"
+                f" throughput={r['throughput']:.1f}tasks/s speedup={base / r['elapsed']:.2f}x"
+            )
+    finally:
+        for proc, _ in workers:
+            proc.terminate()
+            proc.wait()
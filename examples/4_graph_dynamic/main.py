@@ -5,7 +5,7 @@ from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from logging import DEBUG, basicConfig, getLogger
 
 from aksdp.dataset import DataSet
-from aksdp.graph import ConcurrentGraph, Graph
+from aksdp.graph import ConcurrentGraph, Graph, ProcessGraph
 from aksdp.task import Task
 from aksdp.util import PlantUML
 
@@ -60,8 +60,8 @@ if __name__ == "__main__":
         graph = ConcurrentGraph(ThreadPoolExecutor())
         logger.info("use ConcurrentGraph(ThreadPoolExecutor)")
     elif args.graph == "process":
-        graph = ConcurrentGraph(ProcessPoolExecutor())
-        logger.info("use ConcurrentGraph(ProcessPoolExecutor)")
+        graph = ProcessGraph(ProcessPoolExecutor())
+        logger.info("use ProcessGraph(ProcessPoolExecutor)")
     else:
         logger.error("unknown graph,")
         sys.exit(-1)
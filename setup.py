@@ -1,7 +1,18 @@
 # -*- coding: utf-8 -*-
 from setuptools import setup
 
-packages = ["aksdp", "aksdp.data", "aksdp.dataset", "aksdp.graph", "aksdp.repository", "aksdp.task", "aksdp.util"]
+packages = [
+    "aksdp",
+    "aksdp.cache",
+    "aksdp.data",
+    "aksdp.dataset",
+    "aksdp.executor",
+    "aksdp.graph",
+    "aksdp.repository",
+    "aksdp.service",
+    "aksdp.task",
+    "aksdp.util",
+]
 
 package_data = {"": ["*"]}
 
@@ -0,0 +1,89 @@
+from aksdp.data import JsonData
+from aksdp.dataset import DataSet
+from aksdp.task import Task
+from aksdp.graph import AsyncGraph, TaskStatus
+import asyncio
+import threading
+import time
+import unittest
+
+
+class AsyncSleepTask(Task):
+    def output_datakeys(self):
+        return [self.params["key"]]
+
+    async def main(self, ds):
+        await asyncio.sleep(self.params.get("sleep", 0))
+        return DataSet().put(self.params["key"], JsonData({"threads": threading.active_count()}))
+
+
+class SyncTask(Task):
+    def input_datakeys(self):
+        return ["async"]
+
+    def main(self, ds):
+        return DataSet().put("sync", JsonData({"thread": threading.get_ident()}))
+
+
+class AsyncErrorTask(Task):
+    async def main(self, ds):
+        raise ValueError("ValueError")
+
+
+class TestAsyncGraph(unittest.TestCase):
+    def test_many_io_tasks(self):
+        g = AsyncGraph()
+        for i in range(2000):
+            g.append(AsyncSleepTask({"key": f"key{i}", "sleep": 0.2}))
+
+        start = time.time()
+        ds = g.run()
+
+        self.assertLess(time.time() - start, 2.0)
+        self.assertTrue(all([gt.status == TaskStatus.COMPLETED for gt in g.graph]))
+        self.assertLess(list(ds.data.values())[0].content["threads"], 10)
+
+    def test_mixed_sync_and_async(self):
+        g = AsyncGraph()
+        g.append(AsyncSleepTask({"key": "async"}))
+        gt = g.append(SyncTask())
+        ds = g.run()
+
+        self.assertEqual(TaskStatus.COMPLETED, gt.status)
+        self.assertNotEqual(threading.get_ident(), ds.get("sync").content["thread"])
+
+    def test_hook(self):
+        called = []
+        g = AsyncGraph()
+        gt = g.append(AsyncSleepTask({"key": "async"}))
+        gt.pre_run_hook = lambda ds: called.append("pre")
+        gt.post_run_hook = lambda ds: called.append("post")
+        g.run()
+
+        self.assertEqual(["pre", "post"], called)
+
+    def test_max_concurrency(self):
+        g = AsyncGraph(max_concurrency=2)
+        for i in range(4):
+            g.append(AsyncSleepTask({"key": f"key{i}", "sleep": 0.1}))
+
+        start = time.time()
+        g.run()
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+    def test_error_handler(self):
+        errors = []
+        g = AsyncGraph()
+        gt = g.append(AsyncErrorTask())
+        g.add_error_handler(ValueError, lambda e, ds: errors.append(e))
+        g.run()
+
+        self.assertEqual(1, len(errors))
+        self.assertEqual(TaskStatus.ERROR, gt.status)
+
+    def test_no_handler(self):
+        g = AsyncGraph()
+        g.append(AsyncErrorTask())
+
+        with self.assertRaises(ValueError):
+            g.run()
@@ -0,0 +1,165 @@
+from aksdp.data import JsonData
+from aksdp.dataset import DataSet
+from aksdp.task import Task
+from aksdp.graph import Checkpoint, ConcurrentGraph, Graph, TaskStatus
+from pathlib import Path
+import tempfile
+import unittest
+
+calls = []
+fail = True
+
+
+class StepTask(Task):
+    def main(self, ds):
+        calls.append(self.params["name"])
+        if self.params.get("fail") and fail:
+            raise ValueError("ValueError")
+
+        count = ds.get("count").content["count"] if "count" in ds.keys() else 0
+        return DataSet().put("count", JsonData({"count": count + 1}))
+
+
+class ValueTask(Task):
+    def input_datakeys(self):
+        return ["v"]
+
+    def main(self, ds):
+        calls.append("value")
+        return DataSet().put("value", JsonData({"v": ds.get("v").content["v"] * self.params.get("factor", 1)}))
+
+
+class ReportTask(Task):
+    def main(self, ds):
+        calls.append("report")
+        if fail:
+            raise ValueError("ValueError")
+        return DataSet().put("report", JsonData(ds.get("value").content))
+
+
+def build(graph):
+    gt = None
+    for i in range(4):
+        gt = graph.append(StepTask({"name": f"step{i}", "fail": i == 2}), [gt] if gt else [])
+    return graph
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        global fail
+        fail = True
+        calls.clear()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.checkpoint = Checkpoint(Path(self.tmpdir.name))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def resume(self, graph_class):
+        global fail
+        g = build(graph_class())
+        g.checkpoint = self.checkpoint
+        with self.assertRaises(ValueError):
+            g.run()
+        self.assertEqual(["step0", "step1", "step2"], calls)
+
+        # 失敗したタスク以降のみ再実行される
+        fail = False
+        calls.clear()
+        g = build(graph_class())
+        g.checkpoint = self.checkpoint
+        ds = g.run()
+
+        self.assertEqual(["step2", "step3"], calls)
+        self.assertEqual(4, ds.get("count").content["count"])
+        self.assertTrue(all([gt.status == TaskStatus.COMPLETED for gt in g.graph]))
+
+    def test_resume_graph(self):
+        self.resume(Graph)
+
+    def test_resume_concurrent_graph(self):
+        self.resume(ConcurrentGraph)
+
+    def test_rerun_error_task_on_same_graph(self):
+        global fail
+        errors = []
+        g = build(Graph())
+        g.checkpoint = self.checkpoint
+        g.add_error_handler(ValueError, lambda e, ds: errors.append(e))
+        g.run()
+        self.assertEqual(TaskStatus.ERROR, g.graph[2].status)
+
+        fail = False
+        calls.clear()
+        g.run()
+
+        self.assertEqual(["step2", "step3"], calls)
+
+    def test_clear(self):
+        g = build(Graph())
+        g.checkpoint = self.checkpoint
+        with self.assertRaises(ValueError):
+            g.run()
+
+        self.checkpoint.clear()
+        self.assertEqual([], list(Path(self.tmpdir.name).glob("*.pkl")))
+
+    def test_clear_on_success(self):
+        g = build(Graph())
+        g.checkpoint = self.checkpoint
+        g.add_error_handler(ValueError, lambda e, ds: None)
+        g.run()
+        self.assertNotEqual([], list(Path(self.tmpdir.name).glob("*.pkl")))
+
+        global fail
+        fail = False
+        g.run()
+        self.assertEqual([], list(Path(self.tmpdir.name).glob("*.pkl")))
+
+    def run_value(self, v, factor=1):
+        g = Graph(DataSet().put("v", JsonData({"v": v})))
+        g.checkpoint = self.checkpoint
+        value = g.append(ValueTask({"factor": factor}))
+        g.append(ReportTask(), [value])
+        return g.run()
+
+    def test_rerun_with_changed_inputs(self):
+        global fail
+        fail = False
+        self.assertEqual({"v": 1}, self.run_value(1).get("report").content)
+        self.assertEqual({"v": 2}, self.run_value(2).get("report").content)
+        self.assertEqual(["value", "report", "value", "report"], calls)
+
+    def test_rerun_failed_with_changed_inputs(self):
+        global fail
+        with self.assertRaises(ValueError):
+            self.run_value(1)
+
+        # 入力・パラメータが変わったタスクとその後続は復元しない
+        fail = False
+        calls.clear()
+        self.assertEqual({"v": 2}, self.run_value(2).get("report").content)
+        self.assertEqual(["value", "report"], calls)
+
+        fail = True
+        calls.clear()
+        with self.assertRaises(ValueError):
+            self.run_value(2, factor=3)
+        fail = False
+        calls.clear()
+        self.assertEqual({"v": 6}, self.run_value(2, factor=3).get("report").content)
+        self.assertEqual(["report"], calls)
+
+    def test_return_restored_output(self):
+        g = build(Graph())
+        g.checkpoint = self.checkpoint
+        g.run(targets=[g.graph[1]])
+
+        # 全タスクを復元した場合は最後のタスクの出力を返す
+        calls.clear()
+        g = build(Graph())
+        g.checkpoint = self.checkpoint
+        ds = g.run(targets=[g.graph[1]])
+
+        self.assertEqual([], calls)
+        self.assertEqual(2, ds.get("count").content["count"])
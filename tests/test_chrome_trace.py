@@ -0,0 +1,56 @@
+from aksdp.dataset import DataSet
+from aksdp.task import Task
+from aksdp.graph import ConcurrentGraph, ProcessGraph
+from aksdp.util import ChromeTrace
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import tempfile
+import time
+import unittest
+
+
+class SleepTask(Task):
+    def main(self, ds):
+        time.sleep(self.params.get("sleep", 0))
+        return DataSet()
+
+
+class TestChromeTrace(unittest.TestCase):
+    def test_trace(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(2))
+        a = g.append(SleepTask({"sleep": 0.05}))
+        b = g.append(SleepTask({"sleep": 0.05}))
+        c = g.append(SleepTask(), [a, b])
+        g.run()
+
+        for gt in [a, b, c]:
+            self.assertEqual(set(["scheduled", "inputs", "pre_hook", "main", "post_hook", "finished"]), set(gt.trace))
+            self.assertLessEqual(gt.trace["scheduled"], gt.trace["main"]["start"])
+            self.assertLessEqual(gt.trace["main"]["end"], gt.trace["finished"])
+        self.assertNotEqual(a.trace["main"]["tid"], b.trace["main"]["tid"])
+        self.assertGreaterEqual(c.trace["main"]["start"], a.trace["main"]["end"])
+
+        events = ChromeTrace.graph_to_events(g)
+        mains = [e for e in events if e.get("cat") == "main"]
+        self.assertEqual(3, len(mains))
+        self.assertTrue(all([e["ts"] >= 0 and "queued_ms" in e["args"] for e in mains]))
+        self.assertAlmostEqual(50000, mains[0]["dur"], delta=20000)
+
+        names = [e["args"]["name"] for e in events if e["ph"] == "M"]
+        self.assertIn("scheduler", names)
+        self.assertIn("worker-1", names)
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "trace.json")
+            ChromeTrace.save(g, path)
+            with open(path) as f:
+                self.assertEqual(len(events), len(json.load(f)["traceEvents"]))
+
+    def test_process_graph(self):
+        g = ProcessGraph()
+        gt = g.append(SleepTask())
+        g.run()
+
+        self.assertNotEqual(os.getpid(), gt.trace["main"]["pid"])
+        self.assertEqual(os.getpid(), gt.trace["post_hook"]["pid"])
@@ -0,0 +1,253 @@
+from aksdp.data import JsonData
+from aksdp.dataset import DataSet
+from aksdp.task import Task, CancellationToken, TaskTimeoutError
+from aksdp.graph import ConcurrentGraph, TaskStatus
+from concurrent.futures import ThreadPoolExecutor
+import pickle
+import threading
+import time
+import unittest
+
+
+class ErrorTask(Task):
+    def main(self, ds):
+        raise ValueError("ValueError")
+
+
+class SleepTask(Task):
+    def main(self, ds):
+        time.sleep(self.params.get("sleep", 0))
+        return DataSet().put(self.params["key"], JsonData({"at": time.time()}))
+
+
+class ChainTask(Task):
+    def main(self, ds):
+        out = DataSet()
+        out.put("count", JsonData({"count": ds.get("count").content["count"] + 1}))
+        return out
+
+
+class TestConcurrentGraph(unittest.TestCase):
+    def test_chain(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(2))
+        gt = None
+        for _ in range(20):
+            gt = g.append(ChainTask(), [gt] if gt else [])
+
+        ds = g.run(DataSet().put("count", JsonData({"count": 0})))
+
+        self.assertEqual(20, ds.get("count").content["count"])
+        self.assertTrue(all([t.status == TaskStatus.COMPLETED for t in g.graph]))
+
+    def test_chain_no_polling_delay(self):
+        # 1タスクあたり 0.1s のポーリング待ちが無いこと
+        g = ConcurrentGraph(ThreadPoolExecutor(2))
+        gt = None
+        for _ in range(20):
+            gt = g.append(ChainTask(), [gt] if gt else [])
+
+        start = time.time()
+        g.run(DataSet().put("count", JsonData({"count": 0})))
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_downstream_starts_on_dependency_completion(self):
+        # 長いタスクの完了を待たずに、短いタスクの後続が起動すること
+        g = ConcurrentGraph(ThreadPoolExecutor(4))
+        g.append(SleepTask({"key": "slow", "sleep": 0.5}))
+        fast = g.append(SleepTask({"key": "fast", "sleep": 0}))
+        after_fast = g.append(SleepTask({"key": "after_fast", "sleep": 0}), [fast])
+
+        start = time.time()
+        g.run()
+
+        self.assertLess(after_fast.output_ds.get("after_fast").content["at"] - start, 0.4)
+
+    def test_error_handler(self):
+        called = threading.Event()
+
+        def value_error_handler(e, ds):
+            called.set()
+
+        g = ConcurrentGraph()
+        g.append(ErrorTask())
+        g.add_error_handler(ValueError, value_error_handler)
+        g.run()
+
+        self.assertTrue(called.is_set())
+
+    def test_no_handler(self):
+        g = ConcurrentGraph()
+        g.append(ErrorTask())
+
+        with self.assertRaises(ValueError):
+            g.run()
+
+
+class ResourceTask(Task):
+    running = 0
+    peak = 0
+    started = []
+    lock = threading.Lock()
+
+    def main(self, ds):
+        with ResourceTask.lock:
+            ResourceTask.started.append(self.params.get("name"))
+            ResourceTask.running += 1
+            ResourceTask.peak = max(ResourceTask.peak, ResourceTask.running)
+        time.sleep(0.05)
+        with ResourceTask.lock:
+            ResourceTask.running -= 1
+        return DataSet()
+
+
+class TestResourceAwareScheduling(unittest.TestCase):
+    def setUp(self):
+        ResourceTask.running = 0
+        ResourceTask.peak = 0
+        ResourceTask.started = []
+
+    def test_memory_budget(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(6), resources={"memory": "16GB"})
+        for _ in range(6):
+            g.append(ResourceTask({"resources": {"memory": "8GB"}}))
+        g.run()
+
+        self.assertEqual(2, ResourceTask.peak)
+        self.assertTrue(all([gt.status == TaskStatus.COMPLETED for gt in g.graph]))
+        self.assertEqual(0, g.resource_pool.used["memory"])
+
+    def test_small_tasks_fill_remaining_capacity(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(6), resources={"memory": 10})
+        g.append(ResourceTask({"resources": {"memory": 8}}))
+        g.append(ResourceTask({"resources": {"memory": 8}}))
+        g.append(ResourceTask({"resources": {"memory": 1}}))
+        g.append(ResourceTask({"resources": {"memory": 1}}))
+
+        start = time.time()
+        g.run()
+
+        self.assertEqual(3, ResourceTask.peak)
+        self.assertLess(time.time() - start, 0.15)
+
+    def test_large_task_not_starved(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(8), resources={"memory": 10})
+        for _ in range(2):
+            g.append(ResourceTask({"name": "small", "resources": {"memory": 2}}))
+        g.append(ResourceTask({"name": "large", "resources": {"memory": 8}}))
+        for _ in range(20):
+            g.append(ResourceTask({"name": "small", "resources": {"memory": 2}}))
+        g.run()
+
+        # 最初の1回だけ後ろの小さいタスクで埋め、以降は大きいタスクのために空ける
+        self.assertEqual(5, ResourceTask.started.index("large"))
+        self.assertTrue(all([gt.status == TaskStatus.COMPLETED for gt in g.graph]))
+
+    def test_oversized_task(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(2), resources={"cpu": 2})
+        gt = g.append(ResourceTask({"resources": {"cpu": 4}}))
+        g.run()
+
+        self.assertEqual(TaskStatus.COMPLETED, gt.status)
+
+
+class CooperativeTask(Task):
+    def main(self, ds):
+        # 取り消されるまで待つ
+        deadline = time.time() + self.params.get("sleep", 5)
+        while time.time() < deadline:
+            self.raise_if_cancelled()
+            time.sleep(0.01)
+        return DataSet().put(self.params["key"], JsonData({"at": time.time()}))
+
+
+class TestCancellation(unittest.TestCase):
+    def test_abort_cancels_pending_and_running(self):
+        def value_error_handler(e, ds):
+            pass
+
+        g = ConcurrentGraph(ThreadPoolExecutor(2))
+        running = g.append(CooperativeTask({"key": "running"}))
+        g.append(ErrorTask())
+        pending = [g.append(SleepTask({"key": f"pending{i}", "sleep": 1})) for i in range(4)]
+        g.add_error_handler(ValueError, value_error_handler)
+
+        start = time.time()
+        g.run()
+
+        self.assertTrue(running.task.cancelled)
+        # ErrorTask の空いたワーカーで1つ起動し得るが、残りは実行前に取り消される
+        self.assertGreaterEqual(len([gt for gt in pending if gt.status == TaskStatus.CANCELLED]), 3)
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_cancel_from_other_thread(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(2))
+        gt = g.append(CooperativeTask({"key": "a"}))
+        threading.Timer(0.1, g.cancel).start()
+
+        start = time.time()
+        g.run()
+
+        self.assertEqual(TaskStatus.CANCELLED, gt.status)
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_task_timeout(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(2), task_timeout=0.1)
+        slow = g.append(CooperativeTask({"key": "slow"}))
+        fast = g.append(SleepTask({"key": "fast", "sleep": 0}))
+
+        start = time.time()
+        with self.assertRaises(TaskTimeoutError):
+            g.run()
+
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(TaskStatus.ERROR, slow.status)
+        self.assertEqual(TaskStatus.COMPLETED, fast.status)
+        self.assertTrue(slow.task.cancelled)
+
+    def test_task_timeout_param(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(2))
+        g.append(CooperativeTask({"key": "slow", "timeout": 0.1}))
+        ok = g.append(CooperativeTask({"key": "ok", "sleep": 0.2, "timeout": 1}))
+
+        with self.assertRaises(TaskTimeoutError):
+            g.run()
+        self.assertNotEqual(TaskStatus.ERROR, ok.status)
+
+    def test_queued_task_timeout(self):
+        # 制限時間はワーカーが空いて実行が始まってから数える
+        g = ConcurrentGraph(ThreadPoolExecutor(1))
+        first = g.append(SleepTask({"key": "first", "sleep": 0.3}))
+        queued = g.append(CooperativeTask({"key": "queued", "timeout": 0.2}))
+
+        start = time.time()
+        with self.assertRaises(TaskTimeoutError):
+            g.run()
+
+        self.assertGreaterEqual(time.time() - start, 0.45)
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(TaskStatus.COMPLETED, first.status)
+        self.assertEqual(TaskStatus.ERROR, queued.status)
+
+    def test_no_polling_while_queued(self):
+        class CountingGraph(ConcurrentGraph):
+            waits = 0
+
+            def _wait_timeout(self, features):
+                CountingGraph.waits += 1
+                return super()._wait_timeout(features)
+
+        g = CountingGraph(ThreadPoolExecutor(1), task_timeout=5)
+        for i in range(3):
+            g.append(SleepTask({"key": f"k{i}", "sleep": 0.3}))
+        g.run()
+
+        # 実行開始・終了の度に起きるだけで、実行待ちの間に短い間隔で起き続けない
+        self.assertLessEqual(CountingGraph.waits, 6)
+
+    def test_token_pickle(self):
+        token = CancellationToken()
+        token.cancel()
+        restored = pickle.loads(pickle.dumps(CancellationToken(token)))
+
+        self.assertTrue(token.cancelled)
+        self.assertFalse(restored.cancelled)
@@ -0,0 +1,80 @@
+from aksdp.data import RawData
+from aksdp.dataset import DataSet
+from aksdp.task import Task
+from aksdp.graph import ConcurrentGraph, Graph, TaskStatus
+import unittest
+
+MB = 1024 * 1024
+
+
+class StepTask(Task):
+    def input_datakeys(self):
+        i = self.params["i"]
+        return [f"data{i - 1}"] if i else []
+
+    def output_datakeys(self):
+        return [f"data{self.params['i']}"]
+
+    def main(self, ds):
+        for k in self.input_datakeys():
+            if ds.get(k).content is None:
+                raise ValueError("input released")
+        return DataSet().put(f"data{self.params['i']}", RawData(bytes(MB)))
+
+
+class BranchTask(Task):
+    def main(self, ds):
+        return DataSet().put("branch", RawData(bytes(MB)))
+
+
+def build(graph, n=5):
+    for i in range(n):
+        graph.append(StepTask({"i": i}))
+    return graph
+
+
+class TestDataLifetime(unittest.TestCase):
+    def test_release(self):
+        g = build(Graph())
+        g.release_intermediates = True
+        ds = g.run()
+
+        self.assertEqual(MB, len(ds.get("data4").content))
+        self.assertTrue(all([gt.status == TaskStatus.COMPLETED for gt in g.graph]))
+        self.assertTrue(all([gt.output_ds is None for gt in g.graph[:-1]]))
+        self.assertTrue(all([gt.input_ds is None for gt in g.graph]))
+        self.assertIsNotNone(g.graph[-1].output_ds)
+
+        report = g.memory_report()
+        self.assertEqual(2 * MB, report["peak_bytes"])
+        self.assertEqual(MB, report["retained_bytes"])
+        self.assertEqual(4 * MB, report["released_bytes"])
+
+    def test_track_only(self):
+        g = build(Graph())
+        g.track_memory = True
+        g.run()
+
+        report = g.memory_report()
+        self.assertEqual(5 * MB, report["peak_bytes"])
+        self.assertEqual(5 * MB, report["retained_bytes"])
+        self.assertTrue(all([gt.output_ds is not None for gt in g.graph]))
+
+    def test_static_dependencies(self):
+        g = ConcurrentGraph()
+        g.release_intermediates = True
+        root = g.append(BranchTask())
+        a = g.append(BranchTask(), [root])
+        b = g.append(BranchTask(), [root])
+        g.run()
+
+        self.assertIsNone(root.output_ds)
+        self.assertIsNotNone(a.output_ds)
+        self.assertIsNotNone(b.output_ds)
+
+    def test_disabled(self):
+        g = build(Graph())
+        g.run()
+
+        self.assertIsNone(g.memory_report())
+        self.assertTrue(all([gt.output_ds is not None for gt in g.graph]))
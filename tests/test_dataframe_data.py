@@ -0,0 +1,86 @@
+from aksdp.data import DataFrameData
+from aksdp.repository import LocalFileRepository
+from io import StringIO
+from pathlib import Path
+import json
+import os
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+TITANIC = Path(os.path.dirname(__file__)) / Path("titanic.csv")
+
+
+class TestCreateFromCsv(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "titanic.csv"
+        shutil.copyfile(TITANIC, self.path)
+        self.expected = pd.read_csv(StringIO(TITANIC.read_bytes().decode("utf-8")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_bytes_and_path(self):
+        pd.testing.assert_frame_equal(self.expected, DataFrameData.create_from_csv(TITANIC.read_bytes()).content)
+        pd.testing.assert_frame_equal(self.expected, DataFrameData.create_from_csv(TITANIC).content)
+        pd.testing.assert_frame_equal(self.expected, DataFrameData.load(LocalFileRepository(TITANIC)).content)
+
+    def test_engine_auto(self):
+        df = DataFrameData.load(LocalFileRepository(TITANIC), engine="auto").content
+        self.assertEqual(list(self.expected.columns), list(df.columns))
+        self.assertEqual(len(self.expected), len(df))
+
+    def test_dtype_and_usecols(self):
+        df = DataFrameData.load(
+            LocalFileRepository(TITANIC), usecols=["PassengerId", "Pclass"], dtype={"Pclass": "int8"}
+        ).content
+        self.assertEqual(["PassengerId", "Pclass"], list(df.columns))
+        self.assertEqual("int8", str(df["Pclass"].dtype))
+
+    def test_schema_cache(self):
+        repo = LocalFileRepository(self.path)
+        sidecar = Path(str(self.path) + ".schema.json")
+
+        DataFrameData.load(repo, schema_cache=True)
+        self.assertTrue(sidecar.exists())
+        schema = json.loads(sidecar.read_text())["dtype"]
+        self.assertEqual("int64", schema["PassengerId"])
+
+        # 2回目以降はサイドカーの型で読む
+        schema["Pclass"] = "int8"
+        sidecar.write_text(json.dumps({"dtype": schema}))
+        df = DataFrameData.load(repo, schema_cache=True).content
+        self.assertEqual("int8", str(df["Pclass"].dtype))
+
+    def test_schema_cache_parse_dates(self):
+        path = Path(self.tmp.name) / "dates.csv"
+        path.write_text("t,d,x\n2020-01-01 10:00:00,1 days,1\n2020-01-02 11:00:00,2 days,2\n")
+        repo = LocalFileRepository(path)
+
+        df = DataFrameData.load(repo, schema_cache=True, parse_dates=["t"]).content
+        sidecar = Path(str(path) + ".schema.json")
+        mtime = sidecar.stat().st_mtime_ns
+
+        # 2回目以降はサイドカーの型で1回だけパースし、推論し直さない
+        for _ in range(2):
+            with unittest.mock.patch("aksdp.data.dataframe_data.pd.read_csv", wraps=pd.read_csv) as read_csv:
+                cached = DataFrameData.load(repo, schema_cache=True).content
+            self.assertEqual(1, read_csv.call_count)
+            pd.testing.assert_frame_equal(df, cached)
+            self.assertEqual(mtime, sidecar.stat().st_mtime_ns)
+
+    def test_stale_schema_cache(self):
+        sidecar = Path(self.tmp.name) / "schema.json"
+        sidecar.write_text(json.dumps({"dtype": {"Name": "int64"}}))
+
+        df = DataFrameData.load(LocalFileRepository(self.path), schema_cache=sidecar).content
+
+        pd.testing.assert_frame_equal(self.expected, df)
+        self.assertEqual(str(self.expected["Name"].dtype), json.loads(sidecar.read_text())["dtype"]["Name"])
+
+
+if __name__ == "__main__":
+    unittest.main()
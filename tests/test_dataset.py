@@ -0,0 +1,161 @@
+from aksdp.data import JsonData
+from aksdp.dataset import DataSet
+from aksdp.graph import Graph
+from aksdp.repository import Repository
+from aksdp.task import Task
+import pickle
+import threading
+import time
+import unittest
+
+
+class PassTask(Task):
+    def main(self, ds):
+        return ds.put(self.params["key"], JsonData(self.params["key"]))
+
+
+class TestDataSetChain(unittest.TestCase):
+    def test_priority(self):
+        a = DataSet().put("x", JsonData("a")).put("y", JsonData("a"))
+        b = DataSet().put("y", JsonData("b"))
+
+        ds = DataSet.chain(a, None, b)
+
+        self.assertEqual("a", ds.get("x").content)
+        self.assertEqual("b", ds.get("y").content)
+        self.assertEqual({"x", "y"}, set(ds.keys()))
+        self.assertIn("x", ds)
+
+    def test_no_copy_and_no_mutation(self):
+        x = JsonData("a")
+        a = DataSet().put("x", x)
+
+        ds = DataSet.chain(a)
+        ds.put("z", JsonData("z"))
+        ds.merge(DataSet().put("x", JsonData("overwritten")))
+
+        self.assertIs(x, a.get("x"))
+        self.assertEqual(["x"], list(a.keys()))
+        self.assertEqual("overwritten", ds.get("x").content)
+
+    def test_layers_flattened(self):
+        catalog = DataSet().put("c", JsonData("c"))
+        ds = DataSet.chain(catalog)
+        for i in range(100):
+            ds = DataSet.chain(catalog, ds).put(f"k{i}", JsonData(i))
+
+        self.assertLessEqual(len(ds.data.maps), DataSet.MAX_LAYERS + 1)
+        self.assertEqual(99, ds.get("k99").content)
+        self.assertEqual("c", ds.get("c").content)
+
+    def test_pickle(self):
+        ds = DataSet.chain(DataSet().put("x", JsonData("a")), DataSet().put("y", JsonData("b")))
+        restored = pickle.loads(pickle.dumps(ds))
+
+        self.assertEqual({"x", "y"}, set(restored.keys()))
+
+    def test_graph_passthrough(self):
+        catalog = DataSet().put("c", JsonData("c"))
+        g = Graph(catalog)
+        gt = None
+        for i in range(50):
+            gt = g.append(PassTask({"key": f"k{i}"}), [gt] if gt else [])
+        ds = g.run()
+
+        self.assertEqual(51, len(ds.keys()))
+        self.assertEqual(["c"], list(catalog.keys()))
+
+
+class SlowRepository(Repository):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+
+    def save(self, data):
+        with SlowRepository.lock:
+            SlowRepository.running += 1
+            SlowRepository.peak = max(SlowRepository.peak, SlowRepository.running)
+        time.sleep(0.05)
+        with SlowRepository.lock:
+            SlowRepository.running -= 1
+        if self.fail:
+            raise IOError("save failed")
+
+
+class BatchRepository(Repository):
+    batch_save = True
+
+    def __init__(self):
+        self.commits = []
+
+    def save(self, data):
+        self.commits.append([data])
+
+    def save_many(self, datas):
+        self.commits.append(list(datas))
+
+
+class TestSaveAll(unittest.TestCase):
+    def setUp(self):
+        SlowRepository.running = 0
+        SlowRepository.peak = 0
+
+    def test_serial(self):
+        ds = DataSet()
+        for i in range(4):
+            ds.put(f"k{i}", JsonData(i, SlowRepository()))
+        results = ds.save_all()
+
+        self.assertEqual(1, SlowRepository.peak)
+        self.assertEqual(["k0", "k1", "k2", "k3"], list(results.keys()))
+        self.assertTrue(all([r.error is None and r.elapsed > 0 for r in results.values()]))
+
+    def test_parallel(self):
+        ds = DataSet()
+        for i in range(8):
+            ds.put(f"k{i}", JsonData(i, SlowRepository()))
+
+        start = time.time()
+        ds.save_all(max_workers=8)
+
+        self.assertLess(time.time() - start, 0.3)
+        self.assertGreater(SlowRepository.peak, 1)
+
+    def test_repository_limits(self):
+        ds = DataSet()
+        for i in range(6):
+            ds.put(f"k{i}", JsonData(i, SlowRepository()))
+        ds.save_all(max_workers=6, repository_limits={SlowRepository: 2})
+
+        self.assertEqual(2, SlowRepository.peak)
+
+    def test_errors_do_not_stop(self):
+        ds = DataSet()
+        ds.put("ng", JsonData(0, SlowRepository(fail=True)))
+        ds.put("ok", JsonData(1, SlowRepository()))
+
+        with self.assertRaises(IOError):
+            ds.save_all(max_workers=2)
+
+        results = ds.save_all(max_workers=2, raise_on_error=False)
+        self.assertIsInstance(results["ng"].error, IOError)
+        self.assertIsNone(results["ok"].error)
+
+    def test_batch_repository(self):
+        repo = BatchRepository()
+        ds = DataSet()
+        for i in range(3):
+            ds.put(f"k{i}", JsonData(i, repo))
+        ds.put("other", JsonData(0, SlowRepository()))
+        results = ds.save_all(max_workers=4)
+
+        self.assertEqual(1, len(repo.commits))
+        self.assertEqual(3, len(repo.commits[0]))
+        self.assertEqual(4, len(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
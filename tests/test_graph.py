@@ -171,3 +171,156 @@ class TestGraph(unittest.TestCase):
 
         self.assertEqual(TaskStatus.COMPLETED, gtb.status)
         self.assertEqual(TaskStatus.INIT, gtc.status)
+
+    def test_duplicate_provider_not_runnable(self):
+        class DupTask(Task):
+            def output_datakeys(self):
+                return ["DataA"]
+
+            def main(self, ds):
+                return DataSet().put("DataA", JsonData({}))
+
+        class UseA(Task):
+            def input_datakeys(self):
+                return ["DataA"]
+
+            def main(self, ds):
+                return DataSet()
+
+        g = Graph()
+        g.append(TaskA())
+        g.append(DupTask())
+        gt = g.append(UseA())
+        g.run()
+
+        # DataA の提供元が複数あるタスクは実行されない
+        self.assertEqual(TaskStatus.INIT, gt.status)
+
+    def test_runnable_tasks_order(self):
+        g = Graph()
+        gta = g.append(TaskA())
+        gtb = g.append(TaskB())
+        gtc = g.append(TaskC())
+
+        self.assertEqual([gta, gtb], g.runnable_tasks())
+        g.run()
+
+        self.assertEqual(TaskStatus.COMPLETED, gtc.status)
+        self.assertEqual(set([gta, gtb]), set(gtc.dependencies))
+        self.assertEqual([], g.runnable_tasks())
+
+    def test_disable_dynamic_dep_with_autoresolve(self):
+        g = Graph(disable_dynamic_dep=True)
+        g.append(TaskC())
+        g.append(TaskA())
+        g.append(TaskB())
+        g.autoresolve_dependencies()
+
+        order = []
+        for gt in g.graph:
+            gt.pre_run_hook = lambda ds, gt=gt: order.append(gt.task.__class__.__name__)
+        g.run()
+
+        self.assertEqual(["TaskA", "TaskB", "TaskC"], order)
+
+    def test_large_chain(self):
+        class KeyTask(Task):
+            def __init__(self, i):
+                super().__init__({"i": i})
+
+            def input_datakeys(self):
+                return [f"key{self.params['i'] - 1}"] if self.params["i"] else []
+
+            def output_datakeys(self):
+                return [f"key{self.params['i']}"]
+
+            def main(self, ds):
+                return DataSet().put(f"key{self.params['i']}", JsonData({}))
+
+        g = Graph()
+        for i in reversed(range(2000)):
+            g.append(KeyTask(i))
+        g.run()
+
+        self.assertTrue(all([gt.status == TaskStatus.COMPLETED for gt in g.graph]))
+
+
+class TestTargets(unittest.TestCase):
+    def build(self, graph):
+        class TaskE(Task):
+            def input_datakeys(self):
+                return ["DataB"]
+
+            def output_datakeys(self):
+                return ["DataE"]
+
+            def main(self, ds):
+                return DataSet().put("DataE", JsonData({}))
+
+        gta = graph.append(TaskA())
+        gtb = graph.append(TaskB())
+        gtc = graph.append(TaskC())
+        gte = graph.append(TaskE())
+        gtx = graph.append(DumbTask(), [gta])
+        return gta, gtb, gtc, gte, gtx
+
+    def test_datakey_target(self):
+        g = Graph()
+        gta, gtb, gtc, gte, gtx = self.build(g)
+        ds = g.run(targets=["DataE"])
+
+        self.assertIn("DataE", ds.keys())
+        self.assertEqual(
+            [TaskStatus.INIT, TaskStatus.COMPLETED, TaskStatus.INIT, TaskStatus.COMPLETED, TaskStatus.INIT],
+            [gt.status for gt in [gta, gtb, gtc, gte, gtx]],
+        )
+
+    def test_task_target(self):
+        g = Graph()
+        gta, gtb, gtc, gte, gtx = self.build(g)
+
+        with self.assertLogs("aksdp.graph.graph", level="INFO") as logs:
+            g.run(targets=[gtx])
+
+        self.assertEqual(TaskStatus.COMPLETED, gta.status)
+        self.assertEqual(TaskStatus.COMPLETED, gtx.status)
+        self.assertTrue(all([gt.status == TaskStatus.INIT for gt in [gtb, gtc, gte]]))
+        self.assertTrue(any(["pruned 3 tasks" in m for m in logs.output]))
+
+        # targets 無しで再実行すると残りのタスクも実行する
+        g.run()
+        self.assertTrue(all([gt.status == TaskStatus.COMPLETED for gt in g.graph]))
+
+    def test_concurrent_graph(self):
+        from aksdp.graph import ConcurrentGraph
+
+        g = ConcurrentGraph()
+        gta, gtb, gtc, gte, gtx = self.build(g)
+        g.run(targets=["DataC"])
+
+        self.assertEqual([TaskStatus.COMPLETED] * 3, [gt.status for gt in [gta, gtb, gtc]])
+        self.assertEqual([TaskStatus.INIT] * 2, [gt.status for gt in [gte, gtx]])
+
+    def test_unknown_target(self):
+        g = Graph()
+        self.build(g)
+
+        with self.assertRaises(ValueError):
+            g.run(targets=["DataZ"])
+
+
+class TestReset(unittest.TestCase):
+    def test_rerun_after_reset(self):
+        class CountTask(Task):
+            def main(self, ds):
+                return DataSet().put("count", JsonData({"count": ds.get("count").content["count"] + 1}))
+
+        g = Graph()
+        gt = g.append(CountTask())
+        g.append(CountTask(), [gt])
+
+        self.assertEqual(2, g.run(DataSet().put("count", JsonData({"count": 0}))).get("count").content["count"])
+
+        g.reset()
+        self.assertTrue(all([t.status == TaskStatus.INIT and t.output_ds is None for t in g.graph]))
+        self.assertEqual(12, g.run(DataSet().put("count", JsonData({"count": 10}))).get("count").content["count"])
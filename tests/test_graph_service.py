@@ -0,0 +1,89 @@
+from aksdp.data import JsonData
+from aksdp.dataset import DataSet
+from aksdp.task import Task
+from aksdp.graph import ConcurrentGraph
+from aksdp.service import GraphService
+from concurrent.futures import ThreadPoolExecutor
+import json
+import pickle
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+
+class ScoreTask(Task):
+    def main(self, ds):
+        time.sleep(0.01)
+        return DataSet().put("score", JsonData({"score": ds.get("x").content["x"] * 2}))
+
+
+class OffsetTask(Task):
+    def main(self, ds):
+        return DataSet().put("score", JsonData({"score": ds.get("score").content["score"] + 1}))
+
+
+built = []
+
+
+def build():
+    g = ConcurrentGraph()
+    gt = g.append(ScoreTask())
+    g.append(OffsetTask(), [gt])
+    built.append(g)
+    return g
+
+
+class TestGraphService(unittest.TestCase):
+    def setUp(self):
+        built.clear()
+
+    def test_invoke_concurrently(self):
+        service = GraphService(build, size=4)
+
+        def call(i):
+            return service.invoke(DataSet().put("x", JsonData({"x": i}))).get("score").content["score"]
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(call, range(40)))
+
+        self.assertEqual([i * 2 + 1 for i in range(40)], results)
+        self.assertEqual(4, len(built))
+
+        stats = service.stats()
+        self.assertEqual(40, stats["count"])
+        self.assertEqual(0, stats["errors"])
+        self.assertLessEqual(stats["p50"], stats["p99"])
+
+    def test_http(self):
+        service = GraphService(build, size=2)
+        server = service.create_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+
+        try:
+            req = urllib.request.Request(
+                f"http://{host}:{port}/run",
+                data=json.dumps({"x": {"x": 20}}).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+            )
+            with urllib.request.urlopen(req) as res:
+                self.assertEqual({"score": {"score": 41}}, json.loads(res.read()))
+
+            with urllib.request.urlopen(f"http://{host}:{port}/stats") as res:
+                self.assertEqual(1, json.loads(res.read())["count"])
+
+            # pickle した DataSet は受け付けない
+            req = urllib.request.Request(
+                f"http://{host}:{port}/run",
+                data=pickle.dumps(DataSet().put("x", JsonData({"x": 1}))),
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                urllib.request.urlopen(req)
+            self.assertEqual(415, cm.exception.code)
+            cm.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,126 @@
+from aksdp.cache import TaskCache
+from aksdp.data import DataFrameData, DataType, JsonData, LazyData
+from aksdp.dataset import DataSet
+from aksdp.graph import ConcurrentGraph, Graph
+from aksdp.repository import LocalFileRepository
+from aksdp.task import Task
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import functools
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+
+
+class CountingLoader:
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, repository):
+        with self.lock:
+            self.count += 1
+        time.sleep(0.05)
+        return DataFrameData.load(repository)
+
+
+class UseTask(Task):
+    def input_datakeys(self):
+        return ["used"]
+
+    def output_datakeys(self):
+        return ["rows"]
+
+    def main(self, ds):
+        return DataSet().put("rows", JsonData(len(self._in["used"])))
+
+
+class TestLazyData(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "titanic.csv"
+        self.path.write_bytes((Path(__file__).parent / "titanic.csv").read_bytes())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_on_first_access(self):
+        loader = CountingLoader()
+        data = LazyData(LocalFileRepository(self.path), loader, DataType.DATAFRAME)
+
+        self.assertFalse(data.loaded)
+        self.assertEqual(0, data.memory_usage())
+        self.assertEqual(DataType.DATAFRAME, data.data_type)
+
+        self.assertEqual(891, len(data.content))
+        self.assertTrue(data.loaded)
+        data.content
+        self.assertEqual(1, loader.count)
+
+    def test_load_once_from_threads(self):
+        loader = CountingLoader()
+        data = LazyData(LocalFileRepository(self.path), loader, DataType.DATAFRAME)
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: data.content, range(8)))
+
+        self.assertEqual(1, loader.count)
+        self.assertTrue(all([r is results[0] for r in results]))
+
+    def test_unused_catalog_entry(self):
+        used, unused = CountingLoader(), CountingLoader()
+        catalog = DataSet()
+        catalog.put("used", LazyData(LocalFileRepository(self.path), used, DataType.DATAFRAME))
+        catalog.put("unused", LazyData(LocalFileRepository(self.path), unused, DataType.DATAFRAME))
+
+        for g in [Graph(catalog), ConcurrentGraph(ThreadPoolExecutor(2), catalog_ds=catalog)]:
+            g.append(UseTask())
+            ds = g.run()
+            self.assertEqual(891, ds.get("rows").content)
+
+        self.assertEqual(1, used.count)
+        self.assertEqual(0, unused.count)
+
+    def test_pickle(self):
+        data = LazyData(LocalFileRepository(self.path), DataFrameData.load, DataType.DATAFRAME)
+        restored = pickle.loads(pickle.dumps(data))
+
+        self.assertFalse(restored.loaded)
+        self.assertEqual(891, len(restored.content))
+
+    def test_fingerprint_does_not_load(self):
+        cache = TaskCache(Path(self.tmp.name) / "cache")
+        data = LazyData(LocalFileRepository(self.path), DataFrameData.load, DataType.DATAFRAME)
+        ds = DataSet().put("used", data)
+
+        fp = cache.fingerprint(UseTask(), ds)
+        self.assertIsNotNone(fp)
+        self.assertFalse(data.loaded)
+
+        # 読み込み後も同じキーになり、ファイルが変わるとキーも変わる
+        data.content
+        self.assertEqual(fp, cache.fingerprint(UseTask(), ds))
+        st = self.path.stat()
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000))
+        self.assertNotEqual(fp, cache.fingerprint(UseTask(), ds))
+
+    def test_content_hash_of_loader(self):
+        repo = LocalFileRepository(self.path)
+        hashes = [
+            LazyData(repo, DataFrameData.load).content_hash(),
+            LazyData(repo, functools.partial(DataFrameData.load, usecols=["Name"])).content_hash(),
+            LazyData(repo, functools.partial(DataFrameData.load, usecols=["Age"])).content_hash(),
+        ]
+        self.assertEqual(3, len(set(hashes)))
+
+        # 識別できないローダーは読み込まずにハッシュ化できないものとする
+        data = LazyData(repo, lambda r: DataFrameData.load(r))
+        self.assertIsNone(data.content_hash())
+        self.assertFalse(data.loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+from aksdp.data import DataFrameData, DataType, LazyData
+from aksdp.dataset import DataSet
+from aksdp.graph import DebugGraph
+from aksdp.repository import LocalFileRepository
+from aksdp.task import Task
+from pathlib import Path
+import functools
+import os
+import pandas as pd
+import tempfile
+import unittest
+
+try:
+    from aksdp.data import ParquetData
+    import pyarrow.parquet as pq
+except ImportError:
+    ParquetData = None
+
+
+class PassTask(Task):
+    def main(self, ds):
+        return ds
+
+
+@unittest.skipIf(ParquetData is None, "pyarrow is not installed")
+class TestParquetData(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "titanic.parquet"
+
+        df = DataFrameData.load(LocalFileRepository(Path(os.path.dirname(__file__)) / Path("titanic.csv"))).content
+        df["Sex"] = df["Sex"].astype("category")
+        self.df = df
+
+        data = ParquetData(df, LocalFileRepository(self.path), row_group_size=100)
+        data.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read_and_write(self):
+        self.assertEqual(9, pq.ParquetFile(str(self.path)).metadata.num_row_groups)
+
+        data = ParquetData.load(LocalFileRepository(self.path))
+        self.assertEqual(DataType.PARQUET, data.data_type)
+        # 型が保持される
+        self.assertEqual("category", str(data.content["Sex"].dtype))
+        pd.testing.assert_frame_equal(self.df, data.content)
+
+    def test_columns(self):
+        data = ParquetData.load(LocalFileRepository(self.path), columns=["PassengerId", "Age"])
+        self.assertEqual(["PassengerId", "Age"], list(data.content.columns))
+        self.assertEqual(891, len(data.content))
+
+    def test_filters(self):
+        data = ParquetData.load(
+            LocalFileRepository(self.path), columns=["PassengerId"], filters=[("PassengerId", "<=", 150)]
+        )
+        self.assertEqual(list(range(1, 151)), list(data.content["PassengerId"]))
+
+    def test_from_bytes(self):
+        data = ParquetData.create_from_parquet(self.path.read_bytes(), filters=[("Survived", "==", 1)])
+        self.assertEqual(int(self.df["Survived"].sum()), len(data.content))
+
+    def test_resave(self):
+        data = ParquetData.load(LocalFileRepository(self.path))
+        self.assertEqual(100, data.row_group_size)
+
+        path = Path(self.tmp.name) / "resaved.parquet"
+        data.repository = LocalFileRepository(path)
+        data.save()
+        self.assertEqual(9, pq.ParquetFile(str(path)).metadata.num_row_groups)
+
+    def test_subclass(self):
+        class SubParquetData(ParquetData):
+            pass
+
+        self.assertIsInstance(SubParquetData.load(LocalFileRepository(self.path)), SubParquetData)
+
+    def test_pandas_db_repository(self):
+        from aksdp.repository import PandasDbRepository
+        from sqlalchemy import create_engine
+
+        engine = create_engine(f"sqlite:///{self.tmp.name}/db.sqlite3")
+        ParquetData(self.df, PandasDbRepository(engine, "titanic")).save()
+        self.assertEqual(891, len(pd.read_sql_table("titanic", engine)))
+        engine.dispose()
+
+    def test_debug_dump(self):
+        dump_dir = Path(self.tmp.name) / "dump"
+        g = DebugGraph(dump_dir, DataSet().put("titanic", ParquetData.load(LocalFileRepository(self.path))))
+        g.append(PassTask())
+        g.run()
+
+        self.assertTrue(list(dump_dir.glob("**/titanic.parquet")))
+
+    def test_lazy(self):
+        loader = functools.partial(ParquetData.load, columns=["Name"])
+        data = LazyData(LocalFileRepository(self.path), loader, DataType.PARQUET)
+
+        self.assertFalse(data.loaded)
+        self.assertEqual(["Name"], list(data.content.columns))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+from aksdp.data import DataFrameData, JsonData, ParquetData, RawData
+from aksdp.dataset import DataSet
+from aksdp.task import PartitionedTask, Task, TaskTimeoutError
+from aksdp.graph import Graph, ConcurrentGraph, ProcessGraph, TaskStatus
+from aksdp.repository import LocalFileRepository
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import os
+import pandas as pd
+import threading
+import time
+import unittest
+
+
+class DoubleTask(PartitionedTask):
+    calls = 0
+    lock = threading.Lock()
+
+    def input_datakeys(self):
+        return ["df", "factor"]
+
+    def main(self, ds):
+        with DoubleTask.lock:
+            DoubleTask.calls += 1
+        df = ds.get("df").content.copy()
+        df["y"] = df["x"] * ds.get("factor").content["factor"]
+        df["pid"] = os.getpid()
+        return DataSet().put("df", DataFrameData(df))
+
+
+class ErrorPartitionTask(PartitionedTask):
+    def main(self, ds):
+        raise ValueError("ValueError")
+
+
+class SlowPartitionTask(DoubleTask):
+    def main(self, ds):
+        time.sleep(0.2)
+        return super().main(ds)
+
+
+class ErrorTask(Task):
+    def main(self, ds):
+        raise ValueError("ValueError")
+
+
+class PassThroughTask(PartitionedTask):
+    def input_datakeys(self):
+        return ["df", "lookup", "raw"]
+
+    def main(self, ds):
+        df = ds.get("df").content.copy()
+        df["y"] = df["x"] * 2
+        ds.put("df", ParquetData(df, LocalFileRepository(Path("out.parquet"))))
+        return ds
+
+
+def make_input(rows=100):
+    ds = DataSet()
+    ds.put("df", DataFrameData(pd.DataFrame({"x": range(rows)})))
+    ds.put("factor", JsonData({"factor": 2}))
+    return ds
+
+
+class TestPartitionedTask(unittest.TestCase):
+    def setUp(self):
+        DoubleTask.calls = 0
+
+    def assertDoubled(self, ds, rows=100):
+        df = ds.get("df").content
+        self.assertEqual(list(range(rows)), list(df.index))
+        self.assertEqual([x * 2 for x in range(rows)], list(df["y"]))
+
+    def test_split(self):
+        parts = DoubleTask({"partitions": 3}).split(make_input(10))
+
+        self.assertEqual([4, 4, 2], [len(p.get("df").content) for p in parts])
+        self.assertEqual(2, parts[2].get("factor").content["factor"])
+
+    def test_more_partitions_than_rows(self):
+        parts = DoubleTask({"partitions": 8}).split(make_input(3))
+        self.assertEqual(3, len(parts))
+
+    def test_serial(self):
+        g = Graph(make_input())
+        g.append(DoubleTask({"partitions": 4}))
+        ds = g.run()
+
+        self.assertDoubled(ds)
+        self.assertEqual(4, DoubleTask.calls)
+
+    def test_concurrent(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(4), make_input())
+        gt = g.append(DoubleTask({"partitions": 4}))
+        ds = g.run()
+
+        self.assertDoubled(ds)
+        self.assertEqual(4, DoubleTask.calls)
+        self.assertEqual(TaskStatus.COMPLETED, gt.status)
+        self.assertIsNotNone(gt.task.elapsed_time)
+
+    def test_process(self):
+        g = ProcessGraph(catalog_ds=make_input())
+        g.append(DoubleTask({"partitions": 4}))
+        ds = g.run()
+
+        self.assertDoubled(ds)
+        self.assertNotIn(os.getpid(), ds.get("df").content["pid"].unique())
+        self.assertEqual(1, len(g.transfer_stats))
+        self.assertGreater(g.transfer_stats[0]["received_bytes"], 0)
+
+    def test_error(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(2), make_input())
+        gt = g.append(ErrorPartitionTask({"partitions": 2}))
+
+        with self.assertRaises(ValueError):
+            g.run()
+        self.assertEqual(TaskStatus.ERROR, gt.status)
+
+    def test_abort_cancels_partitions(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(2), make_input())
+        g.append(ErrorTask())
+        gt = g.append(SlowPartitionTask({"partitions": 8}))
+
+        with self.assertRaises(ValueError):
+            g.run()
+        self.assertEqual(TaskStatus.CANCELLED, gt.status)
+
+        # 実行中だった部分が終わっても完了扱いにならず、残りの部分は実行されない
+        time.sleep(0.5)
+        self.assertEqual(TaskStatus.CANCELLED, gt.status)
+        self.assertLessEqual(DoubleTask.calls, 2)
+
+    def test_timeout(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(2), make_input())
+        gt = g.append(SlowPartitionTask({"partitions": 8, "timeout": 0.1}))
+
+        start = time.time()
+        with self.assertRaises(TaskTimeoutError):
+            g.run()
+        self.assertLess(time.time() - start, 0.3)
+        self.assertEqual(TaskStatus.ERROR, gt.status)
+
+        time.sleep(0.5)
+        self.assertEqual(TaskStatus.ERROR, gt.status)
+        self.assertLessEqual(DoubleTask.calls, 2)
+
+    def test_pass_through(self):
+        # 分割しなかった入力を出力にそのまま含めても、部分の数だけ連結されない
+        for g in [ConcurrentGraph(ThreadPoolExecutor(4)), ProcessGraph()]:
+            catalog = make_input()
+            catalog.put("lookup", DataFrameData(pd.DataFrame({"k": [1, 2, 3]})))
+            catalog.put("raw", RawData(b"abc"))
+            g.catalog_ds = catalog
+            g.append(PassThroughTask({"partitions": 4}))
+            ds = g.run()
+
+            self.assertDoubled(ds)
+            self.assertEqual(3, len(ds.get("lookup").content))
+            self.assertEqual(b"abc", ds.get("raw").content)
+            # 連結した Data はクラスとリポジトリを保つ
+            self.assertIsInstance(ds.get("df"), ParquetData)
+            self.assertEqual(Path("out.parquet"), ds.get("df").repository.path)
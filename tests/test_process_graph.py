@@ -0,0 +1,161 @@
+from aksdp.data import DataFrameData, JsonData, RawData
+from aksdp.dataset import DataSet
+from aksdp.task import Task
+from aksdp.graph import ProcessGraph, TaskStatus
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import mmap
+import numpy as np
+import os
+import pandas as pd
+import unittest
+
+
+class ErrorTask(Task):
+    def main(self, ds):
+        raise ValueError("ValueError")
+
+
+class ProduceTask(Task):
+    def __init__(self):
+        super().__init__()
+        self._output_datakeys = []
+
+    def output_datakeys(self):
+        return self._output_datakeys
+
+    def main(self, ds):
+        # 出力keyは実行時に決まる
+        self._output_datakeys = ["pid"]
+        return DataSet().put("pid", JsonData({"pid": os.getpid()}))
+
+
+class ConsumeTask(Task):
+    def input_datakeys(self):
+        return ["pid"]
+
+    def main(self, ds):
+        if "large" in ds.keys():
+            raise ValueError("undeclared input transferred")
+        return DataSet().put("result", JsonData({"pid": ds.get("pid").content["pid"]}))
+
+
+class ChainTask(Task):
+    def main(self, ds):
+        return DataSet().put("count", JsonData({"count": ds.get("count").content["count"] + 1}))
+
+
+class TestProcessGraph(unittest.TestCase):
+    def test_dynamic_dependencies(self):
+        catalog_ds = DataSet().put("large", RawData(b"x" * 1024 * 1024))
+        g = ProcessGraph(ProcessPoolExecutor(2), catalog_ds=catalog_ds)
+        produce = g.append(ProduceTask())
+        consume = g.append(ConsumeTask())
+        ds = g.run()
+
+        self.assertEqual(TaskStatus.COMPLETED, produce.status)
+        self.assertEqual(TaskStatus.COMPLETED, consume.status)
+        self.assertNotEqual(os.getpid(), ds.get("result").content["pid"])
+
+        # input_datakeys で宣言されたデータのみ転送される
+        stats = {s["task"]: s for s in g.transfer_stats}
+        self.assertLess(stats["ConsumeTask"]["sent_bytes"], 1024 * 1024)
+        self.assertGreater(stats["ConsumeTask"]["received_bytes"], 0)
+
+    def test_static_dependencies_and_hooks(self):
+        g = ProcessGraph(ProcessPoolExecutor(2))
+        called = []
+
+        gt = None
+        for _ in range(5):
+            gt = g.append(ChainTask(), [gt] if gt else [])
+            gt.pre_run_hook = lambda ds: called.append("pre")
+            gt.post_run_hook = lambda ds: called.append("post")
+
+        ds = g.run(DataSet().put("count", JsonData({"count": 0})))
+
+        self.assertEqual(5, ds.get("count").content["count"])
+        self.assertEqual(10, len(called))
+        self.assertTrue(all([t.task.elapsed_time is not None for t in g.graph]))
+
+    def test_error_handler(self):
+        errors = []
+
+        g = ProcessGraph(ProcessPoolExecutor(1))
+        gt = g.append(ErrorTask())
+        g.add_error_handler(ValueError, lambda e, ds: errors.append(e))
+        g.run()
+
+        self.assertEqual(1, len(errors))
+        self.assertEqual(TaskStatus.ERROR, gt.status)
+
+
+class FrameTask(Task):
+    def output_datakeys(self):
+        return ["df", "raw"]
+
+    def main(self, ds):
+        df = pd.DataFrame(np.arange(200000 * 4, dtype="float64").reshape(200000, 4), columns=list("abcd"))
+        return DataSet().put("df", DataFrameData(df)).put("raw", RawData(b"r" * 1024 * 1024))
+
+
+class MappedTask(Task):
+    def input_datakeys(self):
+        return ["df", "raw"]
+
+    def main(self, ds):
+        # 入力の列が共有メモリ(mmap)を参照しているか
+        base = self._in["df"]["a"].to_numpy()
+        while getattr(base, "base", None) is not None:
+            base = base.base
+        mapped = isinstance(base, mmap.mmap) or isinstance(getattr(base, "obj", None), mmap.mmap)
+        total = float(self._in["df"].values.sum()) + len(self._in["raw"])
+        return DataSet().put("result", JsonData({"mapped": mapped, "total": total}))
+
+
+def shm_segments() -> set:
+    return set(os.listdir("/dev/shm")) if Path("/dev/shm").exists() else set()
+
+
+class TestSharedMemory(unittest.TestCase):
+    def test_shared_memory_transfer(self):
+        before = shm_segments()
+
+        g = ProcessGraph(ProcessPoolExecutor(2), shared_memory=True)
+        g.append(FrameTask())
+        g.append(MappedTask())
+        ds = g.run()
+
+        expected = float(np.arange(200000 * 4, dtype="float64").sum()) + 1024 * 1024
+        self.assertEqual(expected, ds.get("result").content["total"])
+        self.assertTrue(ds.get("result").content["mapped"])
+
+        stats = {s["task"]: s for s in g.transfer_stats}
+        self.assertGreater(stats["MappedTask"]["shared_bytes"], 200000 * 4 * 8)
+        self.assertLess(stats["MappedTask"]["sent_bytes"], 64 * 1024)
+        self.assertLess(stats["FrameTask"]["received_bytes"], 64 * 1024)
+
+        # セグメントが残っていない
+        g.pool.shutdown()
+        self.assertEqual(set(), shm_segments() - before)
+
+    def test_small_data_not_shared(self):
+        g = ProcessGraph(ProcessPoolExecutor(1), shared_memory=True)
+        gt = None
+        for _ in range(3):
+            gt = g.append(ChainTask(), [gt] if gt else [])
+        ds = g.run(DataSet().put("count", JsonData({"count": 0})))
+
+        self.assertEqual(3, ds.get("count").content["count"])
+        self.assertTrue(all([s["shared_bytes"] == 0 for s in g.transfer_stats]))
+
+    def test_error(self):
+        errors = []
+        g = ProcessGraph(ProcessPoolExecutor(1), shared_memory=True)
+        g.append(FrameTask())
+        gt = g.append(ErrorTask(), [g.graph[0]])
+        g.add_error_handler(ValueError, lambda e, ds: errors.append(e))
+        g.run()
+
+        self.assertEqual(1, len(errors))
+        self.assertEqual(TaskStatus.ERROR, gt.status)
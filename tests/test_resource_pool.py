@@ -0,0 +1,27 @@
+from aksdp.graph import ResourcePool
+from aksdp.graph.resource_pool import parse_quantity
+import unittest
+
+
+class TestResourcePool(unittest.TestCase):
+    def test_parse_quantity(self):
+        self.assertEqual(8 * 1024 ** 3, parse_quantity("8GB"))
+        self.assertEqual(512 * 1024 ** 2, parse_quantity("512Mi"))
+        self.assertEqual(1.5, parse_quantity("1.5"))
+        self.assertEqual(2, parse_quantity(2))
+
+        with self.assertRaises(ValueError):
+            parse_quantity("eight")
+
+    def test_acquire_release(self):
+        pool = ResourcePool({"cpu": 4, "memory": "8GB"})
+
+        req = {"cpu": 2, "memory": "6GB", "gpu": 1}
+        self.assertTrue(pool.fits(req))
+        pool.acquire(req)
+        self.assertFalse(pool.fits(req))
+        self.assertTrue(pool.fits({"cpu": 2}))
+
+        pool.release(req)
+        self.assertEqual(0, pool.used["cpu"])
+        self.assertEqual(0, pool.used["memory"])
@@ -0,0 +1,91 @@
+from aksdp.dataset import DataSet
+from aksdp.task import Task
+from aksdp.graph import ConcurrentGraph, CriticalPathPolicy, Graph
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import tempfile
+import unittest
+
+
+class ShortTask(Task):
+    def main(self, ds):
+        return DataSet()
+
+
+class LongTask(Task):
+    def main(self, ds):
+        return DataSet()
+
+
+class ProduceTask(Task):
+    def output_datakeys(self):
+        return ["data"]
+
+    def main(self, ds):
+        return DataSet()
+
+
+class ConsumeTask(Task):
+    def input_datakeys(self):
+        return ["data"]
+
+    def main(self, ds):
+        return DataSet()
+
+
+class TestCriticalPathPolicy(unittest.TestCase):
+    def test_rank(self):
+        g = Graph()
+        short = g.append(ShortTask())
+        head = g.append(ShortTask())
+        tail = g.append(LongTask(), [head])
+        produce = g.append(ProduceTask())
+        consume = g.append(ConsumeTask())
+
+        policy = CriticalPathPolicy({"ShortTask": 1.0, "LongTask": 5.0, "ProduceTask": 1.0, "ConsumeTask": 2.0})
+        policy.prepare(g)
+
+        self.assertEqual(1.0, policy.ranks[short])
+        self.assertEqual(6.0, policy.ranks[head])
+        self.assertEqual(5.0, policy.ranks[tail])
+        self.assertEqual(3.0, policy.ranks[produce])
+        self.assertEqual([head, produce, short], policy.order([short, head, produce]))
+        self.assertEqual(2.0, policy.ranks[consume])
+
+    def test_estimate_from_params(self):
+        g = Graph()
+        gt = g.append(ShortTask({"estimated_duration": 3}))
+
+        policy = CriticalPathPolicy()
+        self.assertEqual(3.0, policy.estimate(gt))
+
+    def test_schedule_order(self):
+        g = ConcurrentGraph(ThreadPoolExecutor(1), policy=CriticalPathPolicy())
+        order = []
+
+        gts = [g.append(ShortTask()) for _ in range(3)]
+        head = g.append(LongTask())
+        gts.append(head)
+        gts.append(g.append(LongTask(), [head]))
+        for gt in gts:
+            gt.pre_run_hook = lambda ds, gt=gt: order.append(gt)
+
+        g.run()
+
+        self.assertEqual(1, g.max_inflight)
+        self.assertEqual(head, order[0])
+        self.assertEqual(5, len(order))
+
+    def test_record_save_load(self):
+        g = Graph()
+        g.append(ShortTask())
+        g.run()
+
+        policy = CriticalPathPolicy()
+        policy.record(g)
+
+        path = Path(tempfile.gettempdir()) / Path(next(tempfile._get_candidate_names()))
+        policy.save(path)
+        loaded = CriticalPathPolicy.load(path)
+
+        self.assertIn("ShortTask", loaded.durations)
@@ -0,0 +1,124 @@
+from aksdp.data import JsonData
+from aksdp.dataset import DataSet
+from aksdp.executor import SocketExecutor, serve, start_worker
+from aksdp.task import Task
+from aksdp.graph import ConcurrentGraph, ProcessGraph, TaskStatus
+from multiprocessing import AuthenticationError
+import os
+import time
+import unittest
+
+
+class PidTask(Task):
+    def main(self, ds):
+        time.sleep(0.1)
+        return DataSet().put(self.params["key"], JsonData({"pid": os.getpid()}))
+
+
+class SumTask(Task):
+    def main(self, ds):
+        return DataSet().put("sum", JsonData({"sum": ds.get("a").content["pid"] + ds.get("b").content["pid"]}))
+
+
+class ErrorTask(Task):
+    def main(self, ds):
+        raise ValueError("ValueError")
+
+
+def divide(a, b):
+    return a / b
+
+
+def worker_env() -> dict:
+    # ワーカーからテストモジュールを import できるようにする
+    env = dict(os.environ)
+    paths = [os.path.dirname(os.path.abspath(__file__)), os.getcwd(), env.get("PYTHONPATH", "")]
+    env["PYTHONPATH"] = os.pathsep.join([p for p in paths if p])
+    return env
+
+
+class TestSocketExecutor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.workers = [start_worker(env=worker_env()) for _ in range(2)]
+        cls.addresses = [w[1] for w in cls.workers]
+
+    @classmethod
+    def tearDownClass(cls):
+        for proc, _ in cls.workers:
+            proc.terminate()
+            proc.wait()
+            proc.stdout.close()
+
+    def test_submit(self):
+        executor = SocketExecutor(self.addresses)
+        try:
+            self.assertEqual(2.0, executor.submit(divide, 4, 2).result())
+            with self.assertRaises(ZeroDivisionError):
+                executor.submit(divide, 1, 0).result()
+        finally:
+            executor.shutdown()
+
+    def test_process_graph(self):
+        g = ProcessGraph(SocketExecutor(self.addresses))
+        a = g.append(PidTask({"key": "a"}))
+        b = g.append(PidTask({"key": "b"}))
+        s = g.append(SumTask(), [a, b])
+
+        ds = g.run()
+        g.pool.shutdown()
+
+        pids = [a.output_ds.get("a").content["pid"], b.output_ds.get("b").content["pid"]]
+        self.assertEqual(set([p.pid for p, _ in self.workers]), set(pids))
+        self.assertEqual(sum(pids), ds.get("sum").content["sum"])
+        self.assertEqual(TaskStatus.COMPLETED, s.status)
+
+    def test_concurrent_graph(self):
+        g = ConcurrentGraph(SocketExecutor(self.addresses))
+        gt = g.append(PidTask({"key": "a"}))
+        ds = g.run()
+        g.pool.shutdown()
+
+        self.assertIn(ds.get("a").content["pid"], [p.pid for p, _ in self.workers])
+        self.assertEqual(TaskStatus.COMPLETED, gt.status)
+
+    def test_error(self):
+        g = ProcessGraph(SocketExecutor(self.addresses))
+        gt = g.append(ErrorTask())
+
+        with self.assertRaises(ValueError):
+            g.run()
+        g.pool.shutdown()
+        self.assertEqual(TaskStatus.ERROR, gt.status)
+
+
+class TestAuthentication(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.proc, cls.address = start_worker(authkey=b"secret", env=worker_env())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proc.terminate()
+        cls.proc.wait()
+        cls.proc.stdout.close()
+
+    def test_authkey(self):
+        executor = SocketExecutor([self.address], authkey=b"secret")
+        try:
+            self.assertEqual(2.0, executor.submit(divide, 4, 2).result())
+        finally:
+            executor.shutdown()
+
+    def test_wrong_authkey(self):
+        for authkey in [b"wrong", None]:
+            executor = SocketExecutor([self.address], authkey=authkey, timeout=5)
+            try:
+                with self.assertRaises(AuthenticationError):
+                    executor.submit(divide, 4, 2).result()
+            finally:
+                executor.shutdown()
+
+    def test_non_loopback_requires_authkey(self):
+        with self.assertRaises(ValueError):
+            serve("0.0.0.0", 0)
@@ -0,0 +1,119 @@
+from aksdp.data import DataFrameData, RawData, SpillStore
+from aksdp.dataset import DataSet
+from aksdp.graph import Graph
+from aksdp.task import Task
+import gc
+import numpy as np
+import os
+import pandas as pd
+import pickle
+import tempfile
+import unittest
+
+
+def make_df(seed: int) -> pd.DataFrame:
+    return pd.DataFrame(np.random.default_rng(seed).random((1000, 10)))
+
+
+class MakeTask(Task):
+    def output_datakeys(self):
+        return [self.params["key"]]
+
+    def main(self, ds):
+        return DataSet().put(self.params["key"], DataFrameData(make_df(self.params["seed"])))
+
+
+class SumTask(Task):
+    def input_datakeys(self):
+        return self.params["keys"]
+
+    def output_datakeys(self):
+        return ["sum"]
+
+    def main(self, ds):
+        total = sum([float(self._in[k].values.sum()) for k in self.params["keys"]])
+        return DataSet().put("sum", RawData(str(total).encode("utf-8")))
+
+
+class TestSpillStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_spill_and_restore(self):
+        size = DataFrameData(make_df(0)).memory_usage()
+        store = SpillStore(size * 2, self.tmp.name)
+
+        datas = [DataFrameData(make_df(i)) for i in range(4)]
+        for d in datas:
+            store.track(d)
+
+        # 古い2つが退避される
+        self.assertEqual(2, store.spill_count)
+        self.assertIsNone(datas[0]._content)
+        self.assertIsNone(datas[1]._content)
+        self.assertIsNotNone(datas[3]._content)
+        self.assertEqual(2, len(os.listdir(self.tmp.name)))
+        self.assertLessEqual(store.resident_bytes, size * 2)
+
+        # 参照すると読み戻し、代わりに最も古いものが退避される
+        pd.testing.assert_frame_equal(make_df(0), datas[0].content)
+        self.assertEqual(1, store.restore_count)
+        self.assertIsNone(datas[2]._content)
+        self.assertEqual(2, len(os.listdir(self.tmp.name)))
+
+    def test_raw_data(self):
+        store = SpillStore(10, self.tmp.name)
+        a, b = RawData(b"a" * 8), RawData(b"b" * 8)
+        store.track(a)
+        store.track(b)
+
+        self.assertIsNone(a._content)
+        self.assertEqual(b"a" * 8, a.content)
+
+    def test_files_removed_with_data(self):
+        store = SpillStore(0, self.tmp.name)
+        datas = [RawData(b"x" * 100) for _ in range(3)]
+        for d in datas:
+            store.track(d)
+        self.assertEqual(2, len(os.listdir(self.tmp.name)))
+
+        del datas, d
+        gc.collect()
+        self.assertEqual(0, len(os.listdir(self.tmp.name)))
+        self.assertEqual(0, store.report()["spilled_bytes"])
+
+    def test_pickle_spilled(self):
+        store = SpillStore(0, self.tmp.name)
+        a, b = RawData(b"a" * 8), RawData(b"b" * 8)
+        store.track(a)
+        store.track(b)
+
+        restored = pickle.loads(pickle.dumps(a))
+        self.assertIsNone(restored._spill)
+        self.assertEqual(b"a" * 8, restored.content)
+
+    def test_graph_memory_budget(self):
+        size = DataFrameData(make_df(0)).memory_usage()
+
+        g = Graph()
+        g.memory_budget = size * 2
+        g.spill_dir = self.tmp.name
+        keys = [f"df{i}" for i in range(6)]
+        for i, k in enumerate(keys):
+            g.append(MakeTask({"key": k, "seed": i}))
+        g.append(SumTask({"keys": keys}))
+        ds = g.run()
+
+        expected = sum([float(make_df(i).values.sum()) for i in range(6)])
+        self.assertAlmostEqual(expected, float(ds.get("sum").content.decode("utf-8")))
+
+        report = g.memory_report()
+        self.assertGreaterEqual(report["spill_count"], 4)
+        self.assertLessEqual(report["resident_peak_bytes"], size * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+from aksdp.data import JsonData, RawData
+from aksdp.dataset import DataSet
+from aksdp.task import StreamingTask, Task
+from aksdp.graph import Graph, StreamingGraph, TaskStatus
+import threading
+import time
+import unittest
+
+events = []
+lock = threading.Lock()
+
+
+def record(name, i):
+    with lock:
+        events.append((name, i))
+
+
+class Source(StreamingTask):
+    def main(self, ds):
+        for i in range(self.params.get("batches", 10)):
+            record("source", i)
+            yield DataSet().put("rows", JsonData([i]))
+
+
+class Double(StreamingTask):
+    def main(self, ds):
+        rows = ds.get("rows").content
+        record("double", rows[0])
+        time.sleep(self.params.get("sleep", 0))
+        yield DataSet().put("rows", JsonData([v * 2 for v in rows]))
+
+
+class Sum(StreamingTask):
+    def main(self, ds):
+        self.total = getattr(self, "total", 0) + sum(ds.get("rows").content)
+        return iter([])
+
+    def finish(self):
+        yield DataSet().put("sum", JsonData({"sum": self.total}))
+
+
+class Report(Task):
+    def main(self, ds):
+        return DataSet().put("count", JsonData({"count": len(ds.get("rows").content)}))
+
+
+class PassThrough(StreamingTask):
+    def main(self, ds):
+        ds.put("rows", JsonData([v * 2 for v in ds.get("rows").content]))
+        yield ds
+
+
+class LookupReport(Task):
+    def main(self, ds):
+        return DataSet().put("report", JsonData({"rows": ds.get("rows").content, "raw": ds.get("raw").content}))
+
+
+class ErrorStage(StreamingTask):
+    def main(self, ds):
+        raise ValueError("ValueError")
+        yield
+
+
+def build(graph, batches=10, sleep=0.0):
+    src = graph.append(Source({"batches": batches}))
+    dbl = graph.append(Double({"sleep": sleep}), [src])
+    graph.append(Sum(), [dbl])
+    return graph
+
+
+class TestStreamingGraph(unittest.TestCase):
+    def setUp(self):
+        events.clear()
+
+    def test_pipeline(self):
+        ds = build(StreamingGraph()).run()
+        self.assertEqual(90, ds.get("sum").content["sum"])
+
+    def test_serial_fallback(self):
+        ds = build(Graph()).run()
+        self.assertEqual(90, ds.get("sum").content["sum"])
+
+    def test_stages_overlap(self):
+        build(StreamingGraph()).run()
+        # 後段は前段の完了を待たずに処理を始める
+        self.assertLess(events.index(("double", 0)), events.index(("source", 9)))
+
+    def test_backpressure(self):
+        g = build(StreamingGraph(queue_depth=2), batches=20, sleep=0.01)
+        g.run()
+
+        # 前段は後段より (キュー深さ + 処理中の1件 + 送信待ちの1件) 以上先に進まない
+        produced = consumed = ahead = 0
+        for name, _ in events:
+            if name == "source":
+                produced += 1
+            elif name == "double":
+                consumed += 1
+            ahead = max(ahead, produced - consumed)
+        self.assertLessEqual(ahead, 2 + 2)
+
+    def test_streamed_output_not_collected(self):
+        g = StreamingGraph()
+        build(g)
+        g.run()
+
+        self.assertEqual([], list(g.graph[0].output_ds.keys()))
+        self.assertEqual([], list(g.graph[1].output_ds.keys()))
+
+    def test_collect_for_regular_task(self):
+        g = StreamingGraph()
+        src = g.append(Source({"batches": 5}))
+        g.append(Report(), [src])
+        ds = g.run()
+
+        self.assertEqual(5, ds.get("count").content["count"])
+
+    def test_pass_through(self):
+        # バッチ以外の入力をそのまま yield しても、バッチの数だけ連結されない
+        g = StreamingGraph(DataSet().put("raw", RawData(b"abc")))
+        src = g.append(Source({"batches": 4}))
+        pt = g.append(PassThrough(), [src])
+        g.append(LookupReport(), [pt])
+        ds = g.run()
+
+        self.assertEqual({"rows": [0, 2, 4, 6], "raw": b"abc"}, ds.get("report").content)
+
+    def test_cancel(self):
+        g = build(StreamingGraph(queue_depth=2), batches=100, sleep=0.05)
+        threading.Timer(0.1, g.cancel).start()
+
+        start = time.time()
+        g.run()
+
+        self.assertLess(time.time() - start, 1.0)
+        self.assertTrue(all([gt.status == TaskStatus.CANCELLED for gt in g.graph]))
+        self.assertLess(len([e for e in events if e[0] == "double"]), 10)
+
+    def test_error(self):
+        g = StreamingGraph(queue_depth=1)
+        src = g.append(Source({"batches": 50}))
+        err = g.append(ErrorStage(), [src])
+
+        with self.assertRaises(ValueError):
+            g.run()
+        self.assertEqual(TaskStatus.ERROR, err.status)
+        self.assertNotEqual(TaskStatus.COMPLETED, src.status)
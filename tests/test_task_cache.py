@@ -0,0 +1,109 @@
+from aksdp.cache import TaskCache
+from aksdp.data import DataFrameData, JsonData, RawData
+from aksdp.dataset import DataSet
+from aksdp.task import Task
+from aksdp.graph import Graph, ConcurrentGraph, TaskStatus
+from pathlib import Path
+import pandas as pd
+import tempfile
+import unittest
+
+
+class CountTask(Task):
+    calls = 0
+
+    def __init__(self, params={}):
+        super().__init__(params)
+        self._output_datakeys = []
+
+    def input_datakeys(self):
+        return ["df"]
+
+    def output_datakeys(self):
+        return self._output_datakeys
+
+    def main(self, ds):
+        CountTask.calls += 1
+        self._output_datakeys = ["sum"]
+        return DataSet().put("sum", JsonData({"sum": int(ds.get("df").content["v"].sum())}))
+
+
+class UseSum(Task):
+    def input_datakeys(self):
+        return ["sum"]
+
+    def main(self, ds):
+        return DataSet().put("result", ds.get("sum"))
+
+
+class UndeclaredTask(Task):
+    def main(self, ds):
+        return ds
+
+
+class TestTaskCache(unittest.TestCase):
+    def setUp(self):
+        CountTask.calls = 0
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = TaskCache(Path(self.tmpdir.name))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_graph(self, graph, df, params={}):
+        graph.catalog_ds = DataSet().put("df", DataFrameData(df))
+        graph.cache = self.cache
+        graph.append(CountTask(params))
+        graph.append(UseSum())
+        return graph.run()
+
+    def test_hit(self):
+        df = pd.DataFrame({"v": [1, 2, 3]})
+        self.run_graph(Graph(), df)
+        ds = self.run_graph(Graph(), df.copy())
+
+        # 2回目は main を実行せずキャッシュから復元され、動的な出力keyも復元される
+        self.assertEqual(1, CountTask.calls)
+        self.assertEqual(6, ds.get("result").content["sum"])
+        self.assertEqual(2, self.cache.stats()["hits"])
+
+    def test_miss_on_change(self):
+        self.run_graph(Graph(), pd.DataFrame({"v": [1, 2, 3]}))
+        self.run_graph(Graph(), pd.DataFrame({"v": [1, 2, 4]}))
+        self.run_graph(Graph(), pd.DataFrame({"v": [1, 2, 3]}), {"p": 1})
+
+        self.assertEqual(3, CountTask.calls)
+
+    def test_concurrent_graph(self):
+        df = pd.DataFrame({"v": [1, 2, 3]})
+        self.run_graph(ConcurrentGraph(), df)
+        g = ConcurrentGraph()
+        self.run_graph(g, df)
+
+        self.assertEqual(1, CountTask.calls)
+        self.assertTrue(all([gt.status == TaskStatus.COMPLETED for gt in g.graph]))
+
+    def test_fingerprint(self):
+        task = CountTask()
+        fp1 = self.cache.fingerprint(task, DataSet().put("df", DataFrameData(pd.DataFrame({"v": [1]}))))
+        fp2 = self.cache.fingerprint(
+            task, DataSet().put("df", DataFrameData(pd.DataFrame({"v": [1]}))).put("other", RawData(b"x"))
+        )
+        self.assertEqual(fp1, fp2)
+
+        fp3 = self.cache.fingerprint(task, DataSet().put("df", DataFrameData(pd.DataFrame({"w": [1]}))))
+        self.assertNotEqual(fp1, fp3)
+
+    def test_undeclared_inputs(self):
+        # 入力を宣言していないタスクはカタログ全体をハッシュ化せず、キャッシュしない
+        with self.assertLogs("aksdp.cache.task_cache", "INFO"):
+            fp = self.cache.fingerprint(UndeclaredTask(), DataSet().put("df", DataFrameData(pd.DataFrame({"v": [1]}))))
+        self.assertIsNone(fp)
+
+    def test_eviction(self):
+        cache = TaskCache(Path(self.tmpdir.name) / "small", max_bytes=2500)
+        for i in range(5):
+            cache.save(f"key{i}", CountTask(), DataSet().put("raw", RawData(bytes(1000))))
+
+        self.assertLessEqual(len(list((Path(self.tmpdir.name) / "small").glob("*.pkl"))), 2)
+        self.assertGreater(cache.stats()["evictions"], 0)